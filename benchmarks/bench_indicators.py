@@ -0,0 +1,132 @@
+"""
+Сравнение ядер src/indicator_kernels.py с прежними pandas-индикаторами.
+
+Запуск из корня проекта:
+    python benchmarks/bench_indicators.py [число_свечей]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import indicator_kernels as kernels
+from src.indicators import calculate_atr, calculate_rsi, calculate_sma
+from strategies.dynamic_scalping_strategy import generate_signal
+
+
+# Прежние реализации (до перехода на ядра NumPy)
+
+def legacy_atr(data, window=14):
+    data = data.copy()
+    data['H-L'] = data['high'] - data['low']
+    data['H-PC'] = abs(data['high'] - data['close'].shift(1))
+    data['L-PC'] = abs(data['low'] - data['close'].shift(1))
+    data['TR'] = data[['H-L', 'H-PC', 'L-PC']].max(axis=1)
+    return data['TR'].rolling(window=window).mean()
+
+
+def legacy_rsi(data, window=14):
+    delta = data['close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+
+def legacy_sma(data, window=20):
+    return data['close'].rolling(window=window).mean()
+
+
+def legacy_signal(df, params):
+    df = df.copy()
+    df['ATR'] = legacy_atr(df, window=params.get('atr_window', 14))
+    df['RSI'] = legacy_rsi(df, window=params.get('rsi_window', 14))
+    df['SMA'] = legacy_sma(df, window=params.get('sma_window', 20))
+    df['Price/SMA'] = df['close'] / df['SMA']
+    df['Acceleration'] = df['close'] - df['close'].shift(1)
+    df['Short Acceleration'] = df['close'] - df['close'].shift(1)
+    df['Average Quantity'] = df['volume'].rolling(window=20).mean()
+    latest = df.iloc[-1]
+
+    long_conditions = [
+        latest['Acceleration'] > params.get("acceleration_threshold", 0.5),
+        latest['volume'] > latest['Average Quantity'] * params.get("quantity_multiply", 1.5),
+        latest['Price/SMA'] < 1 - params.get("sma_gap", 0.01),
+        latest['Short Acceleration'] > params.get("short_acceleration_threshold", 0.5),
+        latest['RSI'] < 50 - params.get("rsi_threshold", 10)
+    ]
+    short_conditions = [
+        latest['Acceleration'] < -params.get("acceleration_threshold", 0.5),
+        latest['volume'] > latest['Average Quantity'] * params.get("quantity_multiply", 1.5),
+        latest['Price/SMA'] > 1 + params.get("sma_gap", 0.01),
+        latest['Short Acceleration'] < -params.get("short_acceleration_threshold", 0.5),
+        latest['RSI'] > 50 + params.get("rsi_threshold", 10)
+    ]
+    if all(long_conditions):
+        return 'buy'
+    elif all(short_conditions):
+        return 'sell'
+    return 'hold'
+
+
+def make_candles(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({
+        'open': close + rng.normal(0, 0.2, n),
+        'high': close + rng.random(n),
+        'low': close - rng.random(n),
+        'close': close,
+        'volume': rng.integers(1, 1000, n).astype(float)
+    })
+
+
+def best_time(func, repeat=7, number=1):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    df = make_candles(n)
+    high, low, close = (df[c].to_numpy() for c in ('high', 'low', 'close'))
+    out = np.empty(n)
+
+    print(f"Свечей: {n}")
+    print(f"{'индикатор':<22}{'pandas, мс':>12}{'обертка, мс':>13}{'ядро+out, мс':>14}{'макс. расхождение':>20}")
+
+    cases = [
+        ('ATR', lambda: legacy_atr(df), lambda: calculate_atr(df), lambda: kernels.atr(high, low, close, 14, out)),
+        ('RSI', lambda: legacy_rsi(df), lambda: calculate_rsi(df), lambda: kernels.rsi(close, 14, out)),
+        ('SMA', lambda: legacy_sma(df), lambda: calculate_sma(df), lambda: kernels.sma(close, 20, out)),
+    ]
+    for name, legacy, wrapper, kernel in cases:
+        diff = np.nanmax(np.abs(legacy().to_numpy() - wrapper().to_numpy()))
+        print(f"{name:<22}{best_time(legacy) * 1e3:>12.3f}{best_time(wrapper) * 1e3:>13.3f}"
+              f"{best_time(kernel) * 1e3:>14.3f}{diff:>20.2e}")
+
+    params = {}
+    window = df.iloc[-200:].reset_index(drop=True)
+    legacy_ms = best_time(lambda: legacy_signal(window, params), number=50) * 1e3
+    new_ms = best_time(lambda: generate_signal(window, params), number=50) * 1e3
+    print(f"\nСигнал скальпинга (окно 200 свечей): pandas {legacy_ms:.3f} мс, ядра {new_ms:.3f} мс")
+
+    mismatches = sum(
+        legacy_signal(df.iloc[i - 200:i], params) != generate_signal(df.iloc[i - 200:i], params)
+        for i in range(200, min(n, 5200), 5)
+    )
+    print(f"Расхождений сигналов на 1000 окнах: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Воспроизведение свечей: срезы iloc + reset_index на каждом шаге против
+окон CandleWindow без копирования (market_data/candle_window.py).
+
+Запуск из корня проекта:
+    python benchmarks/bench_replay.py [число_свечей]
+"""
+
+import asyncio
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_indicators import make_candles
+from market_data.candle_window import iter_windows
+from src.event_engine import EventEngine, ReplayFeed
+from strategies.breakout_strategy import generate_breakout_signal
+from strategies.dynamic_scalping_strategy import generate_signal
+from strategies.ema_crossover_strategy import generate_ema_signal
+
+WINDOW = 50
+STEP = 5
+STRATEGIES = (generate_signal, generate_breakout_signal, generate_ema_signal)
+
+
+# Прежний генератор simulate_realtime_data (без паузы между шагами)
+def legacy_windows(df, window=WINDOW, step=STEP):
+    for i in range(window, len(df), step):
+        yield df.iloc[i - window:i].reset_index(drop=True)
+
+
+def view_windows(df, window=WINDOW, step=STEP):
+    columns = {name: df[name].to_numpy() for name in df.columns}
+    return iter_windows(columns, window, step, start=window)
+
+
+def timed(windows, strategies=()):
+    start = time.perf_counter()
+    steps = 0
+    signals = []
+    for candles in windows:
+        steps += 1
+        for strategy in strategies:
+            signals.append(strategy(candles, {}))
+    return (time.perf_counter() - start) / steps, signals
+
+
+def step_allocation(windows):
+    """Байты, удерживаемые одним шагом генератора (после прогрева)"""
+    next(windows)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    window = next(windows)
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del window
+    return allocated
+
+
+def engine_replay(df, views):
+    engine = EventEngine(execution=None)
+    engine.add_feed(ReplayFeed(engine.bus, 'bench', 'BENCH', '1m', df))
+    for strategy in STRATEGIES:
+        engine.add_strategy(strategy, 'bench', 'BENCH', '1m', window=WINDOW, views=views)
+    start = time.perf_counter()
+    asyncio.run(engine.run())
+    return (time.perf_counter() - start) / len(df)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    df = make_candles(n)
+    df.insert(0, 'timestamp', np.arange(n, dtype=np.int64) * 60_000)
+    print(f"Свечей: {n}, окно {WINDOW}, шаг {STEP}")
+
+    legacy_step, _ = timed(legacy_windows(df))
+    view_step, _ = timed(view_windows(df))
+    print(f"Только окна:        iloc {legacy_step * 1e6:8.1f} мкс/шаг, "
+          f"представления {view_step * 1e6:6.2f} мкс/шаг")
+    print(f"Память на шаг:      iloc {step_allocation(legacy_windows(df))} байт, "
+          f"представления {step_allocation(view_windows(df))} байт")
+
+    legacy_step, legacy_signals = timed(legacy_windows(df), STRATEGIES)
+    view_step, view_signals = timed(view_windows(df), STRATEGIES)
+    mismatches = sum(a != b for a, b in zip(legacy_signals, view_signals))
+    print(f"Окна + 3 стратегии: iloc {legacy_step * 1e6:8.1f} мкс/шаг, "
+          f"представления {view_step * 1e6:6.1f} мкс/шаг, расхождений сигналов: {mismatches}")
+
+    frames_bar = engine_replay(df, views=False)
+    views_bar = engine_replay(df, views=True)
+    print(f"Движок, 3 стратегии: DataFrame {frames_bar * 1e6:8.1f} мкс/свеча, "
+          f"CandleWindow {views_bar * 1e6:6.1f} мкс/свеча")
+
+
+if __name__ == "__main__":
+    main()
@@ -34,7 +34,7 @@ logger = logging.getLogger(__name__)
 def check_dependencies():
     """Проверка установленных зависимостей"""
     required_packages = [
-        'pandas', 'numpy', 'requests', 'cryptography', 
+        'pandas', 'numpy', 'requests', 'aiohttp', 'cryptography', 
         'matplotlib', 'flask', 'openpyxl'
     ]
     
@@ -139,18 +139,9 @@ def run_strategy(strategy_name):
         logger.info(f"Запуск стратегии: {strategy_name}")
         if strategy_name == "scalping":
             from src.realtime_engine import run_realtime_trading
-            from src.strategies.dynamic_scalping_strategy import generate_signal
+            from strategies.dynamic_scalping_strategy import DEFAULT_PARAMS, generate_signal
             
-            params = {
-                "sma_window": 20,
-                "rsi_window": 14,
-                "acceleration_threshold": 0.5,
-                "quantity_multiply": 1.5,
-                "sma_gap": 0.01,
-                "rsi_threshold": 10
-            }
-            
-            run_realtime_trading(generate_signal, params)
+            run_realtime_trading(generate_signal, dict(DEFAULT_PARAMS))
         else:
             logger.error(f"Неизвестная стратегия: {strategy_name}")
             return False
@@ -159,12 +150,151 @@ def run_strategy(strategy_name):
         return False
     return True
 
+def run_backtest(args):
+    """Бэктест стратегии по свечам локального хранилища"""
+    try:
+        from src.backtester import backtest_from_store
+        
+        logger.info(f"Бэктест стратегии {args.strategy}: {args.exchange} {args.symbol} {args.interval}")
+        result = backtest_from_store(
+            args.strategy, args.exchange, args.symbol, args.interval,
+            fee_rate=args.fee, slippage=args.slippage, allow_short=args.allow_short
+        )
+        print(result.summary())
+    except Exception as e:
+        logger.error(f"Ошибка бэктеста: {e}")
+        return False
+    return True
+
+def run_sweep(args):
+    """Подбор параметров стратегии по свечам локального хранилища"""
+    try:
+        from market_data.candle_store import get_store
+        from src.param_sweep import DEFAULT_SPACES, default_results_path, grid, random_search, run_sweep
+        
+        space = DEFAULT_SPACES.get(args.strategy)
+        if space is None:
+            logger.error(f"Нет пространства параметров для стратегии {args.strategy}")
+            return False
+        prices = get_store().read(args.exchange, args.symbol, args.interval)
+        if len(prices['close']) == 0:
+            logger.error(f"В хранилище нет свечей {args.exchange} {args.symbol} {args.interval}")
+            return False
+        
+        param_sets = random_search(space, args.trials, seed=0) if args.trials else grid(space)
+        results_path = args.results or default_results_path(args.strategy, args.exchange, args.symbol, args.interval)
+        logger.info(f"Подбор параметров {args.strategy}: {len(param_sets)} наборов, результаты в {results_path}")
+        
+        def progress(row, done, total):
+            if done % 100 == 0 or done == total:
+                logger.info(f"Посчитано {done} из {total}")
+        
+        results = run_sweep(
+            args.strategy, prices, param_sets, results_path, args.interval,
+            max_workers=args.workers, on_result=progress,
+            fee_rate=args.fee, slippage=args.slippage, allow_short=args.allow_short
+        )
+        print(results.head(10).to_string())
+    except Exception as e:
+        logger.error(f"Ошибка подбора параметров: {e}")
+        return False
+    return True
+
+def run_scan(args):
+    """Сканер межбиржевого арбитража по всем общим парам Bybit и OKX"""
+    try:
+        import asyncio
+        import time
+        from market_data.ws_feed import MarketDataBus, create_stream
+        from strategies.arbitrage_scanner import create_scanner
+        
+        last_report = [0.0]
+        
+        def report(opportunities):
+            now = time.time()
+            if now - last_report[0] < 1.0:
+                return
+            last_report[0] = now
+            for item in opportunities[:5]:
+                logger.info(f"{item.pair}: купить {item.buy_exchange} {item.buy_price}, продать "
+                            f"{item.sell_exchange} {item.sell_price}, спред {item.net_spread:.4%}, "
+                            f"возраст котировки {item.quote_age:.2f} с")
+        
+        scanner = create_scanner(fees={'bybit': args.fee, 'okx': args.fee}, min_spread=args.min_spread,
+                                 on_opportunities=report)
+        logger.info(f"Общих пар Bybit/OKX: {len(scanner.pairs)}")
+        
+        async def scan():
+            bus = MarketDataBus()
+            bus.subscribe(scanner.on_event)
+            streams = [create_stream(exchange, bus) for exchange in ('bybit', 'okx')]
+            for stream in streams:
+                scanner.subscribe(stream)
+            await asyncio.gather(*(stream.run() for stream in streams))
+        
+        asyncio.run(scan())
+    except Exception as e:
+        logger.error(f"Ошибка сканера арбитража: {e}")
+        return False
+    return True
+
+def run_triangular(args):
+    """Детектор треугольного арбитража на одной бирже"""
+    try:
+        import asyncio
+        import time
+        from market_data.ws_feed import MarketDataBus, create_stream
+        from strategies.triangular_arbitrage import create_detector
+        
+        last_report = [0.0]
+        
+        def report(opportunities):
+            now = time.time()
+            if now - last_report[0] < 1.0:
+                return
+            last_report[0] = now
+            for item in opportunities[:5]:
+                route = ' -> '.join(f"{side} {symbol}" for symbol, side in item.legs)
+                logger.info(f"{item.start}: {route}, доходность {item.profit:.4%}, "
+                            f"возраст котировок {item.quote_age:.2f} с")
+        
+        detector = create_detector(args.exchange, fee=args.fee, min_profit=args.min_spread,
+                                   on_opportunities=report)
+        logger.info(f"{args.exchange}: пар {len(detector.pairs)}, циклов {len(detector)}")
+        
+        async def scan():
+            bus = MarketDataBus()
+            bus.subscribe(detector.on_event)
+            stream = create_stream(args.exchange, bus)
+            detector.subscribe(stream)
+            await stream.run()
+        
+        asyncio.run(scan())
+    except Exception as e:
+        logger.error(f"Ошибка детектора треугольного арбитража: {e}")
+        return False
+    return True
+
 def main():
     """Главная функция"""
     parser = argparse.ArgumentParser(description='Торговый бот для криптовалют')
-    parser.add_argument('--mode', choices=['init', 'cli', 'web', 'strategy'], 
+    parser.add_argument('--mode', choices=['init', 'cli', 'web', 'strategy', 'backtest', 'sweep', 'scan',
+                                           'triangular'], 
                        required=True, help='Режим работы')
-    parser.add_argument('--strategy', help='Название стратегии (для режима strategy)')
+    parser.add_argument('--strategy', help='Название стратегии (для режимов strategy, backtest и sweep)')
+    parser.add_argument('--exchange', default='bybit', help='Биржа (для режимов backtest и triangular)')
+    parser.add_argument('--symbol', default='BTCUSDT', help='Торговая пара (для режима backtest)')
+    parser.add_argument('--interval', default='1m', help='Интервал свечей (для режима backtest)')
+    parser.add_argument('--fee', type=float, default=0.001,
+                       help='Комиссия за сторону сделки (для режимов backtest, scan и triangular)')
+    parser.add_argument('--slippage', type=float, default=0.0005, help='Проскальзывание (для режима backtest)')
+    parser.add_argument('--allow-short', action='store_true', help='Разрешить короткие позиции (для режима backtest)')
+    parser.add_argument('--trials', type=int, default=0,
+                       help='Число случайных наборов параметров, 0 - полный перебор по сетке (для режима sweep)')
+    parser.add_argument('--workers', type=int, help='Число процессов (для режима sweep)')
+    parser.add_argument('--results', help='CSV результатов подбора (для режима sweep)')
+    parser.add_argument('--min-spread', type=float, default=0.0,
+                       help='Минимальный спред (доходность цикла) с учетом комиссий (для режимов scan и triangular)')
     parser.add_argument('--check-only', action='store_true', 
                        help='Только проверка системы (для режима init)')
     
@@ -201,6 +331,20 @@ def main():
             logger.error("Для режима strategy необходимо указать --strategy")
             return 1
         return 0 if run_strategy(args.strategy) else 1
+    elif args.mode == 'backtest':
+        if not args.strategy:
+            logger.error("Для режима backtest необходимо указать --strategy")
+            return 1
+        return 0 if run_backtest(args) else 1
+    elif args.mode == 'sweep':
+        if not args.strategy:
+            logger.error("Для режима sweep необходимо указать --strategy")
+            return 1
+        return 0 if run_sweep(args) else 1
+    elif args.mode == 'scan':
+        return 0 if run_scan(args) else 1
+    elif args.mode == 'triangular':
+        return 0 if run_triangular(args) else 1
     
     return 0
 
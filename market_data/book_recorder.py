@@ -0,0 +1,393 @@
+"""
+Запись стаканов в компактный двоичный формат и воспроизведение через memmap.
+
+Каждая пара (биржа/символ) хранится в отдельном каталоге:
+    levels.bin - записи фиксированной ширины LEVEL_DTYPE (34 байта): время
+                 сообщения, номер последовательности, цена, объем, сторона и
+                 флаги. Одно сообщение стакана (снимок или дельта) - подряд
+                 идущие записи, последняя помечена флагом END;
+    index.bin  - (время, номер записи) начала каждого снимка.
+Кроме снимков биржи записываются опорные снимки (keyframe) текущего стакана
+раз в keyframe_interval мс, поэтому перемотка к любому времени начинается с
+ближайшего снимка по индексу, а не с начала файла.
+
+Недописанные записи и сообщения без END в конце файла (после сбоя)
+при чтении отбрасываются.
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from .order_book import OrderBook
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ORDERBOOKS_DIR = os.path.join(BASE_DIR, 'data', 'orderbooks')
+
+LEVEL_DTYPE = np.dtype([('ts', '<i8'), ('seq', '<i8'), ('price', '<f8'), ('qty', '<f8'),
+                        ('side', 'i1'), ('flags', 'u1')])
+INDEX_DTYPE = np.dtype([('ts', '<i8'), ('record', '<i8')])
+
+# Стороны: NONE - пустое сообщение (снимок пустого стакана, дельта без уровней)
+SIDE_NONE, SIDE_BID, SIDE_ASK = 0, 1, 2
+# Флаги записи
+SNAPSHOT, END = 1, 2
+
+DEFAULT_KEYFRAME_INTERVAL = 60_000
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+
+def encode_message(ts, bids, asks, snapshot=False, seq=None):
+    """
+    Записи LEVEL_DTYPE одного сообщения стакана.
+
+    Args:
+        ts (int): Время сообщения, мс
+        bids, asks: Уровни [price, qty] (строки или числа)
+        snapshot (bool): Снимок (заменяет стакан) или дельта
+        seq (int): Номер последовательности биржи
+    """
+    bids = np.asarray(bids, dtype=np.float64).reshape(-1, 2)
+    asks = np.asarray(asks, dtype=np.float64).reshape(-1, 2)
+    count = len(bids) + len(asks)
+    records = np.zeros(max(count, 1), dtype=LEVEL_DTYPE)
+    records['ts'] = ts
+    records['seq'] = -1 if seq is None else int(seq)
+    if count:
+        records['price'][:len(bids)] = bids[:, 0]
+        records['qty'][:len(bids)] = bids[:, 1]
+        records['price'][len(bids):count] = asks[:, 0]
+        records['qty'][len(bids):count] = asks[:, 1]
+        records['side'][:len(bids)] = SIDE_BID
+        records['side'][len(bids):count] = SIDE_ASK
+    records['flags'] = SNAPSHOT if snapshot else 0
+    records['flags'][-1] |= END
+    return records
+
+
+class _Series:
+    """Открытые файлы записи одной пары"""
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.levels_path = os.path.join(directory, 'levels.bin')
+        self.index_path = os.path.join(directory, 'index.bin')
+        self.records, self.last_ts = _repair(self.levels_path)
+        _repair_index(self.index_path, self.records)
+        self.levels = open(self.levels_path, 'ab')
+        self.index = open(self.index_path, 'ab')
+        # Стакан прошлой сессии не восстанавливается: опорные снимки пишутся
+        # только после нового снимка биржи
+        self.book = OrderBook(validate=False)
+        self.last_keyframe = None
+
+    def flush(self):
+        self.levels.flush()
+        self.index.flush()
+
+    def close(self):
+        self.levels.close()
+        self.index.close()
+
+
+def _repair(path):
+    """
+    Отрезает недописанную запись и незавершенное сообщение; возвращает число
+    записей и время последнего целого сообщения (0 - записей нет)
+    """
+    if not os.path.exists(path):
+        return 0, 0
+    count = os.path.getsize(path) // LEVEL_DTYPE.itemsize
+    last_ts = 0
+    if count:
+        records = np.memmap(path, dtype=LEVEL_DTYPE, mode='r', shape=(count,))
+        ends = np.flatnonzero(records['flags'] & END)
+        count = int(ends[-1]) + 1 if len(ends) else 0
+        last_ts = int(records['ts'][count - 1]) if count else 0
+        del records
+    if os.path.getsize(path) != count * LEVEL_DTYPE.itemsize:
+        with open(path, 'r+b') as f:
+            f.truncate(count * LEVEL_DTYPE.itemsize)
+    return count, last_ts
+
+
+def _repair_index(path, records):
+    """
+    Отрезает недописанную запись индекса и ссылки на записи, отрезанные
+    _repair: индекс дописывается раньше уровней, и после сбоя в нем может
+    остаться опорный снимок, которого нет в levels.bin.
+    """
+    if not os.path.exists(path):
+        return
+    count = os.path.getsize(path) // INDEX_DTYPE.itemsize
+    if count:
+        index = np.fromfile(path, dtype=INDEX_DTYPE, count=count)
+        count = int(np.searchsorted(index['record'], records, side='left'))
+    if os.path.getsize(path) != count * INDEX_DTYPE.itemsize:
+        with open(path, 'r+b') as f:
+            f.truncate(count * INDEX_DTYPE.itemsize)
+
+
+class BookRecorder:
+    """
+    Дозапись снимков и дельт стаканов.
+
+    Подключается к MarketDataBus (on_event для канала 'orderbook') или
+    вызывается напрямую через record(). Файлы сбрасываются на диск не
+    чаще flush_interval секунд и при close().
+
+    Args:
+        root (str): Корневой каталог записей
+        keyframe_interval (int): Период опорных снимков, мс (None - без них)
+        flush_interval (float): Период сброса буферов, с
+    """
+
+    def __init__(self, root=ORDERBOOKS_DIR, keyframe_interval=DEFAULT_KEYFRAME_INTERVAL,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.root = root
+        self.keyframe_interval = keyframe_interval
+        self.flush_interval = flush_interval
+        self._series = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self.stats = {'messages': 0, 'records': 0, 'keyframes': 0, 'bytes': 0}
+
+    def _open(self, exchange, symbol):
+        key = (exchange, symbol)
+        series = self._series.get(key)
+        if series is None:
+            series = _Series(os.path.join(self.root, exchange, symbol))
+            self._series[key] = series
+        return series
+
+    def _write(self, series, records):
+        if records['flags'][0] & SNAPSHOT:
+            entry = np.array([(records['ts'][0], series.records)], dtype=INDEX_DTYPE)
+            series.index.write(entry.tobytes())
+        series.levels.write(records.tobytes())
+        series.records += len(records)
+        self.stats['records'] += len(records)
+        self.stats['bytes'] += records.nbytes
+
+    def record(self, exchange, symbol, action, bids, asks, ts=None, seq=None):
+        """
+        Дописывает сообщение стакана.
+
+        Args:
+            action (str): 'snapshot' или 'delta'
+            bids, asks: Уровни [price, qty]; объем 0 в дельте удаляет уровень
+            ts (int): Время сообщения, мс (по умолчанию текущее)
+        """
+        snapshot = action == 'snapshot'
+        with self._lock:
+            series = self._open(exchange, symbol)
+            # Время в файле не убывает: на нем строится поиск по индексу
+            ts = max(int(ts if ts is not None else time.time() * 1000), series.last_ts)
+            series.last_ts = ts
+            self._write(series, encode_message(ts, bids, asks, snapshot, seq))
+            self.stats['messages'] += 1
+
+            if snapshot:
+                series.book.apply_snapshot(bids, asks, seq)
+                series.last_keyframe = ts
+            else:
+                series.book.apply_delta(bids, asks, seq)
+                if (self.keyframe_interval is not None and series.last_keyframe is not None
+                        and ts - series.last_keyframe >= self.keyframe_interval):
+                    self._write_keyframe(series, ts, seq)
+
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+
+    def _write_keyframe(self, series, ts, seq):
+        book = series.book.to_dict()
+        self._write(series, encode_message(ts, book['bids'], book['asks'], True, seq))
+        series.last_keyframe = ts
+        self.stats['keyframes'] += 1
+
+    def on_event(self, event):
+        """Обработчик MarketDataBus для канала 'orderbook'"""
+        if event.channel != 'orderbook':
+            return
+        data = event.data
+        self.record(event.exchange, event.symbol, data.get('action', 'snapshot'),
+                    data.get('bids', []), data.get('asks', []), event.exchange_ts, data.get('seq'))
+
+    def import_csv(self, exchange, symbol, file_path, ts=None):
+        """
+        Импортирует стакан из CSV формата load_order_book_from_csv
+        (type: bid/ask, price, quantity). Если в файле есть колонка timestamp,
+        каждое значение времени - отдельный снимок.
+
+        Returns:
+            int: Количество записанных снимков
+        """
+        df = pd.read_csv(file_path)
+        if 'timestamp' not in df.columns:
+            df['timestamp'] = int(ts if ts is not None else time.time() * 1000)
+        df = df.sort_values('timestamp', kind='stable')
+
+        timestamps = df['timestamp'].to_numpy(dtype=np.int64)
+        is_bid = (df['type'] == 'bid').to_numpy()
+        levels = df[['price', 'quantity']].to_numpy(dtype=np.float64)
+        bounds = np.flatnonzero(np.diff(timestamps)) + 1
+        count = 0
+        for start, stop in zip(np.r_[0, bounds], np.r_[bounds, len(df)]):
+            bids = levels[start:stop][is_bid[start:stop]]
+            asks = levels[start:stop][~is_bid[start:stop]]
+            self.record(exchange, symbol, 'snapshot', bids, asks, int(timestamps[start]))
+            count += 1
+        self.flush()
+        return count
+
+    def _flush(self):
+        for series in self._series.values():
+            series.flush()
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            for series in self._series.values():
+                series.flush()
+                series.close()
+            self._series.clear()
+
+
+class BookReplay:
+    """
+    Воспроизведение записанного стакана пары.
+
+    Записи читаются через np.memmap без разбора и копирования файла;
+    границы сообщений находятся одним векторным проходом по флагам.
+
+    Пример:
+        replay = BookReplay('okx', 'BTC-USDT')
+        for ts, book in replay.replay(start=ts0, speed=10):
+            book.best_bid(), book.depth('asks', 10)
+    """
+
+    def __init__(self, exchange, symbol, root=ORDERBOOKS_DIR):
+        self.exchange = exchange
+        self.symbol = symbol
+        directory = os.path.join(root, exchange, symbol)
+        self.records = _read(os.path.join(directory, 'levels.bin'), LEVEL_DTYPE)
+
+        ends = np.flatnonzero(self.records['flags'] & END)
+        self.ends = ends + 1
+        self.starts = np.r_[0, self.ends[:-1]].astype(np.int64) if len(ends) else np.empty(0, np.int64)
+        self.times = np.asarray(self.records['ts'][self.starts]) if len(ends) else np.empty(0, np.int64)
+
+        index = _read(os.path.join(directory, 'index.bin'), INDEX_DTYPE)
+        complete = self.ends[-1] if len(ends) else 0
+        self.index = index[index['record'] < complete]
+
+    def __len__(self):
+        """Число сообщений"""
+        return len(self.starts)
+
+    def time_range(self):
+        return (int(self.times[0]), int(self.times[-1])) if len(self.times) else (None, None)
+
+    def message(self, number):
+        """(ts, снимок ли, seq, bids, asks) сообщения; уровни - массивы [n, 2]"""
+        chunk = self.records[self.starts[number]:self.ends[number]]
+        levels = np.column_stack((chunk['price'], chunk['qty']))
+        side = chunk['side']
+        return (int(chunk['ts'][0]), bool(chunk['flags'][0] & SNAPSHOT), int(chunk['seq'][0]),
+                levels[side == SIDE_BID], levels[side == SIDE_ASK])
+
+    def apply(self, number, book):
+        """Применяет сообщение number к стакану book; возвращает время сообщения"""
+        ts, snapshot, seq, bids, asks = self.message(number)
+        seq = None if seq < 0 else seq
+        if snapshot:
+            book.apply_snapshot(bids.tolist(), asks.tolist(), seq)
+        else:
+            book.apply_delta(bids.tolist(), asks.tolist(), seq)
+        book.timestamp = ts
+        return ts
+
+    def first_message(self, start):
+        """Сообщение, с которого нужно применять стакан, чтобы получить состояние на start"""
+        if start is None or len(self.index) == 0:
+            return 0
+        position = int(np.searchsorted(self.index['ts'], start, side='right')) - 1
+        if position < 0:
+            return 0
+        return int(np.searchsorted(self.starts, self.index['record'][position]))
+
+    def replay(self, start=None, end=None, speed=None, book=None):
+        """
+        Состояния стакана после каждого сообщения из [start, end).
+
+        Args:
+            start, end (int): Диапазон времени, мс
+            speed (float): None - без задержек, 1 - в исходном темпе,
+                           10 - в 10 раз быстрее
+            book (OrderBook): Стакан для применения сообщений (по умолчанию новый)
+
+        Yields:
+            tuple: (ts, OrderBook) - один и тот же объект стакана, обновленный на месте
+        """
+        book = book or OrderBook(self.exchange, self.symbol, validate=False)
+        first = self.first_message(start)
+        last = len(self) if end is None else int(np.searchsorted(self.times, end, side='left'))
+        origin = None
+        for number in range(first, last):
+            ts = self.apply(number, book)
+            if start is not None and ts < start:
+                continue
+            if speed:
+                if origin is None:
+                    origin = (ts, time.monotonic())
+                delay = (ts - origin[0]) / 1000.0 / speed - (time.monotonic() - origin[1])
+                if delay > 0:
+                    time.sleep(delay)
+            yield ts, book
+
+    async def publish(self, bus, start=None, end=None, speed=None):
+        """
+        Публикует записанные сообщения в MarketDataBus событиями 'orderbook'
+        (как потоки ws_feed), в исходном или ускоренном темпе. Номера
+        последовательности не передаются: опорные снимки разрывают цепочку
+        номеров биржи, а целостность проверена при записи.
+        """
+        from .ws_feed import MarketEvent
+
+        first = self.first_message(start)
+        last = len(self) if end is None else int(np.searchsorted(self.times, end, side='left'))
+        origin = None
+        for number in range(first, last):
+            ts, snapshot, seq, bids, asks = self.message(number)
+            if speed and (start is None or ts >= start):
+                if origin is None:
+                    origin = (ts, time.monotonic())
+                delay = (ts - origin[0]) / 1000.0 / speed - (time.monotonic() - origin[1])
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await bus.publish(MarketEvent(self.exchange, 'orderbook', self.symbol, {
+                'action': 'snapshot' if snapshot else 'delta',
+                'bids': bids.tolist(),
+                'asks': asks.tolist(),
+                'seq': None,
+                'prev_seq': None,
+                'checksum': None
+            }, ts, time.time()))
+
+
+def _read(path, dtype):
+    """Целые записи файла через memmap (пустой массив, если файла нет)"""
+    if not os.path.exists(path):
+        return np.empty(0, dtype=dtype)
+    count = os.path.getsize(path) // dtype.itemsize
+    if count == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', shape=(count,))
@@ -0,0 +1,243 @@
+"""
+Локальное колоночное хранилище свечей OHLCV.
+
+Каждая серия (биржа/пара/интервал) хранится в отдельном каталоге как набор
+сырых двоичных файлов - по одному на колонку (timestamp - int64 в мс,
+остальные - float64). Добавление - дозапись в конец файлов, чтение диапазона -
+np.memmap и searchsorted по времени, без копирования и разбора текста.
+"""
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CANDLES_DIR = os.path.join(BASE_DIR, 'data', 'candles')
+
+COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+DTYPES = {
+    'timestamp': np.dtype(np.int64),
+    'open': np.dtype(np.float64),
+    'high': np.dtype(np.float64),
+    'low': np.dtype(np.float64),
+    'close': np.dtype(np.float64),
+    'volume': np.dtype(np.float64)
+}
+
+
+def _empty_columns():
+    return {column: np.empty(0, dtype=DTYPES[column]) for column in COLUMNS}
+
+
+class CandleStore:
+    """
+    Хранилище свечей, разбитое по exchange/symbol/interval.
+
+    Args:
+        root (str): Корневой каталог хранилища
+    """
+
+    def __init__(self, root=CANDLES_DIR):
+        self.root = root
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _series_dir(self, exchange, symbol, interval):
+        return os.path.join(self.root, exchange, symbol, interval)
+
+    def _column_path(self, exchange, symbol, interval, column):
+        return os.path.join(self._series_dir(exchange, symbol, interval), f"{column}.bin")
+
+    def _lock(self, key):
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def series(self):
+        """Перечисляет сохраненные серии (exchange, symbol, interval)"""
+        if not os.path.isdir(self.root):
+            return
+        for exchange in sorted(os.listdir(self.root)):
+            for symbol in sorted(os.listdir(os.path.join(self.root, exchange))):
+                for interval in sorted(os.listdir(os.path.join(self.root, exchange, symbol))):
+                    yield exchange, symbol, interval
+
+    def length(self, exchange, symbol, interval):
+        """Число целых строк серии (по самой короткой колонке после сбоя записи)"""
+        sizes = []
+        for column in COLUMNS:
+            path = self._column_path(exchange, symbol, interval, column)
+            if not os.path.exists(path):
+                return 0
+            sizes.append(os.path.getsize(path) // DTYPES[column].itemsize)
+        return min(sizes)
+
+    def _repair(self, exchange, symbol, interval, length):
+        """
+        Обрезает колонки до общей длины после прерванной дозаписи (в том
+        числе до нуля, если первая запись серии не дошла до timestamp)
+        """
+        for column in COLUMNS:
+            path = self._column_path(exchange, symbol, interval, column)
+            size = length * DTYPES[column].itemsize
+            if os.path.exists(path) and os.path.getsize(path) != size:
+                with open(path, 'r+b') as f:
+                    f.truncate(size)
+
+    def _memmap(self, exchange, symbol, interval, column, length, mode='r'):
+        if length == 0:
+            return np.empty(0, dtype=DTYPES[column])
+        path = self._column_path(exchange, symbol, interval, column)
+        return np.memmap(path, dtype=DTYPES[column], mode=mode, shape=(length,))
+
+    def last_timestamp(self, exchange, symbol, interval):
+        length = self.length(exchange, symbol, interval)
+        if length == 0:
+            return None
+        return int(self._memmap(exchange, symbol, interval, 'timestamp', length)[-1])
+
+    def append(self, exchange, symbol, interval, columns):
+        """
+        Дописывает свечи в конец серии.
+
+        Свечи сортируются и дедуплицируются по времени. Свеча с временем
+        последней сохраненной перезаписывает ее (незакрытая свеча), более
+        ранние свечи пропускаются.
+
+        Args:
+            columns (dict): {'timestamp': [...], 'open': [...], ...}
+
+        Returns:
+            int: Количество добавленных строк
+        """
+        data = {column: np.asarray(columns[column], dtype=DTYPES[column]) for column in COLUMNS}
+        if len(data['timestamp']) == 0:
+            return 0
+
+        order = np.argsort(data['timestamp'], kind='stable')
+        data = {column: values[order] for column, values in data.items()}
+        keep = np.ones(len(order), dtype=bool)
+        keep[:-1] = data['timestamp'][1:] != data['timestamp'][:-1]
+        data = {column: values[keep] for column, values in data.items()}
+
+        key = (exchange, symbol, interval)
+        with self._lock(key):
+            os.makedirs(self._series_dir(*key), exist_ok=True)
+            length = self.length(*key)
+            self._repair(*key, length)
+            if length:
+                last_ts = int(self._memmap(*key, 'timestamp', length)[-1])
+                same = data['timestamp'] == last_ts
+                if same.any():
+                    index = np.flatnonzero(same)[-1]
+                    for column in COLUMNS[1:]:
+                        mm = self._memmap(*key, column, length, mode='r+')
+                        mm[-1] = data[column][index]
+                        mm.flush()
+                newer = data['timestamp'] > last_ts
+                data = {column: values[newer] for column, values in data.items()}
+
+            added = len(data['timestamp'])
+            if added:
+                # timestamp дописывается последним: длина серии считается по самой короткой колонке
+                for column in COLUMNS[1:] + COLUMNS[:1]:
+                    with open(self._column_path(*key, column), 'ab') as f:
+                        f.write(np.ascontiguousarray(data[column]).tobytes())
+            return added
+
+    def append_frame(self, exchange, symbol, interval, df):
+        """Дописывает DataFrame с колонками timestamp (мс), open, high, low, close, volume"""
+        return self.append(exchange, symbol, interval, {column: df[column].to_numpy() for column in COLUMNS})
+
+    def read(self, exchange, symbol, interval, start=None, end=None, last=None):
+        """
+        Читает диапазон свечей без копирования.
+
+        Args:
+            start (int): Начало диапазона, мс (включительно)
+            end (int): Конец диапазона, мс (не включительно)
+            last (int): Вернуть только последние last свечей диапазона
+
+        Returns:
+            dict: {колонка: np.ndarray} - представления над memmap только для чтения
+        """
+        length = self.length(exchange, symbol, interval)
+        if length == 0:
+            return _empty_columns()
+
+        timestamps = self._memmap(exchange, symbol, interval, 'timestamp', length)
+        lo = 0 if start is None else int(np.searchsorted(timestamps, start, side='left'))
+        hi = length if end is None else int(np.searchsorted(timestamps, end, side='left'))
+        if last is not None:
+            lo = max(lo, hi - last)
+
+        return {
+            column: self._memmap(exchange, symbol, interval, column, length)[lo:hi]
+            for column in COLUMNS
+        }
+
+    def read_frame(self, exchange, symbol, interval, start=None, end=None, last=None):
+        """То же, что read, но в виде DataFrame (колонки копируются)"""
+        return pd.DataFrame(self.read(exchange, symbol, interval, start, end, last))
+
+    def import_csv(self, exchange, symbol, interval, file_path):
+        """
+        Импортирует свечи из CSV (timestamp/time/open_time, open, high, low, close, volume).
+        Время в виде даты или в секундах переводится в мс.
+
+        Returns:
+            int: Количество добавленных строк
+        """
+        df = pd.read_csv(file_path)
+        df.columns = [column.lower() for column in df.columns]
+        time_column = next((c for c in ('timestamp', 'time', 'open_time', 'date', 'datetime')
+                            if c in df.columns), None)
+        if time_column is None:
+            raise ValueError(f"В файле {file_path} нет колонки времени")
+
+        times = df[time_column]
+        if pd.api.types.is_numeric_dtype(times):
+            timestamps = times.to_numpy(dtype=np.int64)
+            if len(timestamps) and timestamps.max() < 10 ** 11:
+                timestamps = timestamps * 1000
+        else:
+            timestamps = pd.to_datetime(times).to_numpy(dtype='datetime64[ms]').astype(np.int64)
+
+        columns = {column: df[column].to_numpy() for column in COLUMNS[1:]}
+        columns['timestamp'] = timestamps
+        return self.append(exchange, symbol, interval, columns)
+
+
+_default_store = None
+
+
+def get_store():
+    """Хранилище по умолчанию в data/candles"""
+    global _default_store
+    if _default_store is None:
+        _default_store = CandleStore()
+    return _default_store
+
+
+def sync_recent(exchange, symbol, interval="15m", limit=15, store=None):
+    """
+    Дозагружает последние свечи с биржи в хранилище и возвращает их из хранилища.
+
+    Returns:
+        dict: Колонки последних limit свечей
+    """
+    from src import bybit, okx
+
+    store = store or get_store()
+    try:
+        if exchange == 'bybit':
+            rows = bybit.get_klines(symbol, interval, limit=limit)
+        else:
+            rows = okx.get_history_klines(symbol, interval, limit=limit)
+        if rows:
+            store.append(exchange, symbol, interval, dict(zip(COLUMNS, zip(*rows))))
+    except Exception as e:
+        print(f"Ошибка обновления свечей {exchange} {symbol}: {e}")
+
+    return store.read(exchange, symbol, interval, last=limit)
@@ -0,0 +1,116 @@
+"""
+Окна свечей без копирования.
+
+CandleWindow - представление последних свечей над заранее выделенными
+массивами колонок (хранилище memmap, кольцевой буфер движка). Колонки
+отдаются как np.ndarray только для чтения, без создания DataFrame и
+индекса на каждом шаге; стратегии читают колонки через column(), которая
+принимает и окно, и DataFrame.
+"""
+
+import numpy as np
+import pandas as pd
+
+SOURCE_ATTRS = ('exchange', 'symbol', 'interval')
+
+
+def read_only(array):
+    """Представление массива только для чтения (сам массив остается изменяемым)"""
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class CandleWindow:
+    """
+    Свечи [start, stop) над массивами колонок.
+
+    Окно можно сдвигать (move) - так воспроизведение обходится одним
+    объектом; сохранять данные окна между шагами нужно через to_frame().
+    attrs, как у DataFrame, несет биржу, пару и интервал для общего кэша
+    индикаторов (src.feature_cache).
+    """
+
+    __slots__ = ('_columns', 'start', 'stop', 'attrs')
+
+    def __init__(self, columns, start=0, stop=None, attrs=None):
+        self._columns = columns
+        self.start = start
+        self.stop = len(next(iter(columns.values()))) if stop is None else stop
+        self.attrs = attrs if attrs is not None else {}
+
+    @classmethod
+    def from_frame(cls, df, attrs=None):
+        """Окно над копией колонок DataFrame (одна копия на весь ряд)"""
+        columns = {name: read_only(np.ascontiguousarray(df[name].to_numpy(dtype=np.float64)))
+                   for name in df.columns}
+        return cls(columns, 0, len(df), dict(df.attrs) if attrs is None else attrs)
+
+    @property
+    def columns(self):
+        return tuple(self._columns)
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    def __getitem__(self, name):
+        return self._columns[name][self.start:self.stop]
+
+    def move(self, start, stop):
+        self.start = start
+        self.stop = stop
+        return self
+
+    def last(self, name):
+        return self._columns[name][self.stop - 1]
+
+    def bar(self, index=-1):
+        """Свеча окна в виде словаря {колонка: число}"""
+        position = (self.stop if index < 0 else self.start) + index
+        return {name: values[position].item() for name, values in self._columns.items()}
+
+    def cache_key(self):
+        """Идентификатор свечей окна для ключа кэша индикаторов (см. feature_cache.frame_key)"""
+        if self.stop <= self.start or any(self.attrs.get(name) is None for name in SOURCE_ATTRS):
+            return None
+        last_ts = int(self.last('timestamp')) if 'timestamp' in self._columns else self.stop - 1
+        last_close = float(self.last('close')) if 'close' in self._columns else None
+        last_volume = float(self.last('volume')) if 'volume' in self._columns else None
+        return (self.attrs['exchange'], self.attrs['symbol'], self.attrs['interval'],
+                last_ts, len(self), last_close, last_volume)
+
+    def to_frame(self):
+        """Копия окна в виде DataFrame"""
+        frame = pd.DataFrame({name: np.array(self[name]) for name in self._columns})
+        if 'timestamp' in frame.columns:
+            frame['timestamp'] = frame['timestamp'].astype(np.int64)
+        frame.attrs.update(self.attrs)
+        return frame
+
+
+def column(data, name):
+    """Колонка окна или DataFrame как np.ndarray float64 (у окна - без копии)"""
+    if isinstance(data, CandleWindow):
+        return data[name]
+    return data[name].to_numpy(dtype=np.float64)
+
+
+def iter_windows(columns, window, step=1, attrs=None, start=None):
+    """
+    Скользящие окна длины window над колонками.
+
+    Возвращает один и тот же объект CandleWindow, сдвигаемый на step свечей;
+    на шаге не выделяется память под данные.
+
+    Args:
+        columns (dict): {колонка: np.ndarray}, например CandleStore.read
+        start (int): Конец первого окна (по умолчанию window)
+    """
+    columns = {name: read_only(np.asarray(values)) for name, values in columns.items()}
+    length = len(next(iter(columns.values()))) if columns else 0
+    cursor = CandleWindow(columns, 0, 0, attrs)
+    for stop in range(window if start is None else start, length + 1, step):
+        yield cursor.move(stop - window, stop)
@@ -0,0 +1,280 @@
+"""
+Оценка исполнения рыночного ордера по стакану.
+
+Ордер «проходит» уровни стакана от лучшей цены, пока не наберет заданное
+количество или сумму. По накопленным объемам и стоимостям уровней оценка
+для любого числа размеров ордера считается одним np.searchsorted, без
+цикла по уровням, - так можно перебрать много вариантов размера на каждое
+обновление стакана.
+
+Проскальзывание считается от лучшей цены стороны исполнения (ask для
+покупки, bid для продажи) в базисных пунктах. SlippageGuard применяет
+допуск risk_limits.slippage_tolerance к ордерам клиентов бирж до отправки:
+ордер отклоняется или уменьшается до наибольшего размера в пределах допуска.
+Клиенты по умолчанию (get_info_from_json модулей bybit и okx) получают
+общую проверку get_default_guard со стаканами LiveOrderBooks; она не
+задерживает ордер, пока стакан пары еще не пришел.
+"""
+
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from src.database import get_slippage_settings
+from src.instruments import round_to_step
+from src.metrics import SLIPPAGE_CHECKS_TOTAL
+
+# Оценка исполнения; для нескольких размеров поля - массивы.
+#   qty, notional - исполненное количество и сумма (меньше запрошенных, если не хватило стакана)
+#   vwap, worst_price - средняя и худшая цена исполнения
+#   slippage_bps - отклонение vwap от лучшей цены в худшую сторону, б.п.
+#   levels - число затронутых уровней, complete - хватило ли стакана
+FillEstimate = namedtuple('FillEstimate', ['qty', 'notional', 'vwap', 'worst_price', 'slippage_bps',
+                                           'levels', 'complete'])
+
+MODES = ('reject', 'downsize')
+# Режим risk_limits.slippage_mode, при котором проверка не выполняется
+MODE_OFF = 'off'
+
+# Шаг уменьшенного размера ордера, если реестр инструментов биржи не задан
+DEFAULT_SIZE_STEP = 1e-8
+
+
+def _book_side(side):
+    """Сторона стакана, по которой исполняется ордер: покупка забирает аски"""
+    return 'asks' if side.lower() == 'buy' else 'bids'
+
+
+def walk_depth(prices, quantities, side, qty=None, notional=None):
+    """
+    Исполнение ордеров одного направления по уровням стакана.
+
+    Args:
+        prices (np.ndarray): Цены уровней от лучшей
+        quantities (np.ndarray): Объемы уровней
+        side (str): 'buy' или 'sell' (регистр не важен)
+        qty: Размер(ы) в базовой валюте - число или массив
+        notional: Размер(ы) в котируемой валюте (вместо qty)
+
+    Returns:
+        FillEstimate: Поля - массивы той же формы, что qty/notional
+    """
+    if (qty is None) == (notional is None):
+        raise ValueError("Нужно задать ровно одно из qty и notional")
+    prices = np.asarray(prices, dtype=np.float64)
+    quantities = np.asarray(quantities, dtype=np.float64)
+    sizes = np.atleast_1d(np.asarray(qty if qty is not None else notional, dtype=np.float64))
+    if len(prices) == 0:
+        zeros = np.zeros(sizes.shape)
+        nan = np.full(sizes.shape, np.nan)
+        return FillEstimate(zeros, zeros, nan, nan, nan, np.zeros(sizes.shape, dtype=np.int64),
+                            sizes <= 0)
+
+    costs = prices * quantities
+    cum_qty = np.cumsum(quantities)
+    cum_cost = np.cumsum(costs)
+    cumulative = cum_qty if qty is not None else cum_cost
+
+    # Уровень, на котором заканчивается исполнение, и накопленное до него
+    level = np.minimum(np.searchsorted(cumulative, sizes, side='left'), len(prices) - 1)
+    complete = sizes <= cumulative[-1]
+    prev_qty = np.where(level > 0, cum_qty[level - 1], 0.0)
+    prev_cost = np.where(level > 0, cum_cost[level - 1], 0.0)
+    level_price = prices[level]
+
+    if qty is not None:
+        filled_qty = np.where(complete, sizes, cum_qty[-1])
+        filled_cost = np.where(complete, prev_cost + (sizes - prev_qty) * level_price, cum_cost[-1])
+    else:
+        filled_cost = np.where(complete, sizes, cum_cost[-1])
+        filled_qty = np.where(complete, prev_qty + (sizes - prev_cost) / level_price, cum_qty[-1])
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        vwap = np.where(filled_qty > 0, filled_cost / filled_qty, np.nan)
+    best = prices[0]
+    direction = 1.0 if side.lower() == 'buy' else -1.0
+    slippage_bps = direction * (vwap - best) / best * 10000.0
+    active = sizes > 0
+    levels = np.where(active, level + 1, 0)
+    worst = np.where(active, level_price, np.nan)
+    return FillEstimate(filled_qty, filled_cost, vwap, worst, slippage_bps, levels, complete)
+
+
+def max_size_within(prices, quantities, side, tolerance_bps, unit='qty'):
+    """
+    Наибольший размер ордера, при котором проскальзывание vwap не
+    превышает tolerance_bps (в единицах unit: 'qty' или 'notional').
+
+    vwap растет с размером монотонно, поэтому граница находится точно:
+    целые уровни, пока vwap их полного исполнения в пределах допуска, и
+    часть следующего уровня, решение (C + p*x) / (Q + x) = L.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    quantities = np.asarray(quantities, dtype=np.float64)
+    if len(prices) == 0:
+        return 0.0
+    direction = 1.0 if side.lower() == 'buy' else -1.0
+    limit = prices[0] * (1.0 + direction * tolerance_bps / 10000.0)
+
+    cum_qty = np.cumsum(quantities)
+    cum_cost = np.cumsum(prices * quantities)
+    # Полные уровни, vwap которых не хуже limit (в худшую сторону - direction)
+    within = direction * (cum_cost - limit * cum_qty) <= 1e-12 * cum_cost
+    full = int(np.argmin(within)) if not within.all() else len(prices)
+
+    if full == len(prices):
+        qty, cost = cum_qty[-1], cum_cost[-1]
+    else:
+        base_qty = cum_qty[full - 1] if full else 0.0
+        base_cost = cum_cost[full - 1] if full else 0.0
+        price = prices[full]
+        extra = (limit * base_qty - base_cost) / (price - limit) if price != limit else quantities[full]
+        extra = min(max(extra, 0.0), quantities[full])
+        qty, cost = base_qty + extra, base_cost + extra * price
+    return float(qty if unit == 'qty' else cost)
+
+
+def estimate_fill(book, side, qty=None, notional=None, levels=None):
+    """
+    Оценка исполнения по стакану OrderBook (market_data.order_book).
+
+    Args:
+        book (OrderBook): Стакан пары
+        side (str): 'buy' или 'sell'
+        qty, notional: Размер ордера (число или массив размеров)
+        levels (int): Сколько лучших уровней учитывать (None - все)
+    """
+    prices, quantities = book.side(_book_side(side)).arrays(levels)
+    estimate = walk_depth(prices, quantities, side, qty=qty, notional=notional)
+    if np.ndim(qty if qty is not None else notional) == 0:
+        return FillEstimate(*(value[0].item() for value in estimate))
+    return estimate
+
+
+class SlippageGuard:
+    """
+    Проверка проскальзывания ордеров по стаканам до отправки на биржу.
+
+    Клиенты бирж (BybitClient, OkxClient и их асинхронные варианты) вызывают
+    check() перед отправкой, если им передан guard (slippage_guard=...).
+    Стаканы берутся из OrderBookManager (LiveOrderBooks сам подписывается на
+    пары); без стакана или при рассинхронизированном стакане ордер
+    пропускается без проверки, если не задано require_book. Уменьшенный
+    размер округляется вниз до шага лота (количество) или шага суммы
+    инструмента из реестра биржи.
+
+    Args:
+        books (OrderBookManager): Стаканы пар
+        tolerance_bps (float): Допустимое проскальзывание, б.п.
+        mode (str): 'reject' - отклонять ордер, 'downsize' - уменьшать до допуска
+        require_book (bool): Отклонять ордера без согласованного стакана
+        instruments (dict): {биржа: InstrumentRegistry} для округления размера
+    """
+
+    def __init__(self, books, tolerance_bps=50.0, mode='downsize', require_book=False, instruments=None):
+        if mode not in MODES:
+            raise ValueError(f"Неизвестный режим: {mode}. Доступные: {MODES}")
+        self.books = books
+        self.tolerance_bps = tolerance_bps
+        self.mode = mode
+        self.require_book = require_book
+        self.instruments = instruments or {}
+
+    @classmethod
+    def from_risk_limits(cls, books, mode=None, require_book=None):
+        """
+        Допуск (slippage_tolerance в процентах), режим и политика ордеров без
+        стакана из таблицы risk_limits; mode и require_book заменяют значения таблицы
+        """
+        settings = get_slippage_settings()
+        mode = mode or settings['mode']
+        if mode == MODE_OFF:
+            mode = 'downsize'
+        require_book = settings['require_book'] if require_book is None else require_book
+        return cls(books, settings['tolerance'] * 100.0, mode, require_book)
+
+    def check(self, exchange, symbol, side, qty=None, notional=None):
+        """
+        Проверяет ордер по стакану.
+
+        Args:
+            exchange (str): 'bybit' или 'okx'
+            symbol (str): Пара в формате биржи
+            side (str): 'buy'/'sell' в любом регистре
+            qty, notional: Размер ордера в тех единицах, в которых он уйдет на биржу
+
+        Returns:
+            tuple: (размер - исходный или уменьшенный, текст ошибки или None)
+        """
+        amount = qty if qty is not None else notional
+        unit = 'qty' if qty is not None else 'notional'
+        arrays = self.books.depth_arrays(exchange, symbol, _book_side(side))
+        if arrays is None:
+            if self.require_book:
+                SLIPPAGE_CHECKS_TOTAL.labels(exchange, 'rejected').inc()
+                return amount, f'Нет согласованного стакана {symbol} на {exchange} для проверки проскальзывания'
+            SLIPPAGE_CHECKS_TOTAL.labels(exchange, 'no_book').inc()
+            return amount, None
+
+        prices, quantities = arrays
+        estimate = walk_depth(prices, quantities, side, qty=qty, notional=notional)
+        slippage = estimate.slippage_bps[0]
+        if estimate.complete[0] and slippage <= self.tolerance_bps:
+            SLIPPAGE_CHECKS_TOTAL.labels(exchange, 'ok').inc()
+            return amount, None
+
+        if self.mode == 'downsize':
+            allowed = self._round_size(exchange, symbol, unit,
+                                       max_size_within(prices, quantities, side, self.tolerance_bps, unit))
+            if allowed > 0:
+                SLIPPAGE_CHECKS_TOTAL.labels(exchange, 'downsized').inc()
+                return min(amount, allowed), None
+
+        SLIPPAGE_CHECKS_TOTAL.labels(exchange, 'rejected').inc()
+        if not estimate.complete[0]:
+            return amount, f'Глубины стакана {symbol} недостаточно для ордера {amount}'
+        return amount, (f'Ожидаемое проскальзывание {slippage:.1f} б.п. больше допустимого '
+                        f'{self.tolerance_bps:.1f} б.п. для {symbol}')
+
+
+    def _round_size(self, exchange, symbol, unit, size):
+        """Округляет размер вниз до шага инструмента, чтобы биржа его приняла"""
+        registry = self.instruments.get(exchange)
+        if registry is None or registry.get(symbol) is None:
+            return float(round_to_step(size, DEFAULT_SIZE_STEP))
+        if unit == 'qty':
+            return registry.round_qty(symbol, size)
+        return registry.round_notional(symbol, size)
+
+
+_default_guard = None
+_default_guard_lock = threading.Lock()
+
+
+def get_default_guard(exchange=None, instruments=None):
+    """
+    Общая проверка проскальзывания клиентов бирж по умолчанию: стаканы
+    LiveOrderBooks, допуск, режим и политика из risk_limits. None, если
+    risk_limits.slippage_mode = 'off'.
+
+    Пока стакана пары нет, ордер не ждет его и проходит без проверки; только
+    при require_order_book первый ордер пары ждет снимок до
+    live_books.DEFAULT_WAIT секунд, прежде чем будет отклонен.
+
+    Args:
+        exchange (str): Биржа клиента, для которого запрашивается проверка
+        instruments (InstrumentRegistry): Реестр инструментов этой биржи
+    """
+    global _default_guard
+    with _default_guard_lock:
+        settings = get_slippage_settings()
+        if settings['mode'] == MODE_OFF:
+            return None
+        if _default_guard is None:
+            from market_data.live_books import DEFAULT_WAIT, LiveOrderBooks
+            books = LiveOrderBooks(wait=DEFAULT_WAIT if settings['require_book'] else 0.0)
+            _default_guard = SlippageGuard.from_risk_limits(books)
+        if instruments is not None:
+            _default_guard.instruments[exchange] = instruments
+        return _default_guard
@@ -0,0 +1,200 @@
+"""
+Загрузка исторических свечей OHLCV с Bybit и OKX.
+
+Диапазон разбивается на сегменты, выровненные по сетке времени; сегменты
+скачиваются параллельно (постранично назад во времени); частоту запросов
+ограничивает планировщик клиента биржи (src.rate_limiter) с приоритетом
+рыночных данных, поэтому загрузка не задерживает ордера. Завершенные сегменты сохраняются на диск, поэтому
+прерванная загрузка продолжается с места остановки, а пересекающиеся
+диапазоны не скачиваются повторно.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src import bybit, okx
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HISTORY_DIR = os.path.join(BASE_DIR, 'data', 'history')
+
+INTERVAL_MS = {
+    "1m": 60_000,
+    "3m": 180_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "30m": 1_800_000,
+    "1h": 3_600_000,
+    "2h": 7_200_000,
+    "4h": 14_400_000,
+    "6h": 21_600_000,
+    "12h": 43_200_000,
+    "1d": 86_400_000,
+    "1w": 604_800_000
+}
+
+# Размер страницы свечей для каждой биржи
+PAGE_LIMIT = {'bybit': bybit.KLINE_MAX_LIMIT, 'okx': okx.HISTORY_KLINE_MAX_LIMIT}
+
+PAGES_PER_SEGMENT = 10
+MAX_PAGE_ATTEMPTS = 3
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+def _fetch_page(exchange, client, symbol, interval, seg_start, cursor_end):
+    """Одна страница свечей в [seg_start, cursor_end) по возрастанию времени"""
+    if exchange == 'bybit':
+        rows = client.get_klines(symbol, interval, start=seg_start, end=cursor_end - 1,
+                                 limit=PAGE_LIMIT['bybit'])
+    else:
+        rows = client.get_history_klines(symbol, interval, after=cursor_end, before=seg_start - 1,
+                                         limit=PAGE_LIMIT['okx'])
+    return [row for row in rows if seg_start <= row[0] < cursor_end]
+
+
+def _to_array(rows):
+    if not rows:
+        return np.empty((0, len(OHLCV_COLUMNS)), dtype=np.float64)
+    return np.asarray(rows, dtype=np.float64)
+
+
+def _dedupe(array):
+    """Сортирует свечи по времени и удаляет повторы (оставляет последнюю версию свечи)"""
+    if len(array) == 0:
+        return array
+    array = array[np.argsort(array[:, 0], kind='stable')]
+    keep = np.ones(len(array), dtype=bool)
+    keep[:-1] = array[1:, 0] != array[:-1, 0]
+    return array[keep]
+
+
+def to_dataframe(array):
+    """Массив (N, 6) -> DataFrame с timestamp в мс (int64) и колонками OHLCV"""
+    df = pd.DataFrame(array, columns=OHLCV_COLUMNS)
+    df['timestamp'] = df['timestamp'].astype(np.int64)
+    return df
+
+
+class HistoryDownloader:
+    """
+    Параллельный загрузчик истории свечей.
+
+    Args:
+        clients (dict): {'bybit': BybitClient, 'okx': OkxClient}; по умолчанию - клиенты модулей
+        max_workers (int): Число параллельных потоков загрузки
+        cache_dir (str): Каталог сегментов для продолжения загрузки (None - без кэша)
+    """
+
+    def __init__(self, clients=None, max_workers=4, cache_dir=HISTORY_DIR):
+        self.clients = clients or {
+            'bybit': bybit.get_default_client(),
+            'okx': okx.get_default_client()
+        }
+        self.max_workers = max_workers
+        self.cache_dir = cache_dir
+
+    def _segment_path(self, exchange, symbol, interval, seg_start, seg_end):
+        return os.path.join(self.cache_dir, exchange, symbol, interval, f"{seg_start}_{seg_end}.npy")
+
+    def _segments(self, exchange, interval, start, end):
+        span = INTERVAL_MS[interval] * PAGE_LIMIT[exchange] * PAGES_PER_SEGMENT
+        first = (start // span) * span
+        return [(seg_start, seg_start + span) for seg_start in range(first, end, span)]
+
+    def _download_segment(self, exchange, symbol, interval, seg_start, seg_end):
+        path = None
+        if self.cache_dir:
+            path = self._segment_path(exchange, symbol, interval, seg_start, seg_end)
+            if os.path.exists(path):
+                return np.load(path)
+
+        client = self.clients[exchange]
+        cursor_end = seg_end
+        pages = []
+
+        while cursor_end > seg_start:
+            for attempt in range(MAX_PAGE_ATTEMPTS):
+                try:
+                    rows = _fetch_page(exchange, client, symbol, interval, seg_start, cursor_end)
+                    break
+                except Exception as e:
+                    if attempt + 1 == MAX_PAGE_ATTEMPTS:
+                        raise
+                    print(f"Повтор загрузки {exchange} {symbol} {interval}: {e}")
+                    time.sleep(0.5 * (attempt + 1))
+
+            if not rows:
+                break
+            pages.append(_to_array(rows))
+            cursor_end = rows[0][0]
+
+        array = _dedupe(np.concatenate(pages)) if pages else _to_array([])
+
+        # Сегмент, который еще может пополниться новыми свечами, не кэшируется
+        now_ms = int(time.time() * 1000)
+        if path and seg_end + INTERVAL_MS[interval] <= now_ms:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + '.tmp.npy'
+            np.save(tmp_path, array)
+            os.replace(tmp_path, path)
+        return array
+
+    def download(self, exchange, symbol, interval, start, end, store=None):
+        """
+        Загружает свечи одной пары за диапазон [start, end) в мс.
+
+        Returns:
+            pandas.DataFrame: timestamp (мс), open, high, low, close, volume
+        """
+        return self.download_many([(exchange, symbol, interval, start, end)], store)[(exchange, symbol, interval)]
+
+    def download_many(self, jobs, store=None):
+        """
+        Загружает несколько пар и интервалов одновременно.
+
+        Args:
+            jobs (list): Кортежи (exchange, symbol, interval, start_ms, end_ms)
+            store (CandleStore): Если задано, результаты дописываются в хранилище свечей
+
+        Returns:
+            dict: {(exchange, symbol, interval): DataFrame}
+        """
+        tasks = []
+        for exchange, symbol, interval, start, end in jobs:
+            if exchange not in self.clients:
+                raise ValueError(f"Неизвестная биржа: {exchange}")
+            if interval not in INTERVAL_MS:
+                raise ValueError(f"Интервал {interval} не поддерживается. Доступные: {list(INTERVAL_MS)}")
+            for seg_start, seg_end in self._segments(exchange, interval, start, end):
+                tasks.append((exchange, symbol, interval, seg_start, seg_end))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {task: executor.submit(self._download_segment, *task) for task in tasks}
+            segments = {task: future.result() for task, future in futures.items()}
+
+        results = {}
+        for exchange, symbol, interval, start, end in jobs:
+            parts = [array for (ex, sym, itv, _, _), array in segments.items()
+                     if (ex, sym, itv) == (exchange, symbol, interval)]
+            parts.append(_to_array([]))
+            array = _dedupe(np.concatenate(parts))
+            array = array[(array[:, 0] >= start) & (array[:, 0] < end)]
+
+            key = (exchange, symbol, interval)
+            if key in results:
+                array = _dedupe(np.concatenate([results[key].to_numpy(dtype=np.float64), array]))
+            results[key] = to_dataframe(array)
+
+        if store is not None:
+            for (exchange, symbol, interval), df in results.items():
+                store.append_frame(exchange, symbol, interval, df)
+        return results
+
+
+def download_history(exchange, symbol, interval, start, end, **kwargs):
+    """Загружает историю одной пары загрузчиком с настройками по умолчанию"""
+    return HistoryDownloader(**kwargs).download(exchange, symbol, interval, start, end)
@@ -8,10 +8,46 @@ from .orderbook_feed import (
     get_best_ask,
     check_liquidity
 )
+from .order_book import (
+    OrderBook,
+    OrderBookManager
+)
+from .fill_estimator import (
+    FillEstimate,
+    SlippageGuard,
+    estimate_fill,
+    walk_depth
+)
+from .live_books import LiveOrderBooks
+from .book_recorder import (
+    BookRecorder,
+    BookReplay
+)
+from .ws_feed import (
+    MarketEvent,
+    MarketDataBus,
+    BybitStream,
+    OkxStream,
+    create_stream
+)
 
 __all__ = [
     'load_order_book_from_csv',
     'get_best_bid', 
     'get_best_ask',
-    'check_liquidity'
+    'check_liquidity',
+    'OrderBook',
+    'OrderBookManager',
+    'FillEstimate',
+    'SlippageGuard',
+    'estimate_fill',
+    'walk_depth',
+    'LiveOrderBooks',
+    'BookRecorder',
+    'BookReplay',
+    'MarketEvent',
+    'MarketDataBus',
+    'BybitStream',
+    'OkxStream',
+    'create_stream'
 ]
\ No newline at end of file
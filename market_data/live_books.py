@@ -0,0 +1,108 @@
+"""
+Стаканы в реальном времени для проверок ордеров перед отправкой.
+
+Синхронные клиенты бирж (CLI, веб-сервер) работают без цикла событий,
+поэтому потоки стаканов WebSocket запускаются в фоновом потоке со своим
+циклом asyncio. Пара подписывается при первом обращении к ее стакану; по
+умолчанию обращение не ждет снимка и возвращает None, пока его нет;
+при разрыве последовательности или неверной контрольной сумме соединение
+переоткрывается и стакан приходит новым снимком.
+"""
+
+import asyncio
+import threading
+import time
+
+from market_data.order_book import OrderBookManager
+from market_data.ws_feed import MarketDataBus, create_stream
+
+EXCHANGES = ('bybit', 'okx')
+DEFAULT_DEPTH = 50
+# Ожидание первого снимка для тех, кто его запрашивает (wait=DEFAULT_WAIT)
+DEFAULT_WAIT = 3.0
+POLL_INTERVAL = 0.05
+
+
+class LiveOrderBooks(OrderBookManager):
+    """
+    OrderBookManager, который сам подписывается на стаканы нужных пар.
+
+    Args:
+        depth (int): Глубина подписки на стакан
+        wait (float): Сколько ждать согласованного стакана при первом обращении
+                      к паре, с (0 - не ждать)
+        urls (dict): Адреса WebSocket по биржам (например, локальный стенд)
+    """
+
+    def __init__(self, depth=DEFAULT_DEPTH, wait=0.0, urls=None):
+        self.bus = MarketDataBus()
+        super().__init__(self.bus, on_desync=self._resync)
+        self.depth = depth
+        self.wait = wait
+        self.urls = urls or {}
+        self.lock = threading.Lock()
+        self.watched = set()
+
+        self._streams = {}
+        self._loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            self._streams = {exchange: create_stream(exchange, self.bus, url=self.urls.get(exchange))
+                             for exchange in EXCHANGES}
+            self._thread = threading.Thread(target=self._run, name='live-order-books', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(asyncio.gather(*(stream.run() for stream in self._streams.values())))
+        finally:
+            self._loop.close()
+
+    def watch(self, exchange, symbol):
+        """Подписывается на стакан пары, если подписки еще нет"""
+        key = (exchange, symbol)
+        if key in self.watched:
+            return
+        if exchange not in EXCHANGES:
+            raise ValueError(f"Неизвестная биржа: {exchange}")
+        self._start()
+        self.watched.add(key)
+        self._loop.call_soon_threadsafe(self._streams[exchange].subscribe, 'orderbook', symbol, '1m', self.depth)
+
+    def on_event(self, event):
+        with self.lock:
+            return super().on_event(event)
+
+    def _resync(self, book):
+        self._streams[book.exchange].resync()
+
+    def depth_arrays(self, exchange, symbol, side):
+        """
+        Массивы стороны стакана; при первом обращении к паре подписывается
+        на нее и ждет согласованного стакана до wait секунд (None - стакана нет).
+        """
+        first = (exchange, symbol) not in self.watched
+        self.watch(exchange, symbol)
+        deadline = time.monotonic() + (self.wait if first else 0.0)
+        while True:
+            with self.lock:
+                arrays = super().depth_arrays(exchange, symbol, side)
+            if arrays is not None or time.monotonic() >= deadline:
+                return arrays
+            time.sleep(POLL_INTERVAL)
+
+    def close(self):
+        """Останавливает потоки и фоновый цикл"""
+        if self._thread is None:
+            return
+        for stream in self._streams.values():
+            self._loop.call_soon_threadsafe(stream.stop)
+        self._thread.join(timeout=5)
+        self._thread = None
@@ -0,0 +1,289 @@
+"""
+Стакан L2 с инкрементальными обновлениями.
+
+Уровни каждой стороны хранятся отсортированным списком цен (поиск места
+уровня - bisect, O(log n)) и словарем цена -> объем. Лучшие цены берутся
+из начала списков за O(1). Снимки и дельты приходят событиями MarketEvent
+канала 'orderbook' (market_data.ws_feed): уровни - строки [price, qty],
+объем 0 удаляет уровень.
+
+Целостность проверяется по правилам бирж:
+    OKX   - prevSeqId дельты равен seqId предыдущего сообщения и crc32
+            первых 25 уровней совпадает с checksum сообщения;
+    Bybit - номер обновления u растет на 1 (u=1 - новый снимок).
+При расхождении стакан помечается рассинхронизированным и до следующего
+снимка дельты не применяет.
+"""
+
+import zlib
+from bisect import bisect_left
+
+import numpy as np
+
+from src.metrics import ORDERBOOK_RESYNCS_TOTAL, ORDERBOOK_UPDATES_TOTAL
+
+CHECKSUM_LEVELS = 25
+
+
+class BookSide:
+    """
+    Одна сторона стакана.
+
+    Ключи уровней упорядочены от лучшей цены: у асков - цена, у бидов -
+    цена со знаком минус, поэтому лучший уровень всегда первый.
+    """
+
+    __slots__ = ('is_bid', '_keys', '_qty', '_text')
+
+    def __init__(self, is_bid):
+        self.is_bid = is_bid
+        self._keys = []
+        self._qty = {}
+        self._text = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def clear(self):
+        self._keys.clear()
+        self._qty.clear()
+        self._text.clear()
+
+    def update(self, price, qty):
+        """Устанавливает объем уровня (строки или числа); 0 удаляет уровень"""
+        price_value = float(price)
+        qty_value = float(qty)
+        key = -price_value if self.is_bid else price_value
+        if qty_value <= 0:
+            if self._qty.pop(key, None) is not None:
+                self._text.pop(key, None)
+                del self._keys[bisect_left(self._keys, key)]
+            return
+        if key not in self._qty:
+            position = bisect_left(self._keys, key)
+            self._keys.insert(position, key)
+        self._qty[key] = qty_value
+        self._text[key] = (price, qty) if isinstance(price, str) else None
+
+    def best(self):
+        """(цена, объем) лучшего уровня или None"""
+        if not self._keys:
+            return None
+        key = self._keys[0]
+        return (-key if self.is_bid else key), self._qty[key]
+
+    def levels(self, count=None):
+        """[(цена, объем)] от лучшего уровня"""
+        keys = self._keys if count is None else self._keys[:count]
+        sign = -1.0 if self.is_bid else 1.0
+        return [(sign * key, self._qty[key]) for key in keys]
+
+    def arrays(self, count=None):
+        """Цены и объемы count лучших уровней как np.ndarray float64"""
+        keys = self._keys if count is None else self._keys[:count]
+        prices = np.fromiter(keys, dtype=np.float64, count=len(keys))
+        if self.is_bid:
+            prices = -prices
+        quantities = np.fromiter((self._qty[key] for key in keys), dtype=np.float64, count=len(keys))
+        return prices, quantities
+
+    def text_levels(self, count):
+        """Уровни строками, как их прислала биржа (для контрольной суммы)"""
+        result = []
+        for key in self._keys[:count]:
+            text = self._text.get(key)
+            if text is None:
+                price = -key if self.is_bid else key
+                text = (repr(price), repr(self._qty[key]))
+            result.append(text)
+        return result
+
+
+class OrderBook:
+    """
+    Стакан одной пары на одной бирже.
+
+    Пример:
+        book = OrderBook('okx', 'BTC-USDT')
+        book.apply(event.data)              # снимок или дельта из ws_feed
+        book.best_bid(), book.best_ask(), book.cumulative_depth('asks', 10)
+    """
+
+    def __init__(self, exchange=None, symbol=None, validate=True):
+        self.exchange = exchange
+        self.symbol = symbol
+        self.validate = validate
+        self.bids = BookSide(True)
+        self.asks = BookSide(False)
+        self.seq = None
+        self.synced = False
+        self.timestamp = None
+        self.stats = {'snapshots': 0, 'deltas': 0, 'skipped': 0, 'gaps': 0, 'checksum_errors': 0}
+
+    @classmethod
+    def from_levels(cls, bids, asks, exchange=None, symbol=None):
+        """Стакан из списков [price, qty] (например, load_order_book_from_csv)"""
+        book = cls(exchange, symbol, validate=False)
+        book.apply_snapshot(bids, asks)
+        return book
+
+    def side(self, name):
+        return self.bids if name in ('bids', 'bid', 'buy') else self.asks
+
+    def apply_snapshot(self, bids, asks, seq=None):
+        self.bids.clear()
+        self.asks.clear()
+        for price, qty in bids:
+            self.bids.update(price, qty)
+        for price, qty in asks:
+            self.asks.update(price, qty)
+        self.seq = seq
+        self.synced = True
+        self.stats['snapshots'] += 1
+
+    def apply_delta(self, bids, asks, seq=None):
+        for price, qty in bids:
+            self.bids.update(price, qty)
+        for price, qty in asks:
+            self.asks.update(price, qty)
+        if seq is not None:
+            self.seq = seq
+        self.stats['deltas'] += 1
+
+    def apply(self, data, timestamp=None):
+        """
+        Применяет сообщение канала 'orderbook' (data события MarketEvent).
+
+        Returns:
+            bool: True, если стакан после сообщения согласован с биржей
+        """
+        action = data.get('action', 'snapshot')
+        seq = data.get('seq')
+        if action == 'snapshot' or (self.exchange == 'bybit' and seq == 1):
+            self.apply_snapshot(data.get('bids', []), data.get('asks', []), seq)
+            ORDERBOOK_UPDATES_TOTAL.labels(self.exchange or '', 'snapshot').inc()
+        else:
+            if not self.synced:
+                self.stats['skipped'] += 1
+                return False
+            if self.validate and self._is_stale(data):
+                self.stats['skipped'] += 1
+                return True
+            if self.validate and not self._in_sequence(data):
+                self.stats['gaps'] += 1
+                return self._desync('gap')
+            self.apply_delta(data.get('bids', []), data.get('asks', []), seq)
+            ORDERBOOK_UPDATES_TOTAL.labels(self.exchange or '', 'delta').inc()
+
+        self.timestamp = timestamp if timestamp is not None else self.timestamp
+        checksum = data.get('checksum')
+        if self.validate and checksum is not None and self.checksum() != int(checksum):
+            self.stats['checksum_errors'] += 1
+            return self._desync('checksum')
+        return True
+
+    def _is_stale(self, data):
+        # Повтор уже примененного обновления Bybit (у OKX есть prev_seq)
+        seq = data.get('seq')
+        return (data.get('prev_seq') is None and seq is not None and self.seq is not None
+                and int(seq) <= int(self.seq))
+
+    def _in_sequence(self, data):
+        seq = data.get('seq')
+        if seq is None or self.seq is None:
+            return True
+        prev_seq = data.get('prev_seq')
+        if prev_seq is not None:
+            return int(prev_seq) == int(self.seq)
+        return int(seq) == int(self.seq) + 1
+
+    def _desync(self, reason):
+        self.synced = False
+        ORDERBOOK_RESYNCS_TOTAL.labels(self.exchange or '', reason).inc()
+        return False
+
+    def checksum(self, levels=CHECKSUM_LEVELS):
+        """
+        Контрольная сумма OKX: crc32 строки 'bid:size:ask:size:...' по
+        levels лучшим уровням, со знаком (int32).
+        """
+        bids = self.bids.text_levels(levels)
+        asks = self.asks.text_levels(levels)
+        parts = []
+        for i in range(max(len(bids), len(asks))):
+            if i < len(bids):
+                parts.extend(bids[i])
+            if i < len(asks):
+                parts.extend(asks[i])
+        value = zlib.crc32(':'.join(parts).encode())
+        return value - (1 << 32) if value >= (1 << 31) else value
+
+    def best_bid(self):
+        best = self.bids.best()
+        return best[0] if best else None
+
+    def best_ask(self):
+        best = self.asks.best()
+        return best[0] if best else None
+
+    def mid_price(self):
+        bid, ask = self.best_bid(), self.best_ask()
+        return (bid + ask) / 2 if bid is not None and ask is not None else None
+
+    def spread(self):
+        bid, ask = self.best_bid(), self.best_ask()
+        return ask - bid if bid is not None and ask is not None else None
+
+    def depth(self, side, levels=None):
+        """Суммарный объем levels лучших уровней стороны ('bids' или 'asks')"""
+        return float(self.side(side).arrays(levels)[1].sum())
+
+    def cumulative_depth(self, side, levels=None):
+        """Цены и накопленный объем по уровням: (np.ndarray, np.ndarray)"""
+        prices, quantities = self.side(side).arrays(levels)
+        return prices, np.cumsum(quantities)
+
+    def to_dict(self, levels=None):
+        """Стакан в формате load_order_book_from_csv: {'bids': [[p, q]], 'asks': [[p, q]]}"""
+        return {
+            'bids': [list(level) for level in self.bids.levels(levels)],
+            'asks': [list(level) for level in self.asks.levels(levels)]
+        }
+
+
+class OrderBookManager:
+    """
+    Стаканы всех пар из шины MarketDataBus.
+
+    on_desync(book) вызывается при разрыве последовательности или
+    несовпадении контрольной суммы - например, чтобы переподписаться на
+    канал и получить новый снимок.
+    """
+
+    def __init__(self, bus=None, on_desync=None, validate=True):
+        self.books = {}
+        self.on_desync = on_desync
+        self.validate = validate
+        self._token = bus.subscribe(self.on_event, channel='orderbook') if bus is not None else None
+
+    def book(self, exchange, symbol):
+        key = (exchange, symbol)
+        book = self.books.get(key)
+        if book is None:
+            book = OrderBook(exchange, symbol, validate=self.validate)
+            self.books[key] = book
+        return book
+
+    def depth_arrays(self, exchange, symbol, side):
+        """Массивы (цены, объемы) стороны 'bids'/'asks' согласованного стакана или None"""
+        book = self.books.get((exchange, symbol))
+        if book is None or not book.synced:
+            return None
+        return book.side(side).arrays()
+
+    def on_event(self, event):
+        book = self.book(event.exchange, event.symbol)
+        was_synced = book.synced
+        if not book.apply(event.data, event.exchange_ts) and was_synced and self.on_desync:
+            self.on_desync(book)
+        return book
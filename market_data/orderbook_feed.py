@@ -1,8 +1,10 @@
 import pandas as pd
 import os
 
+from .order_book import OrderBook
 
-def load_order_book_from_csv(symbol='BTCUSDT', file_path=None):
+
+def load_order_book_from_csv(symbol='BTCUSDT', file_path=None, as_book=False):
     if file_path is None:
         file_path = f"data/{symbol}_orderbook.csv"
 
@@ -14,6 +16,9 @@ def load_order_book_from_csv(symbol='BTCUSDT', file_path=None):
     bids = df[df['type'] == 'bid'][['price', 'quantity']]
     asks = df[df['type'] == 'ask'][['price', 'quantity']]
 
+    if as_book:
+        return OrderBook.from_levels(bids.values.tolist(), asks.values.tolist(), symbol=symbol)
+
     return {
         'bids': bids.values.tolist(),
         'asks': asks.values.tolist()
@@ -22,6 +27,8 @@ def load_order_book_from_csv(symbol='BTCUSDT', file_path=None):
 
 def get_best_bid(order_book):
 
+    if isinstance(order_book, OrderBook):
+        return order_book.best_bid()
     if order_book['bids']:
         return max(order_book['bids'], key=lambda x: x[0])[0]
     return None
@@ -29,6 +36,8 @@ def get_best_bid(order_book):
 
 def get_best_ask(order_book):
 
+    if isinstance(order_book, OrderBook):
+        return order_book.best_ask()
     if order_book['asks']:
         return min(order_book['asks'], key=lambda x: x[0])[0]
     return None
@@ -36,7 +45,11 @@ def get_best_ask(order_book):
 
 def check_liquidity(order_book, threshold=2):
 
-    total_bid_volume = sum(qty for _, qty, _ in order_book['bids'])
-    total_ask_volume = sum(qty for _, qty, _ in order_book['asks'])
+    if isinstance(order_book, OrderBook):
+        total_bid_volume = order_book.depth('bids')
+        total_ask_volume = order_book.depth('asks')
+    else:
+        total_bid_volume = sum(level[1] for level in order_book['bids'])
+        total_ask_volume = sum(level[1] for level in order_book['asks'])
 
-    return total_bid_volume >= threshold and total_ask_volume >= threshold
\ No newline at end of file
+    return total_bid_volume >= threshold and total_ask_volume >= threshold
@@ -0,0 +1,411 @@
+"""
+Потоковые рыночные данные Bybit v5 и OKX v5 через WebSocket.
+
+Потоки подписываются на публичные каналы свечей, тикеров, сделок и стакана,
+переподключаются с экспоненциальной задержкой, повторяют подписки после
+переподключения и публикуют нормализованные события MarketEvent в шину
+MarketDataBus, на которую подписывается движок стратегий.
+"""
+
+import asyncio
+import inspect
+import json
+import random
+import time
+from collections import namedtuple
+
+import websockets
+
+from src.bybit import convert_interval as bybit_interval
+from src.okx import convert_interval as okx_interval
+
+BYBIT_SPOT_WS_URL = "wss://stream.bybit.com/v5/public/spot"
+OKX_PUBLIC_WS_URL = "wss://ws.okx.com:8443/ws/v5/public"
+OKX_BUSINESS_WS_URL = "wss://ws.okx.com:8443/ws/v5/business"
+
+CHANNELS = ('kline', 'ticker', 'trade', 'orderbook')
+
+# Событие рыночных данных.
+# data для каналов:
+#   kline     - {'interval', 'start', 'open', 'high', 'low', 'close', 'volume', 'confirm'}
+#   ticker    - {'last', 'bid', 'ask', 'bid_size', 'ask_size', 'volume_24h'}
+#   trade     - {'price', 'qty', 'side', 'trade_id'}
+#   orderbook - {'action': 'snapshot'|'delta', 'bids', 'asks', 'seq', 'prev_seq', 'checksum'},
+#               уровни передаются строками [price, qty] без потери точности
+# exchange_ts - время биржи в мс, recv_ts - time.time() в момент получения сообщения
+MarketEvent = namedtuple('MarketEvent', ['exchange', 'channel', 'symbol', 'data', 'exchange_ts', 'recv_ts'])
+
+Subscription = namedtuple('Subscription', ['channel', 'symbol', 'interval', 'depth'])
+
+
+def _float(value):
+    return float(value) if value not in (None, "") else None
+
+
+class MarketDataBus:
+    """
+    Шина событий рыночных данных.
+
+    Подписчик - функция или корутина, принимающая MarketEvent. Фильтры
+    exchange/channel/symbol со значением None пропускают все события.
+    """
+
+    def __init__(self):
+        self._subscribers = []
+
+    def subscribe(self, callback, channel=None, symbol=None, exchange=None):
+        """Регистрирует обработчик; возвращает токен для unsubscribe"""
+        token = (callback, channel, symbol, exchange)
+        self._subscribers.append(token)
+        return token
+
+    def unsubscribe(self, token):
+        if token in self._subscribers:
+            self._subscribers.remove(token)
+
+    async def publish(self, event):
+        for callback, channel, symbol, exchange in list(self._subscribers):
+            if channel is not None and channel != event.channel:
+                continue
+            if symbol is not None and symbol != event.symbol:
+                continue
+            if exchange is not None and exchange != event.exchange:
+                continue
+            try:
+                result = callback(event)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                print(f"Ошибка обработчика рыночных данных: {e}")
+
+
+class ExchangeStream:
+    """
+    Базовый поток: соединения, переподключение, подписки и heartbeat.
+
+    Наследники задают URL по подписке, формат сообщений подписки и ping,
+    а также разбор входящих сообщений в MarketEvent.
+    """
+
+    exchange = ''
+    ping_interval = 20
+
+    def __init__(self, bus, url=None, reconnect_delay=1.0, max_reconnect_delay=30.0):
+        self.bus = bus
+        self.url = url
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self.subscriptions = {}
+        self.stats = {'messages': 0, 'events': 0, 'reconnects': 0, 'errors': 0}
+
+        self._connections = {}
+        self._tasks = {}
+        self._stopped = None
+
+    def subscribe(self, channel, symbol, interval='1m', depth=50):
+        """
+        Добавляет подписку. Если поток уже запущен, подписка отправляется сразу.
+
+        Args:
+            channel (str): 'kline', 'ticker', 'trade' или 'orderbook'
+            symbol (str): Торговая пара в формате биржи
+            interval (str): Интервал свечей ('1m', '15m', '1h', ...)
+            depth (int): Глубина стакана
+        """
+        if channel not in CHANNELS:
+            raise ValueError(f"Неизвестный канал: {channel}. Доступные: {CHANNELS}")
+
+        subscription = Subscription(channel, symbol, interval, depth)
+        key = self.topic(subscription)
+        self.subscriptions[key] = subscription
+
+        if self._stopped is not None and not self._stopped.is_set():
+            url = self.url_for(subscription)
+            websocket = self._connections.get(url)
+            if websocket is not None:
+                asyncio.ensure_future(self._send_subscribe(websocket, [subscription]))
+            elif url not in self._tasks:
+                self._tasks[url] = asyncio.ensure_future(self._run_connection(url))
+        return key
+
+    def topic(self, subscription):
+        raise NotImplementedError
+
+    def url_for(self, subscription):
+        raise NotImplementedError
+
+    def subscribe_messages(self, subscriptions):
+        raise NotImplementedError
+
+    def ping_message(self):
+        raise NotImplementedError
+
+    def parse_message(self, message, recv_ts):
+        raise NotImplementedError
+
+    async def _send_subscribe(self, websocket, subscriptions):
+        for message in self.subscribe_messages(subscriptions):
+            await websocket.send(message)
+
+    async def _ping_loop(self, websocket):
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            await websocket.send(self.ping_message())
+
+    async def _run_connection(self, url):
+        delay = self.reconnect_delay
+        while not self._stopped.is_set():
+            try:
+                async with websockets.connect(url, ping_interval=None, max_size=None) as websocket:
+                    self._connections[url] = websocket
+                    subscriptions = [sub for sub in self.subscriptions.values() if self.url_for(sub) == url]
+                    await self._send_subscribe(websocket, subscriptions)
+                    delay = self.reconnect_delay
+
+                    ping_task = asyncio.ensure_future(self._ping_loop(websocket))
+                    try:
+                        async for message in websocket:
+                            recv_ts = time.time()
+                            self.stats['messages'] += 1
+                            try:
+                                events = self.parse_message(message, recv_ts)
+                            except (ValueError, KeyError, TypeError, IndexError, AttributeError) as e:
+                                # Одно битое сообщение не должно рвать соединение
+                                self.stats['errors'] += 1
+                                print(f"[{self.exchange}] Ошибка разбора сообщения, пропущено: {e}")
+                                continue
+                            for event in events:
+                                self.stats['events'] += 1
+                                await self.bus.publish(event)
+                    finally:
+                        ping_task.cancel()
+                        self._connections.pop(url, None)
+            except asyncio.CancelledError:
+                raise
+            except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:
+                self.stats['errors'] += 1
+                print(f"[{self.exchange}] Ошибка WebSocket {url}: {e}")
+
+            if self._stopped.is_set():
+                break
+            self.stats['reconnects'] += 1
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def run(self):
+        """Запускает соединения по всем подпискам и работает до вызова stop()"""
+        self._stopped = asyncio.Event()
+        for url in {self.url_for(sub) for sub in self.subscriptions.values()}:
+            self._tasks[url] = asyncio.ensure_future(self._run_connection(url))
+
+        await self._stopped.wait()
+
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+
+    def resync(self):
+        """
+        Разрывает текущие соединения: после переподключения подписки
+        повторяются, и стаканы приходят новыми снимками
+        """
+        for websocket in list(self._connections.values()):
+            asyncio.ensure_future(websocket.close())
+
+    def stop(self):
+        if self._stopped is not None:
+            self._stopped.set()
+
+
+class BybitStream(ExchangeStream):
+    """Публичные спотовые потоки Bybit v5"""
+
+    exchange = 'bybit'
+    ping_interval = 20
+    max_args_per_request = 10
+
+    def topic(self, subscription):
+        channel, symbol = subscription.channel, subscription.symbol
+        if channel == 'kline':
+            return f"kline.{bybit_interval(subscription.interval)}.{symbol}"
+        if channel == 'ticker':
+            return f"tickers.{symbol}"
+        if channel == 'trade':
+            return f"publicTrade.{symbol}"
+        return f"orderbook.{subscription.depth}.{symbol}"
+
+    def url_for(self, subscription):
+        return self.url or BYBIT_SPOT_WS_URL
+
+    def subscribe_messages(self, subscriptions):
+        topics = [self.topic(sub) for sub in subscriptions]
+        step = self.max_args_per_request
+        return [json.dumps({"op": "subscribe", "args": topics[i:i + step]})
+                for i in range(0, len(topics), step)]
+
+    def ping_message(self):
+        return json.dumps({"op": "ping"})
+
+    def parse_message(self, message, recv_ts):
+        msg = json.loads(message)
+        topic = msg.get('topic')
+        if topic is None:
+            if msg.get('op') == 'subscribe' and not msg.get('success', True):
+                print(f"[bybit] Ошибка подписки: {msg.get('ret_msg')}")
+            return []
+
+        subscription = self.subscriptions.get(topic)
+        if subscription is None:
+            return []
+
+        symbol = subscription.symbol
+        data = msg.get('data')
+        ts = msg.get('ts')
+
+        if subscription.channel == 'kline':
+            return [MarketEvent('bybit', 'kline', symbol, {
+                'interval': subscription.interval,
+                'start': int(item['start']),
+                'open': float(item['open']),
+                'high': float(item['high']),
+                'low': float(item['low']),
+                'close': float(item['close']),
+                'volume': float(item['volume']),
+                'confirm': bool(item.get('confirm'))
+            }, item.get('timestamp', ts), recv_ts) for item in data]
+
+        if subscription.channel == 'ticker':
+            return [MarketEvent('bybit', 'ticker', symbol, {
+                'last': _float(data.get('lastPrice')),
+                'bid': _float(data.get('bid1Price')),
+                'ask': _float(data.get('ask1Price')),
+                'bid_size': _float(data.get('bid1Size')),
+                'ask_size': _float(data.get('ask1Size')),
+                'volume_24h': _float(data.get('volume24h'))
+            }, ts, recv_ts)]
+
+        if subscription.channel == 'trade':
+            return [MarketEvent('bybit', 'trade', symbol, {
+                'price': float(item['p']),
+                'qty': float(item['v']),
+                'side': item['S'].lower(),
+                'trade_id': item.get('i')
+            }, item.get('T', ts), recv_ts) for item in data]
+
+        return [MarketEvent('bybit', 'orderbook', symbol, {
+            'action': 'snapshot' if msg.get('type') == 'snapshot' else 'delta',
+            'bids': data.get('b', []),
+            'asks': data.get('a', []),
+            'seq': data.get('u'),
+            'prev_seq': None,
+            'checksum': None
+        }, msg.get('cts', ts), recv_ts)]
+
+
+class OkxStream(ExchangeStream):
+    """
+    Публичные потоки OKX v5.
+
+    Свечи OKX отдает через отдельный business-эндпоинт, поэтому поток держит
+    до двух соединений. Параметр url задает один адрес для всех каналов
+    (например, локальный стенд для тестов).
+    """
+
+    exchange = 'okx'
+    ping_interval = 25
+
+    def _arg(self, subscription):
+        channel, symbol = subscription.channel, subscription.symbol
+        if channel == 'kline':
+            return {"channel": "candle" + okx_interval(subscription.interval), "instId": symbol}
+        if channel == 'ticker':
+            return {"channel": "tickers", "instId": symbol}
+        if channel == 'trade':
+            return {"channel": "trades", "instId": symbol}
+        return {"channel": "books5" if subscription.depth <= 5 else "books", "instId": symbol}
+
+    def topic(self, subscription):
+        arg = self._arg(subscription)
+        return f"{arg['channel']}:{arg['instId']}"
+
+    def url_for(self, subscription):
+        if self.url:
+            return self.url
+        return OKX_BUSINESS_WS_URL if subscription.channel == 'kline' else OKX_PUBLIC_WS_URL
+
+    def subscribe_messages(self, subscriptions):
+        if not subscriptions:
+            return []
+        return [json.dumps({"op": "subscribe", "args": [self._arg(sub) for sub in subscriptions]})]
+
+    def ping_message(self):
+        return "ping"
+
+    def parse_message(self, message, recv_ts):
+        if message == "pong":
+            return []
+
+        msg = json.loads(message)
+        if 'event' in msg:
+            if msg['event'] == 'error':
+                print(f"[okx] Ошибка подписки: {msg.get('msg')}")
+            return []
+
+        arg = msg.get('arg', {})
+        subscription = self.subscriptions.get(f"{arg.get('channel')}:{arg.get('instId')}")
+        if subscription is None:
+            return []
+
+        symbol = subscription.symbol
+        data = msg.get('data', [])
+
+        if subscription.channel == 'kline':
+            return [MarketEvent('okx', 'kline', symbol, {
+                'interval': subscription.interval,
+                'start': int(item[0]),
+                'open': float(item[1]),
+                'high': float(item[2]),
+                'low': float(item[3]),
+                'close': float(item[4]),
+                'volume': float(item[5]),
+                'confirm': item[8] == "1" if len(item) > 8 else False
+            }, int(item[0]), recv_ts) for item in data]
+
+        if subscription.channel == 'ticker':
+            return [MarketEvent('okx', 'ticker', symbol, {
+                'last': _float(item.get('last')),
+                'bid': _float(item.get('bidPx')),
+                'ask': _float(item.get('askPx')),
+                'bid_size': _float(item.get('bidSz')),
+                'ask_size': _float(item.get('askSz')),
+                'volume_24h': _float(item.get('vol24h'))
+            }, int(item['ts']), recv_ts) for item in data]
+
+        if subscription.channel == 'trade':
+            return [MarketEvent('okx', 'trade', symbol, {
+                'price': float(item['px']),
+                'qty': float(item['sz']),
+                'side': item['side'],
+                'trade_id': item.get('tradeId')
+            }, int(item['ts']), recv_ts) for item in data]
+
+        action = msg.get('action', 'snapshot')
+        return [MarketEvent('okx', 'orderbook', symbol, {
+            'action': 'snapshot' if action == 'snapshot' or arg['channel'] == 'books5' else 'delta',
+            'bids': [level[:2] for level in item.get('bids', [])],
+            'asks': [level[:2] for level in item.get('asks', [])],
+            'seq': item.get('seqId'),
+            'prev_seq': item.get('prevSeqId'),
+            'checksum': item.get('checksum')
+        }, int(item['ts']), recv_ts) for item in data]
+
+
+def create_stream(exchange, bus, url=None, **kwargs):
+    """Создает поток для биржи 'bybit' или 'okx'"""
+    if exchange == 'bybit':
+        return BybitStream(bus, url=url, **kwargs)
+    if exchange == 'okx':
+        return OkxStream(bus, url=url, **kwargs)
+    raise ValueError(f"Неизвестная биржа: {exchange}")
@@ -0,0 +1,94 @@
+"""
+Локальный WebSocket-стенд, имитирующий публичные потоки Bybit и OKX.
+
+Используется для тестов и отладки потоков ws_feed без выхода в сеть:
+принимает подписки и ping в форматах обеих бирж, рассылает клиентам
+произвольные сообщения и умеет разрывать соединения для проверки
+переподключения.
+"""
+
+import asyncio
+import json
+
+import websockets
+
+
+class LocalExchangeStandIn:
+    """
+    Пример:
+        standin = LocalExchangeStandIn()
+        await standin.start()
+        stream = BybitStream(bus, url=standin.url)
+        ...
+        await standin.broadcast({"topic": "tickers.BTCUSDT", ...})
+    """
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.host = host
+        self.port = port
+        self.clients = set()
+        self.subscriptions = []
+        self.received = []
+        self._server = None
+        self._subscribed = asyncio.Event()
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    async def start(self):
+        self._server = await websockets.serve(self._handler, self.host, self.port)
+        self.port = next(iter(self._server.sockets)).getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handler(self, websocket, path=None):
+        self.clients.add(websocket)
+        try:
+            async for message in websocket:
+                self.received.append(message)
+                if message == "ping":
+                    await websocket.send("pong")
+                    continue
+
+                msg = json.loads(message)
+                op = msg.get('op')
+                if op == 'ping':
+                    await websocket.send(json.dumps({"op": "pong", "success": True}))
+                elif op == 'subscribe':
+                    args = msg.get('args', [])
+                    self.subscriptions.extend(args)
+                    if args and isinstance(args[0], dict):
+                        for arg in args:
+                            await websocket.send(json.dumps({"event": "subscribe", "arg": arg}))
+                    else:
+                        await websocket.send(json.dumps({"op": "subscribe", "success": True}))
+                    self._subscribed.set()
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            self.clients.discard(websocket)
+
+    async def wait_subscribed(self, timeout=5):
+        """Ждет первой подписки от клиента"""
+        await asyncio.wait_for(self._subscribed.wait(), timeout)
+        self._subscribed.clear()
+
+    async def broadcast(self, message):
+        """Отправляет сообщение (dict или str) всем подключенным клиентам"""
+        if not isinstance(message, str):
+            message = json.dumps(message)
+        for websocket in list(self.clients):
+            try:
+                await websocket.send(message)
+            except websockets.exceptions.ConnectionClosed:
+                self.clients.discard(websocket)
+
+    async def drop_clients(self):
+        """Разрывает все соединения, чтобы проверить переподключение клиентов"""
+        for websocket in list(self.clients):
+            await websocket.close()
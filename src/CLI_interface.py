@@ -1,12 +1,13 @@
 from .bybit import get_balance as bybit_balance, get_available_trading_pairs as bybit_pairs, \
-                 get_opened_positions as bybit_positions, get_some_last_kandle as bybit_kline, \
-                 place_order as bybit_order, get_info_from_json as get_info_bybit
+                 get_opened_positions as bybit_positions, place_order as bybit_order, \
+                 place_batch_orders as bybit_batch_orders, get_info_from_json as get_info_bybit
 
 from .okx import get_balance as okx_balance, get_available_trading_pairs as okx_pairs, \
-               get_opened_positions as okx_positions, get_some_last_kandle as okx_kline, \
-               place_order as okx_order, get_info_from_json as get_info_okx
+               get_opened_positions as okx_positions, place_order as okx_order, \
+               place_batch_orders as okx_batch_orders, get_info_from_json as get_info_okx
 
 from .server import start_server
+from market_data.candle_store import sync_recent
 
 import sys
 from pathlib import Path
@@ -54,11 +55,11 @@ def handle_command(command):
             exchange = parts[1].lower()
             pair = parts[2]
             if exchange == "bybit":
-                data = bybit_kline(symbol=pair)
-                plot_chart(data, f"Bybit {pair}")
+                data = sync_recent("bybit", pair)
+                plot_chart(data['close'], f"Bybit {pair}")
             elif exchange == "okx":
-                data = okx_kline(symbol=pair)
-                plot_chart(data, f"OKX {pair}")
+                data = sync_recent("okx", pair)
+                plot_chart(data['close'], f"OKX {pair}")
             else:
                 print("Неизвестная биржа. Используйте bybit или okx")
         else:
@@ -81,6 +82,33 @@ def handle_command(command):
         except ValueError:
             print("Неверная сумма. Введите число.")
     
+    elif cmd == "/batch" and len(parts) >= 3:
+        exchange = parts[1].lower()
+        try:
+            orders = []
+            for item in parts[2:]:
+                side, pair, amount = item.split(":")
+                side = side.lower()
+                if exchange == "bybit":
+                    side = "Buy" if side == "buy" else "Sell" if side == "sell" else side
+                orders.append((side, float(amount), pair))
+        except ValueError:
+            print("Неверный формат ордера. Используйте сторона:пара:сумма, например buy:BTCUSDT:10")
+            return True
+        
+        if exchange == "bybit":
+            results = bybit_batch_orders(orders)
+        elif exchange == "okx":
+            results = okx_batch_orders(orders)
+        else:
+            print("Неизвестная биржа. Используйте bybit или okx")
+            return True
+        
+        for result in results:
+            status = "OK" if result['ok'] else "ОШИБКА"
+            print(f"{result['side']} {result['symbol']} {result['amount']}: {status} "
+                  f"[{result['client_order_id']}] {result['order_id'] or ''} {result['message']}")
+    
     elif cmd == "/help":
         print_help()
     
@@ -92,14 +120,14 @@ def handle_command(command):
     
     return True
 
-def plot_chart(data, title):
-    """Рисует график цен"""
-    if not data:
+def plot_chart(closes, title):
+    """Рисует график цен закрытия"""
+    if len(closes) == 0:
         print("Нет данных для построения графика")
         return
     
     try:
-        prices = [float(close) for _, close in data]
+        prices = np.asarray(closes, dtype=float)
         indices = range(len(prices))
         
         plt.figure(figsize=(10, 5))
@@ -121,6 +149,7 @@ def print_help():
     print("/chart [bybit|okx] [пара] - график цен")
     print("/buy [bybit|okx] [пара] [сумма] - купить")
     print("/sell [bybit|okx] [пара] [сумма] - продать")
+    print("/batch [bybit|okx] [сторона:пара:сумма] ... - пакет ордеров")
     print("/help - справка")
     print("/exit - выход")
     print("\nВеб-интерфейс доступен по адресу: http://localhost:5000\n")
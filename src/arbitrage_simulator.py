@@ -0,0 +1,320 @@
+"""
+Симулятор исполнения межбиржевого арбитража с учетом задержек.
+
+Записанные стаканы двух бирж (market_data.book_recorder) воспроизводятся
+в общем порядке времени без пауз. После каждого сообщения сигнал
+generate_arbitrage_signal считается по средним ценам стаканов; по сигналу
+на обе биржи отправляются рыночные ордера (IOC, с необязательным
+ограничением цены). Каждая нога приходит на биржу через задержку сети и
+сопоставления, взятую из распределения этой биржи, и исполняется по
+стакану биржи на момент прихода.
+
+Отчет: реализованный спред против ожидаемого по сигналу, доля полностью
+исполненных пар ордеров, риск одной ноги (неисполненный объем и разрыв
+во времени между ногами). Собственные ордера не меняют записанный стакан
+(допущение малого размера).
+"""
+
+import heapq
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from market_data.fill_estimator import walk_depth
+from market_data.order_book import OrderBook
+from strategies.arbitrage_strategy import generate_arbitrage_signal
+
+DEFAULT_FEE_RATE = 0.001
+DEFAULT_NOTIONAL = 100.0
+
+LATENCY_KINDS = ('constant', 'uniform', 'normal', 'lognormal', 'empirical')
+
+
+class LatencyModel:
+    """
+    Распределение задержки в мс.
+
+        LatencyModel('constant', value=5)
+        LatencyModel('uniform', low=10, high=40)
+        LatencyModel('normal', mean=20, std=5)        # отрицательные значения обрезаются до 0
+        LatencyModel('lognormal', median=25, sigma=0.5)
+        LatencyModel('empirical', samples=[...])      # выборка измеренных задержек
+    """
+
+    def __init__(self, kind='constant', **params):
+        if kind not in LATENCY_KINDS:
+            raise ValueError(f"Неизвестное распределение задержки: {kind}. Доступные: {LATENCY_KINDS}")
+        self.kind = kind
+        self.params = params
+        if kind == 'empirical':
+            self._samples = np.asarray(params['samples'], dtype=np.float64)
+
+    @classmethod
+    def parse(cls, spec):
+        """
+        Распределение из строки 'вид:параметры', например 'constant:5',
+        'uniform:10:40', 'normal:20:5', 'lognormal:25:0.5'; число - постоянная задержка.
+        """
+        if isinstance(spec, LatencyModel):
+            return spec
+        if isinstance(spec, (int, float)):
+            return cls('constant', value=float(spec))
+        kind, *values = str(spec).split(':')
+        values = [float(value) for value in values]
+        names = {'constant': ('value',), 'uniform': ('low', 'high'), 'normal': ('mean', 'std'),
+                 'lognormal': ('median', 'sigma')}.get(kind)
+        if names is None or len(values) != len(names):
+            raise ValueError(f"Неверное описание задержки: {spec}")
+        return cls(kind, **dict(zip(names, values)))
+
+    def sample(self, rng):
+        params = self.params
+        if self.kind == 'constant':
+            return float(params['value'])
+        if self.kind == 'uniform':
+            return float(rng.uniform(params['low'], params['high']))
+        if self.kind == 'normal':
+            return max(0.0, float(rng.normal(params['mean'], params['std'])))
+        if self.kind == 'lognormal':
+            return float(params['median'] * np.exp(rng.normal(0.0, params['sigma'])))
+        return float(self._samples[rng.integers(len(self._samples))])
+
+    def __repr__(self):
+        values = ', '.join(f"{name}={value}" for name, value in self.params.items() if name != 'samples')
+        return f"LatencyModel('{self.kind}', {values})"
+
+
+# Задержки биржи: сеть до биржи и сопоставление ордера, мс
+VenueLatency = namedtuple('VenueLatency', ['network', 'matching'])
+
+
+def venue_latency(network=0.0, matching=0.0):
+    """VenueLatency из LatencyModel, строк вида 'lognormal:25:0.5' или чисел"""
+    return VenueLatency(LatencyModel.parse(network), LatencyModel.parse(matching))
+
+
+def _parse_signal(signal):
+    """'buy_bybit_sell_okx_0.0061' -> ('bybit', 'okx', 0.0061); 'hold' -> None"""
+    if not signal.startswith('buy_'):
+        return None
+    buy, _, rest = signal[4:].partition('_sell_')
+    sell, _, spread = rest.rpartition('_')
+    return buy, sell, float(spread)
+
+
+def _fill(book, side, qty, limit_price=None):
+    """Исполнение рыночного ордера по стакану: (количество, vwap)"""
+    prices, quantities = book.side('asks' if side == 'buy' else 'bids').arrays()
+    if limit_price is not None:
+        allowed = prices <= limit_price if side == 'buy' else prices >= limit_price
+        count = int(np.argmin(allowed)) if not allowed.all() else len(prices)
+        prices, quantities = prices[:count], quantities[:count]
+    if len(prices) == 0:
+        return 0.0, float('nan')
+    estimate = walk_depth(prices, quantities, side, qty=qty)
+    return float(estimate.qty[0]), float(estimate.vwap[0])
+
+
+class SimulationResult:
+    """Попытки арбитража (attempts - DataFrame по одной строке на сигнал) и сводная статистика"""
+
+    def __init__(self, attempts, stats, latency):
+        self.attempts = attempts
+        self.stats = stats
+        self.latency = latency
+
+    def summary(self):
+        stats = self.stats
+        return (
+            f"Сигналов: {stats['signals']}, исполнено полностью: {stats['fill_rate']:.1%}, "
+            f"доля объема: {stats['qty_fill_rate']:.1%}\n"
+            f"Спред: ожидаемый {stats['expected_spread_bps']:.1f} б.п., по стакану при сигнале "
+            f"{stats['quoted_spread_bps']:.1f} б.п., реализованный {stats['realized_spread_bps']:.1f} б.п.\n"
+            f"Риск одной ноги: {stats['leg_risk_rate']:.1%} попыток, средний открытый объем "
+            f"{stats['avg_unhedged_notional']:.2f}, разрыв между ногами {stats['avg_leg_gap_ms']:.1f} мс\n"
+            f"Результат: {stats['pnl']:.4f}; {stats['simulated_seconds']:.0f} с данных за "
+            f"{stats['wall_seconds']:.2f} с (x{stats['speedup']:.0f})"
+        )
+
+
+def simulate_arbitrage(replays, latency, notional=DEFAULT_NOTIONAL, min_spread=0.005, fee_rates=None,
+                       limit_bps=None, cooldown_ms=0, start=None, end=None, seed=0,
+                       signal_func=generate_arbitrage_signal):
+    """
+    Прогон арбитража двух бирж по записанным стаканам.
+
+    Args:
+        replays (dict): {'bybit': BookReplay, 'okx': BookReplay} - записи одной пары
+        latency (dict): {биржа: VenueLatency} (см. venue_latency)
+        notional (float): Размер попытки в котируемой валюте (по ask покупки при сигнале)
+        min_spread (float): Порог сигнала generate_arbitrage_signal
+        fee_rates (dict): Комиссия тейкера по биржам
+        limit_bps (float): Ограничение цены ордеров от цены при сигнале, б.п. (None - рыночные)
+        cooldown_ms (int): Пауза после сигнала; новые сигналы не подаются и пока ордера в пути
+        start, end (int): Диапазон времени, мс
+        seed (int): Зерно генератора задержек
+
+    Returns:
+        SimulationResult
+    """
+    first, second = 'bybit', 'okx'
+    venues = (first, second)
+    fee_rates = {**{venue: DEFAULT_FEE_RATE for venue in venues}, **(fee_rates or {})}
+    rng = np.random.default_rng(seed)
+    started = time.perf_counter()
+
+    # Общий порядок сообщений обеих записей
+    firsts = [replays[venue].first_message(start) for venue in venues]
+    lasts = [len(replays[venue]) if end is None else
+             int(np.searchsorted(replays[venue].times, end, side='left')) for venue in venues]
+    numbers = [np.arange(firsts[i], lasts[i]) for i in range(2)]
+    times = np.concatenate([replays[venue].times[numbers[i]] for i, venue in enumerate(venues)])
+    sources = np.concatenate([np.full(len(numbers[i]), i, dtype=np.int8) for i in range(2)])
+    numbers = np.concatenate(numbers)
+    order = np.argsort(times, kind='stable')
+
+    books = {venue: OrderBook(venue, replays[venue].symbol, validate=False) for venue in venues}
+    pending = []
+    attempts = []
+    next_signal = None
+    sequence = 0
+
+    def fill_leg(leg):
+        attempt, side = leg['attempt'], leg['side']
+        qty, vwap = _fill(books[leg['venue']], side, attempt['qty'], leg['limit'])
+        attempt[f'{side}_filled'] = qty
+        attempt[f'{side}_vwap'] = vwap
+
+    first_ts = last_ts = None
+    for position in order:
+        ts = int(times[position])
+        while pending and pending[0][0] < ts:
+            fill_leg(heapq.heappop(pending)[2])
+        replays[venues[sources[position]]].apply(int(numbers[position]), books[venues[sources[position]]])
+        if start is not None and ts < start:
+            continue
+        first_ts = ts if first_ts is None else first_ts
+        last_ts = ts
+        if pending or (next_signal is not None and ts < next_signal):
+            continue
+
+        mids = [books[venue].mid_price() for venue in venues]
+        if mids[0] is None or mids[1] is None:
+            continue
+        parsed = _parse_signal(signal_func(mids[0], mids[1], min_spread))
+        if parsed is None:
+            continue
+
+        buy_venue, sell_venue, expected = parsed
+        ask, bid = books[buy_venue].best_ask(), books[sell_venue].best_bid()
+        attempt = {
+            'signal_ts': ts, 'buy_venue': buy_venue, 'sell_venue': sell_venue,
+            'expected_spread': expected, 'quoted_spread': bid / ask - 1.0, 'qty': notional / ask,
+            'buy_filled': 0.0, 'sell_filled': 0.0, 'buy_vwap': float('nan'), 'sell_vwap': float('nan')
+        }
+        for side, venue, price in (('buy', buy_venue, ask), ('sell', sell_venue, bid)):
+            venue_delay = latency[venue]
+            delay = venue_delay.network.sample(rng) + venue_delay.matching.sample(rng)
+            attempt[f'{side}_arrival'] = ts + delay
+            limit = None
+            if limit_bps is not None:
+                limit = price * (1.0 + limit_bps / 10000.0) if side == 'buy' else price * (1.0 - limit_bps / 10000.0)
+            sequence += 1
+            heapq.heappush(pending, (ts + delay, sequence, {'attempt': attempt, 'side': side,
+                                                             'venue': venue, 'limit': limit}))
+        attempts.append(attempt)
+        next_signal = ts + cooldown_ms
+
+    # Ноги, пришедшие после конца записи, не исполняются: попытка не учитывается
+    while pending and last_ts is not None and pending[0][0] <= last_ts:
+        fill_leg(heapq.heappop(pending)[2])
+    unresolved = {id(leg['attempt']) for _, _, leg in pending}
+    attempts = [attempt for attempt in attempts if id(attempt) not in unresolved]
+
+    frame = _attempts_frame(attempts, fee_rates)
+    wall = time.perf_counter() - started
+    simulated = (last_ts - first_ts) / 1000.0 if first_ts is not None else 0.0
+    stats = _stats(frame, simulated, wall, len(order))
+    return SimulationResult(frame, stats, latency)
+
+
+def _attempts_frame(attempts, fee_rates):
+    columns = ['signal_ts', 'buy_venue', 'sell_venue', 'expected_spread', 'quoted_spread', 'qty',
+               'buy_arrival', 'sell_arrival', 'buy_filled', 'sell_filled', 'buy_vwap', 'sell_vwap']
+    frame = pd.DataFrame(attempts, columns=columns)
+    if frame.empty:
+        for column in ('hedged_qty', 'unhedged_qty', 'unhedged_notional', 'leg_gap_ms',
+                       'realized_spread', 'pnl', 'complete'):
+            frame[column] = []
+        return frame
+
+    buy_fee = frame['buy_venue'].map(fee_rates).to_numpy(dtype=np.float64)
+    sell_fee = frame['sell_venue'].map(fee_rates).to_numpy(dtype=np.float64)
+    buy_vwap = frame['buy_vwap'].to_numpy(dtype=np.float64)
+    sell_vwap = frame['sell_vwap'].to_numpy(dtype=np.float64)
+
+    hedged = np.minimum(frame['buy_filled'], frame['sell_filled']).to_numpy(dtype=np.float64)
+    unhedged = (frame['buy_filled'] - frame['sell_filled']).abs().to_numpy(dtype=np.float64)
+    reference = np.where(np.isnan(buy_vwap), sell_vwap, buy_vwap)
+    frame['hedged_qty'] = hedged
+    frame['unhedged_qty'] = unhedged
+    frame['unhedged_notional'] = np.where(unhedged > 0, unhedged * reference, 0.0)
+    frame['leg_gap_ms'] = (frame['buy_arrival'] - frame['sell_arrival']).abs()
+    with np.errstate(invalid='ignore'):
+        frame['realized_spread'] = np.where(
+            hedged > 0, sell_vwap * (1.0 - sell_fee) / (buy_vwap * (1.0 + buy_fee)) - 1.0, np.nan)
+        frame['pnl'] = np.where(hedged > 0, hedged * (sell_vwap * (1.0 - sell_fee) - buy_vwap * (1.0 + buy_fee)), 0.0)
+    frame['complete'] = (frame['buy_filled'] >= frame['qty'] * (1 - 1e-9)) & \
+                        (frame['sell_filled'] >= frame['qty'] * (1 - 1e-9))
+    return frame
+
+
+def _mean(values):
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    return float(values.mean()) if len(values) else 0.0
+
+
+def _stats(frame, simulated, wall, messages):
+    signals = len(frame)
+    leg_risk = frame['unhedged_qty'] > frame['qty'] * 1e-9 if signals else frame['unhedged_qty']
+    return {
+        'signals': signals,
+        'messages': messages,
+        'fill_rate': float(frame['complete'].mean()) if signals else 0.0,
+        'qty_fill_rate': float((frame['hedged_qty'] / frame['qty']).mean()) if signals else 0.0,
+        'expected_spread_bps': _mean(frame['expected_spread']) * 10000.0,
+        'quoted_spread_bps': _mean(frame['quoted_spread']) * 10000.0,
+        'realized_spread_bps': _mean(frame['realized_spread']) * 10000.0,
+        'median_realized_spread_bps': float(np.nanmedian(frame['realized_spread']) * 10000.0)
+        if signals and frame['realized_spread'].notna().any() else 0.0,
+        'leg_risk_rate': float(leg_risk.mean()) if signals else 0.0,
+        'avg_unhedged_notional': _mean(frame['unhedged_notional']),
+        'max_unhedged_notional': float(frame['unhedged_notional'].max()) if signals else 0.0,
+        'avg_leg_gap_ms': _mean(frame['leg_gap_ms']),
+        'pnl': float(frame['pnl'].sum()) if signals else 0.0,
+        'simulated_seconds': simulated,
+        'wall_seconds': wall,
+        'speedup': simulated / wall if wall > 0 else 0.0
+    }
+
+
+def sweep_latency(replays, scenarios, **kwargs):
+    """
+    Прогон симуляции для нескольких наборов задержек.
+
+    Args:
+        replays (dict): {'bybit': BookReplay, 'okx': BookReplay}
+        scenarios (dict): {название: {биржа: VenueLatency}}
+        **kwargs: Параметры simulate_arbitrage
+
+    Returns:
+        pd.DataFrame: Статистика по сценариям
+    """
+    rows = []
+    for name, latency in scenarios.items():
+        result = simulate_arbitrage(replays, latency, **kwargs)
+        rows.append({'scenario': name, **result.stats})
+    return pd.DataFrame(rows).set_index('scenario')
@@ -0,0 +1,388 @@
+"""
+Асинхронные клиенты Bybit и OKX с параллельным опросом бирж и пар
+"""
+
+import asyncio
+import atexit
+import json
+import random
+import threading
+
+import aiohttp
+
+try:
+    from . import bybit, okx
+    from .http_session import (DEFAULT_POOL_SIZE, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT,
+                               DEFAULT_MAX_RETRIES, DEFAULT_BACKOFF_FACTOR, DEFAULT_MAX_BACKOFF,
+                               RETRY_STATUSES)
+    from .metrics import track_request
+except ImportError:
+    import bybit
+    import okx
+    from http_session import (DEFAULT_POOL_SIZE, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT,
+                              DEFAULT_MAX_RETRIES, DEFAULT_BACKOFF_FACTOR, DEFAULT_MAX_BACKOFF,
+                              RETRY_STATUSES)
+    from metrics import track_request
+
+DEFAULT_KLINE_CONCURRENCY = 10
+
+
+class AsyncExchangeClient:
+    """Общая часть асинхронных клиентов: пул aiohttp и повтор GET-запросов"""
+
+    exchange = ""
+    base_url = ""
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff_factor=DEFAULT_BACKOFF_FACTOR, max_backoff=DEFAULT_MAX_BACKOFF):
+        self.pool_size = pool_size
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    def _backoff_delay(self, attempt):
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+    async def _acquire(self, scheduler, endpoint):
+        """Ждет разрешения общего с синхронными клиентами ограничителя частоты"""
+        await asyncio.to_thread(scheduler.acquire, endpoint)
+
+    async def _request(self, method, url_full, sign, data=None, endpoint=None, scheduler=None):
+        """sign() строит заголовки с подписью; вызывается перед каждой попыткой"""
+        with track_request(self.exchange, endpoint, method) as track:
+            return await self._send(method, url_full, sign, data, endpoint, scheduler, track)
+
+    async def _send(self, method, url_full, sign, data, endpoint, scheduler, track):
+        session = self._get_session()
+        attempts = self.max_retries + 1 if method == "GET" else 1
+
+        for attempt in range(attempts):
+            last_attempt = attempt + 1 >= attempts
+            if attempt and scheduler is not None:
+                # Первое разрешение получает send_request, повторы - здесь
+                await self._acquire(scheduler, endpoint)
+            headers = sign()
+            try:
+                async with session.request(method, url_full, headers=headers, data=data) as response:
+                    track.status = response.status
+                    if scheduler is not None:
+                        scheduler.update(endpoint, response.status, response.headers)
+                    if response.status in RETRY_STATUSES and not last_attempt:
+                        await asyncio.sleep(self._backoff_delay(attempt))
+                        continue
+                    response.raise_for_status()
+                    status_code = response.status
+                    text = await response.text()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if not last_attempt:
+                    await asyncio.sleep(self._backoff_delay(attempt))
+                    continue
+                print(f"[Ошибка сети] {e}")
+                track.error = "network"
+                return {"error": "network", "message": str(e)}
+            except aiohttp.ClientError as e:
+                print(f"[Ошибка сети] {e}")
+                track.error = "network"
+                return {"error": "network", "message": str(e)}
+
+            try:
+                payload = json.loads(text)
+            except json.JSONDecodeError:
+                print("[Ошибка] Не удалось декодировать JSON.")
+                track.error = "invalid_json"
+                return {
+                    "error": "invalid_json",
+                    "status_code": status_code,
+                    "text": text
+                }
+
+            track.check_payload(payload)
+            if scheduler is not None:
+                scheduler.update(endpoint, payload=payload)
+            return payload
+
+
+class AsyncBybitClient(AsyncExchangeClient):
+    """
+    Асинхронный аналог BybitClient.
+
+    Ключи, подпись и проверка проскальзывания берутся из переданного signer
+    (BybitClient); если он не задан, используется клиент по умолчанию модуля bybit.
+    """
+
+    exchange = "bybit"
+    base_url = bybit.url
+
+    def __init__(self, signer=None, **kwargs):
+        super().__init__(**kwargs)
+        self.signer = signer
+
+    def _signer(self):
+        return self.signer or bybit.get_default_client()
+
+    async def send_request(self, endpoint, method, params_dict=None):
+        signer = self._signer()
+        await self._acquire(signer.scheduler, endpoint)
+
+        if method == "POST":
+            payload = json.dumps(params_dict, separators=(',', ':'))
+            return await self._request(method, self.base_url + endpoint, lambda: signer.build_headers(payload),
+                                       payload, endpoint, signer.scheduler)
+
+        params_str = "&".join([f"{k}={v}" for k, v in sorted(params_dict.items())]) if params_dict else ""
+        url_full = self.base_url + endpoint + (f"?{params_str}" if params_str else "")
+        return await self._request(method, url_full, lambda: signer.build_headers(params_str),
+                                   endpoint=endpoint, scheduler=signer.scheduler)
+
+    async def get_balance(self):
+        try:
+            response = await self.send_request(bybit.BALANCE_ENDPOINT, "GET", {"accountType": "UNIFIED"})
+            return bybit._parse_balance(response)
+        except Exception as e:
+            print(f"Ошибка получения баланса: {e}")
+            return 0.0, {}
+
+    async def get_available_trading_pairs(self, amount_of_pair=1000):
+        try:
+            response = await self.send_request(bybit.INSTRUMENTS_ENDPOINT, "GET", {'category': 'spot'})
+            return bybit._parse_trading_pairs(response, amount_of_pair)
+        except Exception as e:
+            print(f"Ошибка получения торговых пар: {e}")
+            return []
+
+    async def get_opened_positions(self, settleCoin="USDT"):
+        params = {"category": "linear", "settleCoin": settleCoin}
+        try:
+            response = await self.send_request(bybit.POSITIONS_ENDPOINT, "GET", params)
+            return bybit._parse_positions(response)
+        except Exception as e:
+            print(f"Ошибка получения позиций: {e}")
+            return []
+
+    async def get_some_last_kandle(self, symbol="BTCUSDT", interval="15m", limit=15):
+        params = bybit._kline_params(symbol, interval, limit)
+        try:
+            response = await self.send_request(bybit.KLINE_ENDPOINT, "GET", params)
+            return bybit._parse_kandles(response)
+        except Exception as e:
+            print(f"Ошибка получения свечей: {e}")
+            return []
+
+    async def place_order(self, side, amount, symbol):
+        error = bybit._validate_order(side, amount)
+        if not error:
+            # Проверка может ждать первого снимка стакана, поэтому не в цикле событий
+            amount, error = await asyncio.to_thread(self._signer().check_slippage, side, amount, symbol)
+        if error:
+            return error
+
+        await asyncio.to_thread(bybit.instruments.ensure_loaded)
+        error = bybit.instruments.validate_order(symbol, notional=amount)
+        if error:
+            return error
+
+        try:
+            response = await self.send_request(bybit.ORDER_ENDPOINT, "POST",
+                                               bybit._order_params(side, amount, symbol))
+            return bybit._parse_order(response)
+        except Exception as e:
+            return f"Ошибка размещения ордера: {e}"
+
+
+class AsyncOkxClient(AsyncExchangeClient):
+    """
+    Асинхронный аналог OkxClient.
+
+    Ключи, подпись и проверка проскальзывания берутся из переданного signer
+    (OkxClient); если он не задан, используется клиент по умолчанию модуля okx.
+    """
+
+    exchange = "okx"
+    base_url = okx.url
+
+    def __init__(self, signer=None, **kwargs):
+        super().__init__(**kwargs)
+        self.signer = signer
+
+    def _signer(self):
+        return self.signer or okx.get_default_client()
+
+    async def send_request(self, endpoint, method, params=None, body=None):
+        body_str = json.dumps(body, separators=(',', ':')) if body else ""
+        request_path = endpoint + okx.build_query_string(params)
+        signer = self._signer()
+        await self._acquire(signer.scheduler, endpoint)
+
+        return await self._request(method, self.base_url + request_path,
+                                   lambda: signer.build_headers(method, request_path, body_str),
+                                   body_str or None, endpoint, signer.scheduler)
+
+    async def get_balance(self):
+        response = await self.send_request(okx.BALANCE_ENDPOINT, "GET", {"accountType": "UNIFIED"})
+        return okx._parse_balance(response)
+
+    async def get_available_trading_pairs(self, amount_of_pair=1000):
+        response = await self.send_request(okx.INSTRUMENTS_ENDPOINT, "GET", {"instType": "SPOT"})
+        return okx._parse_trading_pairs(response, amount_of_pair)
+
+    async def get_opened_positions(self):
+        response = await self.send_request(okx.POSITIONS_ENDPOINT, "GET", {})
+        return okx._parse_positions(response)
+
+    async def get_some_last_kandle(self, symbol="BTC-USDT", interval="15m", limit=15):
+        params = okx._kline_params(symbol, interval, limit)
+        response = await self.send_request(okx.KLINE_ENDPOINT, "GET", params)
+        return okx._parse_kandles(response)
+
+    async def place_order(self, side, amount, symbol):
+        await asyncio.to_thread(okx.instruments.ensure_loaded)
+        error = okx._validate_order(side, amount)
+        if not error:
+            # Проверка может ждать первого снимка стакана, поэтому не в цикле событий
+            amount, error = await asyncio.to_thread(self._signer().check_slippage, side, amount, symbol)
+        if error:
+            return error
+
+        error = okx._validate_size(side, amount, symbol)
+        if error:
+            return error
+
+        response = await self.send_request(okx.ORDER_ENDPOINT, "POST",
+                                           body=okx._order_params(side, amount, symbol))
+        return okx._parse_order(response)
+
+
+async def gather_balances(bybit_client, okx_client):
+    """
+    Параллельно запрашивает балансы и позиции с обеих бирж.
+
+    Returns:
+        dict: {'bybit': {...}, 'okx': {...}} в формате маршрута /balance
+    """
+    (bybit_total, bybit_coins), bybit_pos, (okx_total, okx_coins), okx_pos = await asyncio.gather(
+        bybit_client.get_balance(),
+        bybit_client.get_opened_positions(),
+        okx_client.get_balance(),
+        okx_client.get_opened_positions()
+    )
+
+    return {
+        'bybit': {
+            'total': bybit_total,
+            'coins': bybit_coins,
+            'positions': bybit_pos
+        },
+        'okx': {
+            'total': okx_total,
+            'coins': okx_coins,
+            'positions': okx_pos
+        }
+    }
+
+
+async def gather_trading_pairs(bybit_client, okx_client, amount_of_pair=1000):
+    """Параллельно получает списки торговых пар с обеих бирж"""
+    bybit_pairs, okx_pairs = await asyncio.gather(
+        bybit_client.get_available_trading_pairs(amount_of_pair),
+        okx_client.get_available_trading_pairs(amount_of_pair)
+    )
+    return {'bybit': bybit_pairs, 'okx': okx_pairs}
+
+
+async def gather_klines(client, symbols, interval="15m", limit=15,
+                        concurrency=DEFAULT_KLINE_CONCURRENCY):
+    """
+    Параллельно получает свечи по множеству пар одной биржи.
+
+    Args:
+        client: AsyncBybitClient или AsyncOkxClient
+        symbols (list): Список торговых пар
+        concurrency (int): Максимум одновременных запросов
+
+    Returns:
+        dict: {symbol: [(open_price, close_price), ...]}
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(symbol):
+        async with semaphore:
+            try:
+                return await client.get_some_last_kandle(symbol=symbol, interval=interval, limit=limit)
+            except Exception as e:
+                print(f"Ошибка получения свечей {symbol}: {e}")
+                return []
+
+    results = await asyncio.gather(*(fetch(symbol) for symbol in symbols))
+    return dict(zip(symbols, results))
+
+
+class AsyncRunner:
+    """
+    Постоянный цикл событий в фоновом потоке.
+
+    Позволяет синхронному коду (Flask, CLI) выполнять корутины, не пересоздавая
+    пулы соединений асинхронных клиентов на каждый вызов.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.bybit = AsyncBybitClient()
+        self.okx = AsyncOkxClient()
+
+    def run(self, coro, timeout=None):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def close(self):
+        """Закрывает сессии клиентов и останавливает цикл событий"""
+        if self.loop.is_running():
+            self.run(self.bybit.close(), timeout=5)
+            self.run(self.okx.close(), timeout=5)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_runner():
+    """Возвращает общий фоновый цикл событий с клиентами по умолчанию"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = AsyncRunner()
+            atexit.register(_runner.close)
+        return _runner
+
+
+def fetch_dashboard():
+    """Синхронная обертка: балансы и позиции с обеих бирж за время самого долгого запроса"""
+    runner = get_runner()
+    return runner.run(gather_balances(runner.bybit, runner.okx))
+
+
+def fetch_klines(exchange, symbols, interval="15m", limit=15):
+    """Синхронная обертка над gather_klines для выбранной биржи"""
+    runner = get_runner()
+    client = runner.bybit if exchange == 'bybit' else runner.okx
+    return runner.run(gather_klines(client, symbols, interval, limit))
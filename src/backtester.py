@@ -0,0 +1,208 @@
+"""
+Векторный бэктест встроенных стратегий на полной истории.
+
+Сигналы всех свечей считаются за один проход (strategies.batch_signals),
+затем превращаются в позиции, сделки и кривую капитала с учетом комиссии
+и проскальзывания. Исполнение: сигнал на закрытии свечи t исполняется по
+цене закрытия t, позиция держится со свечи t + 1; hold сохраняет позицию.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from market_data.candle_store import get_store
+from market_data.history import INTERVAL_MS
+from strategies.batch_signals import BUY, SELL, HOLD, SIGNAL_SERIES
+
+DEFAULT_FEE_RATE = 0.001
+DEFAULT_SLIPPAGE = 0.0005
+DEFAULT_CAPITAL = 10_000.0
+
+MS_PER_YEAR = 365 * 24 * 60 * 60 * 1000
+
+
+def periods_per_year(interval):
+    return MS_PER_YEAR / INTERVAL_MS[interval]
+
+
+def signals_to_positions(signals, allow_short=False, position_size=1.0):
+    """
+    Позиции по сигналам: buy - длинная позиция, sell - короткая (или выход
+    из позиции, если шорт запрещен), hold - позиция сохраняется.
+    """
+    signals = np.asarray(signals)
+    n = len(signals)
+    target = np.where(signals == BUY, position_size,
+                      np.where(signals == SELL, -position_size if allow_short else 0.0, 0.0))
+
+    last_signal = np.where(signals != HOLD, np.arange(n), -1)
+    np.maximum.accumulate(last_signal, out=last_signal)
+    return np.where(last_signal >= 0, target[np.maximum(last_signal, 0)], 0.0)
+
+
+def extract_trades(positions, close, timestamps=None, fee_rate=DEFAULT_FEE_RATE, slippage=DEFAULT_SLIPPAGE):
+    """
+    Сделки как непрерывные участки ненулевой позиции.
+    Позиция, открытая в конце истории, закрывается по последней цене (open=True).
+    """
+    n = len(positions)
+    if n == 0:
+        return pd.DataFrame(columns=['entry_bar', 'exit_bar', 'side', 'size', 'entry_price',
+                                     'exit_price', 'return', 'open'])
+
+    changes = np.flatnonzero(positions[1:] != positions[:-1]) + 1
+    starts = np.concatenate(([0], changes))
+    ends = np.concatenate((changes, [n]))
+    held = positions[starts] != 0
+    starts, ends = starts[held], ends[held]
+
+    is_open = ends == n
+    exit_bars = np.where(is_open, n - 1, ends)
+    size = positions[starts]
+    side = np.sign(size)
+
+    entry_price = close[starts] * (1 + side * slippage)
+    exit_price = close[exit_bars] * (1 - side * slippage)
+    trade_return = np.abs(size) * (side * (exit_price / entry_price - 1) - 2 * fee_rate)
+
+    trades = pd.DataFrame({
+        'entry_bar': starts,
+        'exit_bar': exit_bars,
+        'side': np.where(side > 0, 'long', 'short'),
+        'size': np.abs(size),
+        'entry_price': entry_price,
+        'exit_price': exit_price,
+        'return': trade_return,
+        'open': is_open
+    })
+    if timestamps is not None:
+        timestamps = np.asarray(timestamps)
+        trades.insert(0, 'entry_time', pd.to_datetime(timestamps[starts], unit='ms'))
+        trades.insert(1, 'exit_time', pd.to_datetime(timestamps[exit_bars], unit='ms'))
+    return trades
+
+
+class BacktestResult:
+    """
+    Результат бэктеста: сигналы, позиции, доходности, кривая капитала,
+    просадка, сделки и сводная статистика (stats).
+    """
+
+    def __init__(self, strategy, params, signals, positions, returns, equity, drawdown, trades, stats,
+                 timestamps=None):
+        self.strategy = strategy
+        self.params = params
+        self.signals = signals
+        self.positions = positions
+        self.returns = returns
+        self.equity = equity
+        self.drawdown = drawdown
+        self.trades = trades
+        self.stats = stats
+        self.timestamps = timestamps
+
+    def equity_frame(self):
+        """Кривая капитала, просадка и позиция по свечам"""
+        frame = pd.DataFrame({
+            'equity': self.equity,
+            'drawdown': self.drawdown,
+            'position': self.positions,
+            'return': self.returns
+        })
+        if self.timestamps is not None:
+            frame.index = pd.to_datetime(np.asarray(self.timestamps), unit='ms')
+        return frame
+
+    def summary(self):
+        stats = self.stats
+        return (
+            f"Стратегия: {self.strategy}\n"
+            f"Свечей: {stats['bars']}, сделок: {stats['trades']}, доля прибыльных: {stats['win_rate']:.1%}\n"
+            f"Доходность: {stats['total_return']:.2%}, годовая: {stats['cagr']:.2%}\n"
+            f"Макс. просадка: {stats['max_drawdown']:.2%}, Шарп: {stats['sharpe']:.2f}\n"
+            f"Оборот: {stats['turnover']:.1f} (в год {stats['annual_turnover']:.1f}), "
+            f"в позиции: {stats['exposure']:.1%}, издержки: {stats['costs']:.2%}"
+        )
+
+
+def run_backtest(strategy, prices, params=None, interval="1m", fee_rate=DEFAULT_FEE_RATE,
+                 slippage=DEFAULT_SLIPPAGE, allow_short=False, position_size=1.0,
+                 initial_capital=DEFAULT_CAPITAL):
+    """
+    Бэктест одной пары.
+
+    Args:
+        strategy (str): 'breakout', 'scalping' или 'ema_crossover'
+        prices (dict): Ряды open, high, low, close, volume (и необязательно timestamp, мс)
+        params (dict): Параметры стратегии
+        interval (str): Интервал свечей (для годовых показателей)
+        fee_rate (float): Комиссия за сторону сделки, доля от объема
+        slippage (float): Проскальзывание цены исполнения, доля от цены
+        allow_short (bool): Открывать ли короткие позиции по сигналу sell
+        position_size (float): Доля капитала в позиции
+
+    Returns:
+        BacktestResult
+    """
+    signal_series = SIGNAL_SERIES.get(strategy)
+    if signal_series is None:
+        raise ValueError(f"Стратегия {strategy} не поддерживает бэктест. Доступные: {list(SIGNAL_SERIES)}")
+    params = params or {}
+
+    close = np.ascontiguousarray(prices['close'], dtype=np.float64)
+    n = len(close)
+    signals = signal_series(prices, params)
+    positions = signals_to_positions(signals, allow_short, position_size)
+
+    bar_returns = np.zeros(n)
+    if n > 1:
+        np.divide(close[1:], close[:-1], out=bar_returns[1:])
+        bar_returns[1:] -= 1
+
+    held = np.empty(n)
+    held[0] = 0.0
+    held[1:] = positions[:-1]
+    turnover = np.abs(np.diff(positions, prepend=0.0))
+    costs = turnover * (fee_rate + slippage)
+    returns = held * bar_returns - costs
+
+    equity = initial_capital * np.cumprod(1 + returns)
+    peak = np.maximum.accumulate(equity) if n else equity
+    drawdown = equity / peak - 1 if n else equity
+
+    timestamps = prices.get('timestamp')
+    trades = extract_trades(positions, close, timestamps, fee_rate, slippage)
+
+    per_year = periods_per_year(interval)
+    years = n / per_year if n else 0.0
+    total_return = equity[-1] / initial_capital - 1 if n else 0.0
+    std = returns.std()
+    closed = trades[~trades['open']] if len(trades) else trades
+
+    stats = {
+        'bars': n,
+        'trades': len(trades),
+        'win_rate': float((closed['return'] > 0).mean()) if len(closed) else 0.0,
+        'total_return': float(total_return),
+        'cagr': float((1 + total_return) ** (1 / years) - 1) if years > 0 and total_return > -1 else 0.0,
+        'sharpe': float(returns.mean() / std * math.sqrt(per_year)) if std > 0 else 0.0,
+        'max_drawdown': float(drawdown.min()) if n else 0.0,
+        'turnover': float(turnover.sum()),
+        'annual_turnover': float(turnover.sum() / years) if years > 0 else 0.0,
+        'exposure': float((positions != 0).mean()) if n else 0.0,
+        'costs': float(costs.sum())
+    }
+    return BacktestResult(strategy, params, signals, positions, returns, equity, drawdown, trades, stats,
+                          timestamps)
+
+
+def backtest_from_store(strategy, exchange, symbol, interval, params=None, start=None, end=None,
+                        store=None, **kwargs):
+    """Бэктест по свечам локального хранилища (market_data.candle_store)"""
+    store = store or get_store()
+    prices = store.read(exchange, symbol, interval, start, end)
+    if len(prices['close']) == 0:
+        raise ValueError(f"В хранилище нет свечей {exchange} {symbol} {interval}")
+    return run_backtest(strategy, prices, params, interval, **kwargs)
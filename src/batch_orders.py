@@ -0,0 +1,98 @@
+"""
+Пакетное размещение ордеров.
+
+Общая часть для клиентов Bybit и OKX: ордера получают клиентские
+идентификаторы, разбиваются на пачки по лимиту биржи, пачки отправляются
+параллельно, а результаты возвращаются в исходном порядке и сопоставляются
+с ордерами по клиентскому идентификатору.
+"""
+
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MAX_WORKERS = 4
+
+
+def new_client_order_id(prefix="tb"):
+    """Уникальный клиентский ID ордера (буквы и цифры, не длиннее 32 символов)"""
+    return f"{prefix}{uuid.uuid4().hex[:30 - len(prefix)]}"
+
+
+def order_result(order, ok, order_id=None, message=""):
+    """Результат по одному ордеру пачки"""
+    return {
+        'client_order_id': order['client_order_id'],
+        'symbol': order['symbol'],
+        'side': order['side'],
+        'amount': order['amount'],
+        'ok': ok,
+        'order_id': order_id,
+        'message': message
+    }
+
+
+def normalize_orders(orders):
+    """
+    Приводит ордера к виду {'side', 'amount', 'symbol', 'client_order_id'}.
+
+    Ордер можно задать словарем или кортежем (side, amount, symbol); если
+    client_order_id не указан, он генерируется.
+    """
+    normalized = []
+    for order in orders:
+        if not isinstance(order, dict):
+            side, amount, symbol = order
+            order = {'side': side, 'amount': amount, 'symbol': symbol}
+        normalized.append({
+            'side': order['side'],
+            'amount': float(order['amount']),
+            'symbol': order['symbol'],
+            'client_order_id': order.get('client_order_id') or new_client_order_id()
+        })
+
+    ids = [order['client_order_id'] for order in normalized]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Клиентские ID ордеров в пачке должны быть уникальны")
+    return normalized
+
+
+def submit_in_chunks(orders, chunk_size, send_chunk, validate=None, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Проверяет ордера, отправляет допустимые пачками по chunk_size параллельно.
+
+    Args:
+        orders (list): Нормализованные ордера (см. normalize_orders)
+        chunk_size (int): Максимальный размер пачки биржи
+        send_chunk (callable): Отправляет пачку, возвращает {client_order_id: результат}
+        validate (callable): Возвращает текст ошибки ордера или None
+        max_workers (int): Число одновременно отправляемых пачек
+
+    Returns:
+        list: Результаты в порядке исходных ордеров
+    """
+    results = {}
+    valid = []
+    for order in orders:
+        error = validate(order) if validate else None
+        if error:
+            results[order['client_order_id']] = order_result(order, False, message=error)
+        else:
+            valid.append(order)
+
+    chunks = [valid[i:i + chunk_size] for i in range(0, len(valid), chunk_size)]
+    if chunks:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+            futures = [(chunk, executor.submit(send_chunk, chunk)) for chunk in chunks]
+            for chunk, future in futures:
+                try:
+                    chunk_results = future.result()
+                except Exception as e:
+                    chunk_results = {}
+                    message = f"Ошибка отправки пачки: {e}"
+                else:
+                    message = "Нет результата по ордеру в ответе биржи"
+                for order in chunk:
+                    results[order['client_order_id']] = chunk_results.get(
+                        order['client_order_id'], order_result(order, False, message=message))
+
+    return [results[order['client_order_id']] for order in orders]
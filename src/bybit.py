@@ -8,11 +8,34 @@ import hashlib
 import hmac
 from pprint import pprint
 
+try:
+    from .http_session import PooledSession, session_options_from_config
+    from .instruments import Instrument, InstrumentRegistry, format_amount, snapshot_path_for
+    from .batch_orders import DEFAULT_MAX_WORKERS, normalize_orders, order_result, submit_in_chunks
+    from .rate_limiter import get_scheduler
+    from .metrics import track_request
+except ImportError:
+    from http_session import PooledSession, session_options_from_config
+    from instruments import Instrument, InstrumentRegistry, format_amount, snapshot_path_for
+    from batch_orders import DEFAULT_MAX_WORKERS, normalize_orders, order_result, submit_in_chunks
+    from rate_limiter import get_scheduler
+    from metrics import track_request
+
 api_key = ''
 secret_key = ''
 url = "https://api.bybit.com"
 recv_window = "5000"
 
+BALANCE_ENDPOINT = '/v5/account/wallet-balance'
+INSTRUMENTS_ENDPOINT = '/v5/market/instruments-info'
+POSITIONS_ENDPOINT = "/v5/position/list"
+KLINE_ENDPOINT = "/v5/market/kline"
+ORDER_ENDPOINT = "/v5/order/create"
+BATCH_ORDER_ENDPOINT = "/v5/order/create-batch"
+
+KLINE_MAX_LIMIT = 1000
+BATCH_ORDER_MAX_SIZE = 10
+
 def find_config():
     """Ищет config.json в различных возможных расположениях"""
     possible_paths = [
@@ -29,187 +52,76 @@ def find_config():
     
     raise FileNotFoundError("Файл config.json не найден ни в одном из ожидаемых мест")
 
-def get_info_from_json():
-    global api_key, secret_key
-    
-    config_path = find_config()
-    
-    try:
-        with open(config_path, "r", encoding="utf-8") as file:
-            data = json.load(file)
-            
-        if 'API_KEY_BYBIT' not in data or 'API_SECRET_KEY_BYBIT' not in data:
-            raise KeyError("В config.json отсутствуют необходимые ключи")
-            
-        api_key = data['API_KEY_BYBIT']
-        secret_key = data['API_SECRET_KEY_BYBIT']
+def _parse_balance(response):
+    if response.get("retCode") == 0 and response.get("result") and response["result"].get("list"):
+        account_data = response['result']['list'][0]
+        total_equity = float(account_data['totalEquity'])
         
-        if not api_key or not secret_key:
-            raise ValueError("API-ключи не могут быть пустыми.")
-            
-        print("Конфигурация Bybit загружена успешно!")
+        coins = {}
+        for coin in account_data['coin']:
+            equity = float(coin['equity'])
+            if equity > 0:
+                coins[coin['coin']] = equity
         
-    except json.JSONDecodeError:
-        raise ValueError("Ошибка чтения JSON")
-
-def get_sign_for_get(params_str, time_stamp):
-    param_str = f"{time_stamp}{api_key}{recv_window}{params_str}"
-    hash_obj = hmac.new(secret_key.encode("utf-8"), param_str.encode("utf-8"), hashlib.sha256)
-    return hash_obj.hexdigest()
-
-def get_sign_for_post(payload_str, timestamp):
-    message = f"{timestamp}{api_key}{recv_window}{payload_str}"
-    signature = hmac.new(secret_key.encode("utf-8"), message.encode("utf-8"), hashlib.sha256).hexdigest()
-    return signature
-
-def send_request(endpoint, method, params_dict=None):
-    signature = ''
-    time_stamp = str(int(time.time() * 1000))
-    
-    if params_dict:
-        params_str = "&".join([f"{k}={v}" for k, v in sorted(params_dict.items())])
+        return total_equity, coins
     else:
-        params_str = ""
-    
-    headers = {
-        'X-BAPI-API-KEY': api_key,
-        'X-BAPI-SIGN': signature,
-        'X-BAPI-SIGN-TYPE': '2', 
-        'X-BAPI-TIMESTAMP': time_stamp,
-        'X-BAPI-RECV-WINDOW': recv_window,
-        'Content-Type': 'application/json'
-    }
-    
-    url_full = url + endpoint
-    
-    try:
-        if method == "POST":
-            payload = json.dumps(params_dict, separators=(',', ':'))
-            signature = get_sign_for_post(payload, time_stamp)
-            headers['X-BAPI-SIGN'] = signature
-            response = requests.request(method, url_full, headers=headers, data=payload)
-        else:
-            signature = get_sign_for_get(params_str, time_stamp)
-            headers['X-BAPI-SIGN'] = signature  
-            response = requests.request(method, url_full, headers=headers, params=params_dict)
-        
-        response.raise_for_status()
-        
-    except requests.exceptions.RequestException as e:
-        print(f"[Ошибка сети] {e}")
-        return {"error": "network", "message": str(e)}
-    
-    try:
-        return response.json()
-    except requests.exceptions.JSONDecodeError:
-        print("[Ошибка] Не удалось декодировать JSON.")
-        return {
-            "error": "invalid_json", 
-            "status_code": response.status_code,
-            "text": response.text
-        }
+        error_msg = response.get("retMsg", "Неизвестная ошибка")
+        raise Exception(f"Ошибка API Bybit: {error_msg}")
 
-def get_balance():
-    """
-    Получает баланс аккаунта Bybit
-    
-    Returns:
-        tuple: (общий_баланс_USDT, словарь_монет)
-    """
-    endpoint = '/v5/account/wallet-balance'
-    params = {"accountType": "UNIFIED"}
-    
-    try:
-        response = send_request(endpoint, "GET", params)
+def _parse_trading_pairs(response, amount_of_pair):
+    if response.get("retCode") == 0 and response.get("result") and response["result"].get("list"):
+        trading_pairs = [pair['symbol'] for pair in response['result']['list']]
         
-        if response.get("retCode") == 0 and response.get("result") and response["result"].get("list"):
-            account_data = response['result']['list'][0]
-            total_equity = float(account_data['totalEquity'])
-            
-            coins = {}
-            for coin in account_data['coin']:
-                equity = float(coin['equity'])
-                if equity > 0:
-                    coins[coin['coin']] = equity
-            
-            return total_equity, coins
+        if amount_of_pair > len(trading_pairs) or amount_of_pair < 0:
+            return trading_pairs
         else:
-            error_msg = response.get("retMsg", "Неизвестная ошибка")
-            raise Exception(f"Ошибка API Bybit: {error_msg}")
-            
-    except Exception as e:
-        print(f"Ошибка получения баланса: {e}")
-        return 0.0, {}
-
-def get_available_trading_pairs(amount_of_pair=1000):
-    """
-    Получает список доступных торговых пар
-    
-    Args:
-        amount_of_pair (int): Максимальное количество пар для возврата
-        
-    Returns:
-        list: Список торговых пар
-    """
-    endpoint = '/v5/market/instruments-info'
-    params = {'category': 'spot'}
-    
-    try:
-        response = send_request(endpoint, "GET", params)
-        
-        if response.get("retCode") == 0 and response.get("result") and response["result"].get("list"):
-            trading_pairs = [pair['symbol'] for pair in response['result']['list']]
-            
-            if amount_of_pair > len(trading_pairs) or amount_of_pair < 0:
-                return trading_pairs
-            else:
-                return trading_pairs[:amount_of_pair]
-        else:
-            error_msg = response.get("retMsg", "Неизвестная ошибка")
-            print(f"Ошибка получения торговых пар: {error_msg}")
-            return []
-            
-    except Exception as e:
-        print(f"Ошибка получения торговых пар: {e}")
+            return trading_pairs[:amount_of_pair]
+    else:
+        error_msg = response.get("retMsg", "Неизвестная ошибка")
+        print(f"Ошибка получения торговых пар: {error_msg}")
         return []
 
-def get_opened_positions(settleCoin="USDT"):
-    """
-    Получает открытые позиции для указанной расчетной валюты
-    
-    Args:
-        settleCoin (str): Расчетная валюта ("USDT" или "USDC")
-        
-    Returns:
-        list: Список позиций [[symbol, avg_price, position_size], ...]
-    """
-    endpoint = "/v5/position/list"
-    params = {
-        "category": "linear",
-        "settleCoin": settleCoin
-    }
-    
-    try:
-        response = send_request(endpoint, "GET", params)
-        
-        if response.get("retCode") == 0 and response.get("result") and response["result"].get("list"):
-            result = []
-            for position in response["result"]["list"]:
-                symbol = position.get("symbol")
-                avg_price = position.get("avgPrice", "0")
-                position_size = position.get("size", "0")
-                
-                if symbol and float(position_size) > 0:
-                    result.append([symbol, avg_price, position_size])
-            
-            return result
-        else:
-            error_msg = response.get("retMsg", "Неизвестная ошибка")
-            raise Exception(f"Ошибка API Bybit: {error_msg}")
+def _float_or_none(value):
+    return float(value) if value not in (None, "") else None
+
+def _parse_instruments(response):
+    if response.get("retCode") == 0 and response.get("result") and response["result"].get("list"):
+        result = []
+        for item in response['result']['list']:
+            if item.get('status', 'Trading') != 'Trading':
+                continue
+            lot_filter = item.get('lotSizeFilter', {})
+            price_filter = item.get('priceFilter', {})
+            result.append(Instrument(
+                symbol=item['symbol'],
+                base=item.get('baseCoin'),
+                quote=item.get('quoteCoin'),
+                tick_size=_float_or_none(price_filter.get('tickSize')),
+                lot_size=_float_or_none(lot_filter.get('basePrecision')),
+                min_qty=_float_or_none(lot_filter.get('minOrderQty')),
+                min_notional=_float_or_none(lot_filter.get('minOrderAmt')),
+                quote_step=_float_or_none(lot_filter.get('quotePrecision'))
+            ))
+        return result
+    else:
+        error_msg = response.get("retMsg", "Неизвестная ошибка")
+        raise Exception(f"Ошибка API Bybit: {error_msg}")
+
+def _parse_positions(response):
+    if response.get("retCode") == 0 and response.get("result") and response["result"].get("list"):
+        result = []
+        for position in response["result"]["list"]:
+            symbol = position.get("symbol")
+            avg_price = position.get("avgPrice", "0")
+            position_size = position.get("size", "0")
             
-    except Exception as e:
-        print(f"Ошибка получения позиций: {e}")
-        return []
+            if symbol and float(position_size) > 0:
+                result.append([symbol, avg_price, position_size])
+        
+        return result
+    else:
+        error_msg = response.get("retMsg", "Неизвестная ошибка")
+        raise Exception(f"Ошибка API Bybit: {error_msg}")
 
 def convert_interval(interval):
     """Конвертирует интервал в формат Bybit"""
@@ -231,18 +143,7 @@ def convert_interval(interval):
     
     return map_bybit.get(interval, "15")
 
-def get_some_last_kandle(symbol="BTCUSDT", interval="15m", limit=15):
-    """
-    Получает последние свечи для торговой пары
-    
-    Args:
-        symbol (str): Торговая пара
-        interval (str): Интервал свечи
-        limit (int): Количество свечей
-        
-    Returns:
-        list: Список кортежей (open_price, close_price)
-    """
+def _kline_params(symbol, interval, limit):
     converted_interval = convert_interval(interval)
     
     available_kline_interval = ["1", "3", "5", "15", "30", "60", "120", "240", "360", "720", "D", "W", "M"]
@@ -255,75 +156,481 @@ def get_some_last_kandle(symbol="BTCUSDT", interval="15m", limit=15):
         print("Количество свечей не может быть меньше 1. Используется 15")
         limit = 15
     
-    endpoint = "/v5/market/kline"
-    params = {
+    return {
         "category": "spot",
         "symbol": symbol,
         "interval": converted_interval,
         "limit": limit
     }
-    
-    try:
-        response = send_request(endpoint, "GET", params)
+
+def _parse_kandles(response):
+    if response.get("retCode") == 0 and response.get("result") and response["result"].get("list"):
+        list_of_candles = []
+        for candle in response['result']['list']:
+            list_of_candles.append((candle[1], candle[4]))
         
-        if response.get("retCode") == 0 and response.get("result") and response["result"].get("list"):
-            list_of_candles = []
-            for candle in response['result']['list']:
-                list_of_candles.append((candle[1], candle[4]))
-            
-            return list_of_candles
-        else:
-            error_msg = response.get("retMsg", "Неизвестная ошибка")
-            print(f"Ошибка получения свечей: {error_msg}")
-            return []
-            
-    except Exception as e:
-        print(f"Ошибка получения свечей: {e}")
+        return list_of_candles
+    else:
+        error_msg = response.get("retMsg", "Неизвестная ошибка")
+        print(f"Ошибка получения свечей: {error_msg}")
         return []
 
-def place_order(side, amount, symbol):
-    """
-    Размещает рыночный ордер
-    
-    Args:
-        side (str): "Buy" или "Sell"
-        amount (float): Сумма в USDT
-        symbol (str): Торговая пара
-        
-    Returns:
-        str: Результат операции
-    """
+def _parse_ohlcv(response):
+    if response.get("retCode") == 0 and response.get("result") is not None:
+        rows = [
+            (int(candle[0]), float(candle[1]), float(candle[2]), float(candle[3]),
+             float(candle[4]), float(candle[5]))
+            for candle in response['result'].get('list', [])
+        ]
+        rows.reverse()
+        return rows
+    else:
+        error_msg = response.get("retMsg") or response.get("message") or "Неизвестная ошибка"
+        raise Exception(f"Ошибка API Bybit: {error_msg}")
+
+def _validate_order(side, amount):
     if side not in ("Buy", "Sell"):
         return 'Параметр side должен быть "Buy" или "Sell"'
     
     if amount <= 0:
         return 'Сумма должна быть больше нуля'
     
-    available_pairs = get_available_trading_pairs()
-    if symbol not in available_pairs:
-        return f'Торговая пара {symbol} не найдена'
-    
-    endpoint = "/v5/order/create"
-    params = {
+    return None
+
+def _order_params(side, amount, symbol):
+    return {
         "category": "spot",
         "symbol": symbol,
         "side": side,
         "orderType": "Market",
-        "qty": str(amount),
+        "qty": format_amount(amount),
         "marketUnit": "quoteCoin"
     }
+
+def _parse_order(response):
+    if response.get("retCode") == 0:
+        return "OK"
+    else:
+        error_msg = response.get("retMsg", "Неизвестная ошибка")
+        return f"Ошибка: {error_msg}"
+
+def _batch_order_params(chunk):
+    request = []
+    for order in chunk:
+        params = _order_params(order['side'], order['amount'], order['symbol'])
+        del params['category']
+        params['orderLinkId'] = order['client_order_id']
+        request.append(params)
+    return {"category": "spot", "request": request}
+
+def _parse_batch_orders(response, chunk):
+    """Результаты пачки: result.list и retExtInfo.list идут в порядке ордеров запроса"""
+    if response.get("retCode") != 0:
+        error_msg = response.get("retMsg") or response.get("message") or "Неизвестная ошибка"
+        return {order['client_order_id']: order_result(order, False, message=f"Ошибка: {error_msg}")
+                for order in chunk}
     
-    try:
-        response = send_request(endpoint, "POST", params)
+    placed = response.get("result", {}).get("list", [])
+    statuses = response.get("retExtInfo", {}).get("list", [])
+    by_id = {order['client_order_id']: order for order in chunk}
+    results = {}
+    for index, item in enumerate(placed):
+        order = by_id.get(item.get("orderLinkId")) or (chunk[index] if index < len(chunk) else None)
+        if order is None:
+            continue
+        status = statuses[index] if index < len(statuses) else {"code": 0, "msg": "OK"}
+        ok = status.get("code") == 0
+        results[order['client_order_id']] = order_result(
+            order, ok, item.get("orderId") or None, "OK" if ok else f"Ошибка: {status.get('msg')}")
+    return results
+
+class BybitClient:
+    """
+    Клиент Bybit с собственными ключами, пулом соединений и подготовленной подписью.
+
+    HMAC с секретным ключом создается один раз, на каждый запрос копируется
+    готовый шаблон. Несколько клиентов (аккаунтов, субаккаунтов) могут работать
+    в одном процессе одновременно, не разделяя глобального состояния.
+    
+    Args:
+        api_key (str): API-ключ
+        secret_key (str): Секретный ключ
+        session (PooledSession): Пул соединений; если не задан, создается новый
+        scheduler (RequestScheduler): Ограничитель частоты; по умолчанию общий для Bybit
+        slippage_guard (SlippageGuard): Проверка проскальзывания по стакану перед отправкой ордеров
+        **session_options: Настройки нового пула (pool_size, таймауты, повторы)
+    """
+
+    def __init__(self, api_key='', secret_key='', base_url=url, recv_window=recv_window,
+                 session=None, scheduler=None, slippage_guard=None, **session_options):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.recv_window = recv_window
+        self.session = session or PooledSession(base_url, **session_options)
+        self.scheduler = scheduler or get_scheduler('bybit')
+        self.slippage_guard = slippage_guard
+
+        self._hmac = hmac.new(secret_key.encode("utf-8"), digestmod=hashlib.sha256)
+        self._sign_prefix = f"{api_key}{recv_window}"
+        self._headers = {
+            'X-BAPI-API-KEY': api_key,
+            'X-BAPI-SIGN-TYPE': '2',
+            'X-BAPI-RECV-WINDOW': recv_window,
+            'Content-Type': 'application/json'
+        }
+
+    @classmethod
+    def from_config(cls, data, **kwargs):
+        """Создает клиента из словаря конфигурации с ключами API_KEY_BYBIT/API_SECRET_KEY_BYBIT"""
+        if 'API_KEY_BYBIT' not in data or 'API_SECRET_KEY_BYBIT' not in data:
+            raise KeyError("В config.json отсутствуют необходимые ключи")
+        if not data['API_KEY_BYBIT'] or not data['API_SECRET_KEY_BYBIT']:
+            raise ValueError("API-ключи не могут быть пустыми.")
+        return cls(data['API_KEY_BYBIT'], data['API_SECRET_KEY_BYBIT'], **kwargs)
+
+    def sign(self, payload_str, time_stamp):
+        """Подпись строки параметров (GET) или тела запроса (POST)"""
+        hash_obj = self._hmac.copy()
+        hash_obj.update(f"{time_stamp}{self._sign_prefix}{payload_str}".encode("utf-8"))
+        return hash_obj.hexdigest()
+
+    def build_headers(self, payload_str):
+        """Заголовки запроса с текущей меткой времени и подписью"""
+        time_stamp = str(int(time.time() * 1000))
+        headers = dict(self._headers)
+        headers['X-BAPI-TIMESTAMP'] = time_stamp
+        headers['X-BAPI-SIGN'] = self.sign(payload_str, time_stamp)
+        return headers
+
+    def send_request(self, endpoint, method, params_dict=None):
+        url_full = self.base_url + endpoint
         
-        if response.get("retCode") == 0:
-            return "OK"
-        else:
-            error_msg = response.get("retMsg", "Неизвестная ошибка")
-            return f"Ошибка: {error_msg}"
+        with track_request('bybit', endpoint, method) as track:
+            try:
+                # Разрешение получаем до подписи, чтобы ожидание не съедало recv_window
+                track.phase('rate_limit', self.scheduler.acquire(endpoint))
+                if method == "POST":
+                    payload = json.dumps(params_dict, separators=(',', ':'))
+                    data = payload
+                else:
+                    # Строка запроса отправляется ровно в том виде, в котором подписана
+                    payload = "&".join([f"{k}={v}" for k, v in sorted(params_dict.items())]) if params_dict else ""
+                    data = None
+                    if payload:
+                        url_full += "?" + payload
+
+                def prepare(attempt):
+                    # Повтор тоже получает разрешение ограничителя и подписывается
+                    # заново, чтобы не выйти за recv_window
+                    if attempt:
+                        track.phase('rate_limit', self.scheduler.acquire(endpoint))
+                    with track.timed('sign'):
+                        return {'headers': self.build_headers(payload)}
+
+                def on_response(response):
+                    self.scheduler.update(endpoint, response.status_code, response.headers)
+
+                with track.timed('http'):
+                    response = self.session.request(method, url_full, prepare=prepare,
+                                                    on_response=on_response, data=data)
+                
+                track.status = response.status_code
+                track.phase('server', response.elapsed.total_seconds())
+                response.raise_for_status()
+                
+            except requests.exceptions.RequestException as e:
+                print(f"[Ошибка сети] {e}")
+                track.error = "network"
+                return {"error": "network", "message": str(e)}
             
-    except Exception as e:
-        return f"Ошибка размещения ордера: {e}"
+            try:
+                with track.timed('decode'):
+                    data = response.json()
+                track.check_payload(data)
+                self.scheduler.update(endpoint, payload=data)
+                return data
+            except requests.exceptions.JSONDecodeError:
+                print("[Ошибка] Не удалось декодировать JSON.")
+                track.error = "invalid_json"
+                return {
+                    "error": "invalid_json", 
+                    "status_code": response.status_code,
+                    "text": response.text
+                }
+
+    def get_balance(self):
+        """
+        Получает баланс аккаунта Bybit
+        
+        Returns:
+            tuple: (общий_баланс_USDT, словарь_монет)
+        """
+        params = {"accountType": "UNIFIED"}
+        
+        try:
+            response = self.send_request(BALANCE_ENDPOINT, "GET", params)
+            return _parse_balance(response)
+                
+        except Exception as e:
+            print(f"Ошибка получения баланса: {e}")
+            return 0.0, {}
+
+    def get_available_trading_pairs(self, amount_of_pair=1000):
+        """
+        Получает список доступных торговых пар
+        
+        Args:
+            amount_of_pair (int): Максимальное количество пар для возврата
+            
+        Returns:
+            list: Список торговых пар
+        """
+        params = {'category': 'spot'}
+        
+        try:
+            response = self.send_request(INSTRUMENTS_ENDPOINT, "GET", params)
+            return _parse_trading_pairs(response, amount_of_pair)
+                
+        except Exception as e:
+            print(f"Ошибка получения торговых пар: {e}")
+            return []
+
+    def fetch_instruments(self):
+        """
+        Загружает полные параметры спотовых инструментов (шаг цены, лота, минимумы)
+        
+        Returns:
+            list: Список Instrument
+        """
+        response = self.send_request(INSTRUMENTS_ENDPOINT, "GET", {'category': 'spot'})
+        return _parse_instruments(response)
+
+    def get_opened_positions(self, settleCoin="USDT"):
+        """
+        Получает открытые позиции для указанной расчетной валюты
+        
+        Args:
+            settleCoin (str): Расчетная валюта ("USDT" или "USDC")
+            
+        Returns:
+            list: Список позиций [[symbol, avg_price, position_size], ...]
+        """
+        params = {
+            "category": "linear",
+            "settleCoin": settleCoin
+        }
+        
+        try:
+            response = self.send_request(POSITIONS_ENDPOINT, "GET", params)
+            return _parse_positions(response)
+                
+        except Exception as e:
+            print(f"Ошибка получения позиций: {e}")
+            return []
+
+    def get_some_last_kandle(self, symbol="BTCUSDT", interval="15m", limit=15):
+        """
+        Получает последние свечи для торговой пары
+        
+        Args:
+            symbol (str): Торговая пара
+            interval (str): Интервал свечи
+            limit (int): Количество свечей
+            
+        Returns:
+            list: Список кортежей (open_price, close_price)
+        """
+        params = _kline_params(symbol, interval, limit)
+        
+        try:
+            response = self.send_request(KLINE_ENDPOINT, "GET", params)
+            return _parse_kandles(response)
+                
+        except Exception as e:
+            print(f"Ошибка получения свечей: {e}")
+            return []
+
+    def get_klines(self, symbol, interval="1m", start=None, end=None, limit=1000):
+        """
+        Получает полные свечи OHLCV за диапазон времени
+        
+        Args:
+            symbol (str): Торговая пара
+            interval (str): Интервал свечи ("1m", "15m", "1h", ...)
+            start (int): Начало диапазона, мс (включительно)
+            end (int): Конец диапазона, мс (включительно)
+            limit (int): Количество свечей, не больше 1000
+            
+        Returns:
+            list: Кортежи (timestamp_ms, open, high, low, close, volume) по возрастанию времени
+            
+        Raises:
+            Exception: При ошибке API или сети
+        """
+        params = {
+            "category": "spot",
+            "symbol": symbol,
+            "interval": convert_interval(interval),
+            "limit": min(limit, KLINE_MAX_LIMIT)
+        }
+        if start is not None:
+            params["start"] = int(start)
+        if end is not None:
+            params["end"] = int(end)
+        
+        return _parse_ohlcv(self.send_request(KLINE_ENDPOINT, "GET", params))
+
+    def place_order(self, side, amount, symbol):
+        """
+        Размещает рыночный ордер
+        
+        Args:
+            side (str): "Buy" или "Sell"
+            amount (float): Сумма в USDT
+            symbol (str): Торговая пара
+            
+        Returns:
+            str: Результат операции
+        """
+        error = _validate_order(side, amount)
+        if not error:
+            amount, error = self.check_slippage(side, amount, symbol)
+        error = error or instruments.validate_order(symbol, notional=amount)
+        if error:
+            return error
+        
+        try:
+            response = self.send_request(ORDER_ENDPOINT, "POST", _order_params(side, amount, symbol))
+            return _parse_order(response)
+                
+        except Exception as e:
+            return f"Ошибка размещения ордера: {e}"
+
+    def place_batch_orders(self, orders, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Размещает несколько рыночных ордеров пачками по BATCH_ORDER_MAX_SIZE
+        
+        Args:
+            orders (list): Словари {'side', 'amount', 'symbol', 'client_order_id'} или кортежи (side, amount, symbol)
+            max_workers (int): Число пачек, отправляемых одновременно
+            
+        Returns:
+            list: Результаты в порядке ордеров: client_order_id, ok, order_id, message
+        """
+        def validate(order):
+            error = _validate_order(order['side'], order['amount'])
+            if not error:
+                order['amount'], error = self.check_slippage(order['side'], order['amount'], order['symbol'])
+            return error or instruments.validate_order(order['symbol'], notional=order['amount'])
+        
+        def send_chunk(chunk):
+            response = self.send_request(BATCH_ORDER_ENDPOINT, "POST", _batch_order_params(chunk))
+            return _parse_batch_orders(response, chunk)
+        
+        return submit_in_chunks(normalize_orders(orders), BATCH_ORDER_MAX_SIZE, send_chunk,
+                                validate, max_workers)
+
+    def check_slippage(self, side, amount, symbol):
+        """
+        Проверяет ордер на сумму amount USDT по стакану (если задан slippage_guard).
+
+        Returns:
+            tuple: (сумма - исходная или уменьшенная до допуска, текст ошибки или None)
+        """
+        if self.slippage_guard is None:
+            return amount, None
+        return self.slippage_guard.check('bybit', symbol, side, notional=amount)
+
+    def get_session_stats(self):
+        return self.session.get_stats()
+
+    def close(self):
+        self.session.close()
+
+# Клиент по умолчанию для функций уровня модуля (CLI, веб-сервер)
+session = PooledSession(url)
+session_options = {}
+_default_client = BybitClient(session=session)
+
+def get_default_client():
+    """Возвращает клиента, которым пользуются функции модуля"""
+    return _default_client
+
+def get_info_from_json():
+    global api_key, secret_key, _default_client
+    
+    config_path = find_config()
+    
+    try:
+        with open(config_path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+            
+        new_session_options = session_options_from_config(data)
+        if new_session_options and new_session_options != session_options:
+            configure_session(**new_session_options)
+            
+        # Ордера клиента по умолчанию (CLI, веб-сервер, OrderExecution) проверяются по стаканам
+        from market_data.fill_estimator import get_default_guard
+        _default_client = BybitClient.from_config(data, session=session, slippage_guard=get_default_guard('bybit', instruments))
+        api_key = data['API_KEY_BYBIT']
+        secret_key = data['API_SECRET_KEY_BYBIT']
+            
+        print("Конфигурация Bybit загружена успешно!")
+        
+    except json.JSONDecodeError:
+        raise ValueError("Ошибка чтения JSON")
+
+def configure_session(**options):
+    """Пересоздает пул соединений с новыми настройками (pool_size, таймауты, повторы)"""
+    global session, session_options
+    old_session = session
+    session = PooledSession(url, **options)
+    session_options = dict(options)
+    _default_client.session = session
+    old_session.close()
+
+def get_session_stats():
+    """Возвращает статистику пула соединений и повторов Bybit"""
+    return session.get_stats()
+
+def get_rate_limit_stats():
+    """Возвращает очереди и бюджеты ограничителя частоты Bybit"""
+    return _default_client.scheduler.get_stats()
+
+def get_sign_for_get(params_str, time_stamp):
+    return _default_client.sign(params_str, time_stamp)
+
+def get_sign_for_post(payload_str, timestamp):
+    return _default_client.sign(payload_str, timestamp)
+
+def send_request(endpoint, method, params_dict=None):
+    return _default_client.send_request(endpoint, method, params_dict)
+
+def get_balance():
+    return _default_client.get_balance()
+
+def get_available_trading_pairs(amount_of_pair=1000):
+    return _default_client.get_available_trading_pairs(amount_of_pair)
+
+def fetch_instruments():
+    return _default_client.fetch_instruments()
+
+instruments = InstrumentRegistry('bybit', fetch_instruments, snapshot_path=snapshot_path_for('bybit'))
+
+def get_opened_positions(settleCoin="USDT"):
+    return _default_client.get_opened_positions(settleCoin)
+
+def get_some_last_kandle(symbol="BTCUSDT", interval="15m", limit=15):
+    return _default_client.get_some_last_kandle(symbol, interval, limit)
+
+def get_klines(symbol, interval="1m", start=None, end=None, limit=1000):
+    return _default_client.get_klines(symbol, interval, start, end, limit)
+
+def place_order(side, amount, symbol):
+    return _default_client.place_order(side, amount, symbol)
+
+def place_batch_orders(orders, max_workers=DEFAULT_MAX_WORKERS):
+    return _default_client.place_batch_orders(orders, max_workers)
 
 if __name__ == "__main__":
     # Тест функций
@@ -47,7 +47,9 @@ def init_db():
             id INTEGER PRIMARY KEY,
             daily_loss_limit REAL DEFAULT 5.0,
             max_open_trades INTEGER DEFAULT 10,
-            slippage_tolerance REAL DEFAULT 0.5
+            slippage_tolerance REAL DEFAULT 0.5,
+            slippage_mode TEXT DEFAULT 'downsize',
+            require_order_book INTEGER DEFAULT 0
         );
         '''
     ]
@@ -58,6 +60,7 @@ def init_db():
             cursor = conn.cursor()
             for table in tables:
                 cursor.execute(table)
+            _migrate_risk_limits(cursor)
             conn.commit()
             print("База данных успешно инициализирована")
             return True
@@ -151,5 +154,51 @@ def get_db_stats():
             "risk_limits_set": False
         }
 
+# Колонки risk_limits, добавленные после первой версии схемы
+RISK_LIMITS_MIGRATIONS = {
+    'slippage_mode': "TEXT DEFAULT 'downsize'",
+    'require_order_book': "INTEGER DEFAULT 0"
+}
+
+def _migrate_risk_limits(cursor):
+    """Добавляет недостающие колонки в risk_limits уже созданной базы"""
+    cursor.execute("PRAGMA table_info(risk_limits)")
+    existing = {row[1] for row in cursor.fetchall()}
+    for column, definition in RISK_LIMITS_MIGRATIONS.items():
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE risk_limits ADD COLUMN {column} {definition}")
+
+DEFAULT_SLIPPAGE_TOLERANCE = 0.5
+DEFAULT_SLIPPAGE_MODE = 'downsize'
+
+def get_slippage_settings():
+    """
+    Настройки проверки проскальзывания из risk_limits:
+    tolerance - допуск в процентах, mode - 'downsize', 'reject' или 'off',
+    require_book - отклонять ордера, для которых нет согласованного стакана.
+    """
+    settings = {'tolerance': DEFAULT_SLIPPAGE_TOLERANCE, 'mode': DEFAULT_SLIPPAGE_MODE, 'require_book': False}
+    conn = create_connection()
+    if not conn:
+        return settings
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM risk_limits ORDER BY id LIMIT 1")
+        row = cursor.fetchone()
+        if row:
+            values = dict(zip([column[0] for column in cursor.description], row))
+            if values.get('slippage_tolerance') is not None:
+                settings['tolerance'] = values['slippage_tolerance']
+            if values.get('slippage_mode'):
+                settings['mode'] = values['slippage_mode']
+            if values.get('require_order_book') is not None:
+                settings['require_book'] = bool(values['require_order_book'])
+        return settings
+    except Error as e:
+        print(f"Ошибка чтения risk_limits: {e}")
+        return settings
+    finally:
+        conn.close()
+
 if __name__ == "__main__":
     init_db()
\ No newline at end of file
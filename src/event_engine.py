@@ -0,0 +1,623 @@
+"""
+Событийный движок стратегий.
+
+Источники (воспроизведение свечей из хранилища/CSV, опрос REST, потоки
+WebSocket из market_data.ws_feed) публикуют события MarketEvent в шину
+MarketDataBus. Движок собирает из них свечи по (биржа, пара, интервал) и
+раздает их подпискам стратегий: у каждой подписки своя очередь и своя
+задача asyncio, а стратегии-функции вызываются в пуле потоков, поэтому
+медленная стратегия не задерживает потоки данных и остальные подписки.
+Сигналы передаются исполнению (печать, ордера через асинхронные клиенты).
+
+Для каждой подписки измеряются задержки: от получения события до сигнала
+(tick-to-signal) и от сигнала до ответа исполнения (signal-to-order).
+"""
+
+import asyncio
+import inspect
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from market_data.candle_window import CandleWindow, read_only
+from market_data.history import INTERVAL_MS
+from market_data.ws_feed import MarketDataBus, MarketEvent
+from strategies.base_strategy import BaseStrategy
+from src.metrics import (ENGINE_SIGNAL_TO_ORDER_SECONDS, ENGINE_TICK_TO_SIGNAL_SECONDS,
+                         STRATEGY_ERRORS_TOTAL, STRATEGY_SIGNAL_SECONDS, STRATEGY_SIGNALS_TOTAL)
+
+BAR_FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+DEFAULT_WINDOW = 200
+LATENCY_SAMPLES = 10_000
+
+# Сигнал стратегии, переданный исполнению.
+# event_ts - время получения исходного события (time.time()), signal_ts - время сигнала
+SignalEvent = namedtuple('SignalEvent', ['subscription', 'exchange', 'symbol', 'interval', 'signal',
+                                         'price', 'bar_ts', 'event_ts', 'signal_ts'])
+
+
+class BarSeries:
+    """
+    Закрытые свечи одной пары и интервала плюс формирующаяся свеча.
+
+    Свечи лежат в заранее выделенном буфере (поля x свечи); формирующаяся
+    свеча занимает ячейку сразу за последней закрытой. Окна подписок -
+    представления CandleWindow над буфером только для чтения, без копий.
+    Буфер только дописывается; когда он заполнен или меняется уже закрытая
+    свеча, выделяется новый, поэтому окна в очередях подписок не меняются
+    (кроме формирующейся свечи - тиковые окна видят ее последнее состояние).
+    """
+
+    def __init__(self, exchange, symbol, interval, capacity=DEFAULT_WINDOW):
+        self.exchange = exchange
+        self.symbol = symbol
+        self.interval = interval
+        self.capacity = capacity
+        self.attrs = {'exchange': exchange, 'symbol': symbol, 'interval': interval}
+        self.forming = None
+        self.version = 0
+        self._data = np.empty((len(BAR_FIELDS), 0), dtype=np.float64)
+        self._length = 0
+        self._reallocate(capacity)
+
+    def __len__(self):
+        return self._length
+
+    def _reallocate(self, keep):
+        keep = min(keep, self._length)
+        data = np.empty((len(BAR_FIELDS), self.capacity * 2 + 1), dtype=np.float64)
+        data[:, :keep] = self._data[:, self._length - keep:self._length]
+        self._data = data
+        self._length = keep
+        view = read_only(data)
+        self._columns = {field: view[row] for row, field in enumerate(BAR_FIELDS)}
+        self._write_forming()
+
+    def _write_forming(self):
+        if self.forming is not None:
+            self._data[:, self._length] = [self.forming[field] for field in BAR_FIELDS]
+
+    def ensure_capacity(self, window):
+        if window > self.capacity:
+            self.capacity = window
+            self._reallocate(self._length)
+
+    @property
+    def last_timestamp(self):
+        return int(self._data[0, self._length - 1]) if self._length else None
+
+    def append(self, bar):
+        """Добавляет закрытую свечу; повтор последней свечи заменяет ее"""
+        row = [bar[field] for field in BAR_FIELDS]
+        if self._length and row[0] <= self._data[0, self._length - 1]:
+            if row[0] == self._data[0, self._length - 1]:
+                self._reallocate(self._length)
+                self._data[:, self._length - 1] = row
+                self.version += 1
+            return
+        if self._length + 1 >= self._data.shape[1]:
+            self._reallocate(self.capacity)
+        self._data[:, self._length] = row
+        self._length += 1
+        if self.forming is not None and self.forming['timestamp'] <= row[0]:
+            self.forming = None
+        self._write_forming()
+        self.version += 1
+
+    def update_forming(self, bar):
+        """Заменяет формирующуюся свечу (незакрытая свеча потока или REST)"""
+        self.forming = dict(bar)
+        self._write_forming()
+        self.version += 1
+
+    def update_price(self, price, qty=0.0, ts=None):
+        """Обновляет формирующуюся свечу по тикеру или сделке"""
+        if price is None:
+            return False
+        forming = self.forming
+        if forming is None:
+            start = self.last_timestamp + INTERVAL_MS.get(self.interval, 0) if self._length else ts or 0
+            forming = {'timestamp': start, 'open': price, 'high': price, 'low': price,
+                       'close': price, 'volume': 0.0}
+        forming['high'] = max(forming['high'], price)
+        forming['low'] = min(forming['low'], price)
+        forming['close'] = price
+        forming['volume'] += qty
+        self.forming = forming
+        self._write_forming()
+        self.version += 1
+        return True
+
+    def window(self, window, include_forming=False):
+        """Окно последних window свечей (CandleWindow), помеченное для общего кэша индикаторов"""
+        stop = self._length + (1 if include_forming and self.forming is not None else 0)
+        return CandleWindow(self._columns, max(stop - window, 0), stop, self.attrs)
+
+
+class LatencyStats:
+    """Последние замеры задержки и их перцентили (в миллисекундах)"""
+
+    def __init__(self, maxlen=LATENCY_SAMPLES):
+        self._samples = deque(maxlen=maxlen)
+        self.count = 0
+
+    def add(self, seconds):
+        self._samples.append(seconds)
+        self.count += 1
+
+    def summary(self):
+        if not self._samples:
+            return {'count': 0}
+        values = np.fromiter(self._samples, dtype=np.float64) * 1000
+        p50, p99 = np.percentile(values, [50, 99])
+        return {'count': self.count, 'mean_ms': float(values.mean()), 'p50_ms': float(p50),
+                'p99_ms': float(p99), 'max_ms': float(values.max())}
+
+
+class StrategySubscription:
+    """
+    Стратегия на одной паре: очередь событий, окно свечей, статистика.
+
+    strategy - функция (свечи, params) -> 'buy'/'sell'/'hold'; вызывается, когда
+    накоплено window свечей. on_tick=True вызывает ее и на тиках по окну с
+    формирующейся свечой; тики, пришедшие, пока стратегия занята,
+    объединяются в один вызов. Экземпляр BaseStrategy получает закрытые
+    свечи через on_bar и тики через on_tick.
+
+    threaded=True вызывает стратегию в пуле потоков движка, а не в цикле
+    событий; по умолчанию так вызываются стратегии-функции (расчет по окну),
+    а BaseStrategy с обновлением O(1) на свечу - прямо в цикле событий.
+    """
+
+    def __init__(self, name, strategy, exchange, symbol, interval, params=None,
+                 window=DEFAULT_WINDOW, on_tick=False, repeat_signals=False, views=True, threaded=None):
+        self.strategy = strategy
+        self.stateful = isinstance(strategy, BaseStrategy)
+        self.threaded = not self.stateful if threaded is None else threaded
+        self.strategy_name = type(strategy).__name__ if self.stateful else getattr(strategy, '__name__', 'strategy')
+        self.name = name or f"{self.strategy_name}:{exchange}:{symbol}:{interval}"
+        self.exchange = exchange
+        self.symbol = symbol
+        self.interval = interval
+        self.params = params or {}
+        self.window = window
+        self.on_tick = on_tick
+        self.repeat_signals = repeat_signals
+        self.views = views
+
+        self.queue = asyncio.Queue()
+        self.last_signal = None
+        self.last_routed = None
+        self._pending_tick = None
+
+        self.tick_to_signal = LatencyStats()
+        self.signal_to_order = LatencyStats()
+        self.stats = {'bars': 0, 'ticks': 0, 'coalesced': 0, 'errors': 0, 'orders': 0,
+                      'signals': {'buy': 0, 'sell': 0, 'hold': 0}}
+
+        self._tick_to_signal_metric = ENGINE_TICK_TO_SIGNAL_SECONDS.labels(self.name)
+        self._signal_to_order_metric = ENGINE_SIGNAL_TO_ORDER_SECONDS.labels(self.name)
+
+    @property
+    def key(self):
+        return self.exchange, self.symbol, self.interval
+
+    def enqueue(self, window, event_ts, bar_ts, tick=False):
+        if not tick:
+            self.queue.put_nowait((window, event_ts, bar_ts))
+            return
+        if self._pending_tick is not None:
+            # Время самого раннего необработанного события сохраняется для честного замера
+            self._pending_tick = (window, self._pending_tick[1], bar_ts)
+            self.stats['coalesced'] += 1
+            return
+        self._pending_tick = (window, event_ts, bar_ts)
+        self.queue.put_nowait(None)
+
+    def next_item(self, item):
+        """Элемент очереди -> (окно, время события, время свечи, тик ли это)"""
+        if item is None:
+            item, self._pending_tick = self._pending_tick, None
+            self.stats['ticks'] += 1
+            return item + (True,)
+        self.stats['bars'] += 1
+        return item + (False,)
+
+    def get_stats(self):
+        return {
+            'strategy': self.strategy_name,
+            'exchange': self.exchange,
+            'symbol': self.symbol,
+            'interval': self.interval,
+            **self.stats,
+            'queue': self.queue.qsize(),
+            'last_signal': self.last_signal,
+            'tick_to_signal': self.tick_to_signal.summary(),
+            'signal_to_order': self.signal_to_order.summary()
+        }
+
+
+def print_execution(signal):
+    """Исполнение по умолчанию: вывод сигнала"""
+    print(f"{time.ctime(signal.signal_ts)} | {signal.subscription} {signal.symbol}: "
+          f"{signal.signal.upper()} по {signal.price}")
+
+
+class OrderExecution:
+    """
+    Исполнение сигналов рыночными ордерами через асинхронные клиенты бирж.
+
+    Args:
+        amount (float): Сумма ордера в котируемой валюте
+        clients (dict): {биржа: AsyncBybitClient | AsyncOkxClient}; по умолчанию
+                        клиенты общего цикла событий src.async_exchange создаются заново
+                        и подписывают ордера клиентами модулей bybit/okx, которые
+                        после get_info_from_json проверяют проскальзывание по стакану
+    """
+
+    def __init__(self, amount, clients=None):
+        self.amount = amount
+        self.clients = clients
+
+    def _client(self, exchange):
+        if self.clients is None:
+            from src.async_exchange import AsyncBybitClient, AsyncOkxClient
+            self.clients = {'bybit': AsyncBybitClient(), 'okx': AsyncOkxClient()}
+        return self.clients[exchange]
+
+    async def __call__(self, signal):
+        result = await self._client(signal.exchange).place_order(signal.signal, self.amount, signal.symbol)
+        print(f"{time.ctime()} | {signal.subscription} {signal.symbol}: {signal.signal.upper()} -> {result}")
+        return result
+
+    async def close(self):
+        for client in (self.clients or {}).values():
+            await client.close()
+
+
+class EventEngine:
+    """
+    Ядро событийного движка.
+
+    Пример:
+        engine = EventEngine()
+        engine.add_feed(ReplayFeed(engine.bus, 'bybit', 'BTCUSDT', '1m', candles))
+        engine.add_strategy(generate_signal, 'bybit', 'BTCUSDT', '1m', params)
+        asyncio.run(engine.run())
+
+    Args:
+        bus (MarketDataBus): Шина событий (по умолчанию - новая)
+        execution (callable): Функция или корутина, принимающая SignalEvent
+        route_hold (bool): Передавать ли исполнению сигналы hold
+    """
+
+    def __init__(self, bus=None, execution=print_execution, route_hold=False):
+        self.bus = bus or MarketDataBus()
+        self.execution = execution
+        self.route_hold = route_hold
+        self.feeds = []
+        self.subscriptions = []
+        self._series = {}
+        self._by_key = {}
+        self._by_symbol = {}
+        self._token = None
+        self._stopped = None
+        self._executor = None
+
+    def add_feed(self, feed):
+        """Источник событий: объект с корутиной run() и методом stop()"""
+        self.feeds.append(feed)
+        return feed
+
+    def add_strategy(self, strategy, exchange, symbol, interval='1m', params=None, window=DEFAULT_WINDOW,
+                     on_tick=False, repeat_signals=False, views=True, name=None, threaded=None):
+        """
+        Подписывает стратегию на свечи пары.
+
+        Args:
+            strategy: Функция (df, params) -> 'buy'/'sell'/'hold' или экземпляр
+                      BaseStrategy (получает свечи по одной через on_bar/on_tick)
+            window (int): Сколько последних свечей передавать стратегии-функции
+            on_tick (bool): Вызывать стратегию и на тиках (с формирующейся свечой)
+            repeat_signals (bool): Передавать исполнению повтор того же сигнала
+            views (bool): Передавать окно CandleWindow без копии; False - копию
+                          в виде DataFrame (для стратегий, которым нужен pandas)
+            name (str): Имя подписки (по умолчанию стратегия:биржа:пара:интервал)
+            threaded (bool): Вызывать стратегию в пуле потоков, чтобы она не
+                             блокировала цикл событий (по умолчанию - для
+                             стратегий-функций, но не для BaseStrategy)
+
+        Returns:
+            StrategySubscription
+        """
+        if isinstance(strategy, BaseStrategy):
+            # Состояние хранит сама стратегия, ей нужна только последняя свеча
+            window = 1
+            params = strategy.params
+        subscription = StrategySubscription(name, strategy, exchange, symbol, interval, params,
+                                            window, on_tick, repeat_signals, views, threaded)
+        series = self._series.get(subscription.key)
+        if series is None:
+            series = BarSeries(exchange, symbol, interval, window)
+            self._series[subscription.key] = series
+        series.ensure_capacity(window)
+
+        self.subscriptions.append(subscription)
+        self._by_key.setdefault(subscription.key, []).append(subscription)
+        self._by_symbol.setdefault((exchange, symbol), []).append(subscription)
+        return subscription
+
+    def series(self, exchange, symbol, interval):
+        return self._series.get((exchange, symbol, interval))
+
+    def warm_up(self, exchange, symbol, interval, candles):
+        """Загружает историю свечей до запуска, без вызова стратегий"""
+        series = self._series.get((exchange, symbol, interval))
+        if series is None:
+            return
+        for bar in _iter_bars(candles):
+            series.append(bar)
+
+    def on_event(self, event):
+        """Обработчик шины: обновляет свечи и ставит вызовы стратегий в очереди подписок"""
+        if event.channel == 'kline':
+            self._on_kline(event)
+        elif event.channel in ('ticker', 'trade'):
+            self._on_tick(event)
+
+    def _on_kline(self, event):
+        data = event.data
+        key = (event.exchange, event.symbol, data['interval'])
+        series = self._series.get(key)
+        if series is None:
+            return
+        bar = {'timestamp': data['start'], 'open': data['open'], 'high': data['high'],
+               'low': data['low'], 'close': data['close'], 'volume': data['volume']}
+        if data.get('confirm', True):
+            series.append(bar)
+            for subscription in self._by_key[key]:
+                if len(series) >= subscription.window:
+                    subscription.enqueue(series.window(subscription.window), event.recv_ts, bar['timestamp'])
+        else:
+            series.update_forming(bar)
+            for subscription in self._by_key[key]:
+                if subscription.on_tick and len(series) + 1 >= subscription.window:
+                    subscription.enqueue(series.window(subscription.window, True), event.recv_ts,
+                                         bar['timestamp'], tick=True)
+
+    def _on_tick(self, event):
+        data = event.data
+        if event.channel == 'ticker':
+            price, qty = data.get('last'), 0.0
+        else:
+            price, qty = data.get('price'), data.get('qty') or 0.0
+        # Свеча обновляется один раз на событие, даже если на нее подписаны несколько стратегий
+        updated = {}
+        for subscription in self._by_symbol.get((event.exchange, event.symbol), []):
+            series = self._series[subscription.key]
+            if subscription.key not in updated:
+                updated[subscription.key] = series.update_price(price, qty, event.exchange_ts)
+            if updated[subscription.key] and subscription.on_tick and len(series) + 1 >= subscription.window:
+                subscription.enqueue(series.window(subscription.window, True), event.recv_ts,
+                                     series.forming['timestamp'], tick=True)
+
+    async def _worker(self, subscription):
+        while True:
+            window, event_ts, bar_ts, tick = subscription.next_item(await subscription.queue.get())
+            try:
+                await self._evaluate(subscription, window, event_ts, bar_ts, tick)
+            finally:
+                subscription.queue.task_done()
+
+    def _call_strategy(self, subscription, window, bar_ts, tick):
+        strategy = subscription.strategy
+        if not subscription.stateful:
+            return strategy(window if subscription.views else window.to_frame(), subscription.params)
+        if tick:
+            return strategy.on_tick({'price': float(window.last('close')), 'exchange': subscription.exchange,
+                                     'symbol': subscription.symbol, 'timestamp': bar_ts})
+        bar = window.bar()
+        bar['exchange'] = subscription.exchange
+        return strategy.on_bar(bar)
+
+    def _timed_call(self, subscription, window, bar_ts, tick):
+        with STRATEGY_SIGNAL_SECONDS.labels(subscription.strategy_name).time():
+            return self._call_strategy(subscription, window, bar_ts, tick)
+
+    async def _evaluate(self, subscription, window, event_ts, bar_ts, tick=False):
+        try:
+            if subscription.threaded and self._executor is not None:
+                # Подписка ждет своего вызова, поэтому вызовы одной стратегии не пересекаются
+                signal = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, self._timed_call, subscription, window, bar_ts, tick)
+            else:
+                signal = self._timed_call(subscription, window, bar_ts, tick)
+        except Exception as e:
+            subscription.stats['errors'] += 1
+            STRATEGY_ERRORS_TOTAL.labels(subscription.strategy_name).inc()
+            print(f"Ошибка стратегии {subscription.name}: {e}")
+            return
+
+        signal_ts = time.time()
+        latency = max(signal_ts - event_ts, 0.0)
+        subscription.tick_to_signal.add(latency)
+        subscription._tick_to_signal_metric.observe(latency)
+        subscription.stats['signals'][signal] = subscription.stats['signals'].get(signal, 0) + 1
+        subscription.last_signal = signal
+        STRATEGY_SIGNALS_TOTAL.labels(subscription.strategy_name, signal).inc()
+
+        if signal == 'hold' and not self.route_hold:
+            return
+        if signal == subscription.last_routed and not subscription.repeat_signals:
+            return
+        subscription.last_routed = signal
+        if self.execution is None:
+            return
+
+        event = SignalEvent(subscription.name, subscription.exchange, subscription.symbol,
+                            subscription.interval, signal, float(window.last('close')), int(bar_ts),
+                            event_ts, signal_ts)
+        try:
+            result = self.execution(event)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            subscription.stats['errors'] += 1
+            print(f"Ошибка исполнения сигнала {subscription.name}: {e}")
+            return
+        latency = time.time() - signal_ts
+        subscription.signal_to_order.add(latency)
+        subscription._signal_to_order_metric.observe(latency)
+        subscription.stats['orders'] += 1
+
+    async def run(self):
+        """
+        Запускает источники и подписки. Завершается, когда все конечные
+        источники (воспроизведение) отработали и очереди разобраны, либо по stop().
+        """
+        self._stopped = asyncio.Event()
+        self._token = self.bus.subscribe(self.on_event)
+        threaded = sum(subscription.threaded for subscription in self.subscriptions)
+        if threaded:
+            # По потоку на подписку: занятая стратегия не ждет освобождения чужого потока
+            self._executor = ThreadPoolExecutor(max_workers=threaded, thread_name_prefix='strategy')
+        workers = [asyncio.ensure_future(self._worker(subscription)) for subscription in self.subscriptions]
+        feeds = [asyncio.ensure_future(feed.run()) for feed in self.feeds]
+        stop_task = asyncio.ensure_future(self._stopped.wait())
+        try:
+            pending = set(feeds)
+            while pending and not self._stopped.is_set():
+                done, pending = await asyncio.wait(pending | {stop_task}, return_when=asyncio.FIRST_COMPLETED)
+                pending.discard(stop_task)
+                for task in done:
+                    if task is not stop_task and task.exception() is not None:
+                        print(f"Ошибка источника данных: {task.exception()}")
+            if not self._stopped.is_set():
+                await asyncio.gather(*(subscription.queue.join() for subscription in self.subscriptions))
+        finally:
+            for feed in self.feeds:
+                feed.stop()
+            for task in workers + feeds + [stop_task]:
+                task.cancel()
+            await asyncio.gather(*workers, *feeds, stop_task, return_exceptions=True)
+            self.bus.unsubscribe(self._token)
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def stop(self):
+        if self._stopped is not None:
+            self._stopped.set()
+
+    def get_stats(self):
+        """Статистика подписок: свечи, тики, сигналы, ошибки, задержки"""
+        return {subscription.name: subscription.get_stats() for subscription in self.subscriptions}
+
+
+def _iter_bars(candles):
+    """Свечи DataFrame или словаря колонок как словари BAR_FIELDS"""
+    columns = [np.asarray(candles[field]) for field in BAR_FIELDS]
+    for values in zip(*columns):
+        yield dict(zip(BAR_FIELDS, values))
+
+
+class ReplayFeed:
+    """
+    Воспроизведение закрытых свечей (хранилище, CSV, DataFrame) как событий kline.
+
+    Args:
+        candles: DataFrame или словарь колонок timestamp, open, high, low, close, volume
+        delay (float): Пауза между свечами, с (0 - максимально быстро)
+    """
+
+    def __init__(self, bus, exchange, symbol, interval, candles, delay=0.0):
+        self.bus = bus
+        self.exchange = exchange
+        self.symbol = symbol
+        self.interval = interval
+        self.candles = candles
+        self.delay = delay
+        self.published = 0
+        self._stopped = False
+
+    async def run(self):
+        for bar in _iter_bars(self.candles):
+            if self._stopped:
+                break
+            now = time.time()
+            await self.bus.publish(MarketEvent(self.exchange, 'kline', self.symbol, {
+                'interval': self.interval,
+                'start': int(bar['timestamp']),
+                'open': float(bar['open']),
+                'high': float(bar['high']),
+                'low': float(bar['low']),
+                'close': float(bar['close']),
+                'volume': float(bar['volume']),
+                'confirm': True
+            }, int(bar['timestamp']), now))
+            self.published += 1
+            await asyncio.sleep(self.delay)
+
+    def stop(self):
+        self._stopped = True
+
+
+class RestPollingFeed:
+    """
+    Опрос последних свечей через REST (src.bybit.get_klines, src.okx.get_history_klines).
+
+    Новые закрытые свечи публикуются как kline с confirm=True, текущая - с confirm=False.
+    """
+
+    def __init__(self, bus, exchange, symbols, interval='1m', poll_interval=5.0, limit=3):
+        self.bus = bus
+        self.exchange = exchange
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.poll_interval = poll_interval
+        self.limit = limit
+        self._last_closed = {}
+        self._stopped = None
+
+    def _fetch(self, symbol):
+        from src import bybit, okx
+        if self.exchange == 'bybit':
+            return bybit.get_klines(symbol, self.interval, limit=self.limit)
+        return okx.get_history_klines(symbol, self.interval, limit=self.limit)
+
+    async def _poll(self, symbol):
+        try:
+            rows = await asyncio.to_thread(self._fetch, symbol)
+        except Exception as e:
+            print(f"Ошибка опроса свечей {self.exchange} {symbol}: {e}")
+            return
+        recv_ts = time.time()
+        now_ms = int(recv_ts * 1000)
+        interval_ms = INTERVAL_MS[self.interval]
+        for timestamp, open_, high, low, close, volume in rows:
+            confirm = timestamp + interval_ms <= now_ms
+            if confirm and timestamp <= self._last_closed.get(symbol, -1):
+                continue
+            if confirm:
+                self._last_closed[symbol] = timestamp
+            await self.bus.publish(MarketEvent(self.exchange, 'kline', symbol, {
+                'interval': self.interval, 'start': int(timestamp), 'open': float(open_),
+                'high': float(high), 'low': float(low), 'close': float(close),
+                'volume': float(volume), 'confirm': confirm
+            }, now_ms, recv_ts))
+
+    async def run(self):
+        self._stopped = asyncio.Event()
+        while not self._stopped.is_set():
+            await asyncio.gather(*(self._poll(symbol) for symbol in self.symbols))
+            try:
+                await asyncio.wait_for(self._stopped.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self):
+        if self._stopped is not None:
+            self._stopped.set()
@@ -0,0 +1,196 @@
+"""
+Общий кэш индикаторов для стратегий.
+
+Скальпинг, пробой и EMA работают на одних и тех же свечах; скользящие
+средние, минимумы и EMA считаются один раз на свечу и затем берутся из
+кэша любой стратегией и любым набором параметров, которым они нужны.
+
+Ключ: (биржа, пара, интервал, индикатор, параметры, время последней свечи).
+К ключу добавляются число свечей и цена/объем последней свечи: EMA зависит
+от начала ряда, а незакрытая свеча меняется при том же времени.
+Биржу, пару и интервал DataFrame или окно CandleWindow несет в attrs
+(см. tag_frame); без них индикатор считается без кэша. Значения в кэше только для чтения.
+"""
+
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+from market_data.candle_window import CandleWindow, column
+from src import indicator_kernels as kernels
+from src.metrics import FEATURE_CACHE_REQUESTS_TOTAL
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+SOURCE_ATTRS = ('exchange', 'symbol', 'interval')
+
+
+def tag_frame(df, exchange, symbol, interval):
+    """Помечает DataFrame источником свечей; срезы и копии наследуют метку"""
+    df.attrs.update(exchange=exchange, symbol=symbol, interval=interval)
+    return df
+
+
+# Ключи свечей уже встречавшихся DataFrame: {id(df): (weakref, число строк, ключ)}
+_frame_keys = {}
+
+
+def frame_key(df):
+    """
+    Идентификатор свечей DataFrame для ключа кэша или None,
+    если источник не помечен или свечей нет.
+
+    Ключ запоминается для объекта df (обращение к колонкам pandas дорого),
+    поэтому значения помеченного DataFrame не должны меняться на месте.
+    У окна CandleWindow ключ читается прямо из массивов.
+    """
+    if isinstance(df, CandleWindow):
+        return df.cache_key()
+    memo = _frame_keys.get(id(df))
+    if memo is not None and memo[0]() is df and memo[1] == len(df):
+        return memo[2]
+    if len(df) == 0 or any(df.attrs.get(name) is None for name in SOURCE_ATTRS):
+        return None
+    last_ts = df['timestamp'].iat[-1] if 'timestamp' in df.columns else df.index[-1]
+    last_close = float(df['close'].iat[-1]) if 'close' in df.columns else None
+    last_volume = float(df['volume'].iat[-1]) if 'volume' in df.columns else None
+    key = (df.attrs['exchange'], df.attrs['symbol'], df.attrs['interval'],
+           int(last_ts) if isinstance(last_ts, (int, np.integer)) else str(last_ts),
+           len(df), last_close, last_volume)
+
+    frame_id = id(df)
+    ref = weakref.ref(df, lambda _, frame_id=frame_id: _frame_keys.pop(frame_id, None))
+    _frame_keys[frame_id] = (ref, len(df), key)
+    return key
+
+
+class FeatureCache:
+    """
+    LRU-кэш рассчитанных индикаторов с ограничением по числу записей
+    и по суммарному размеру массивов.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = {}
+        self._misses = {}
+        self._evictions = 0
+
+    def get(self, df, indicator, params, compute):
+        """
+        Индикатор для свечей df из кэша или рассчитанный compute().
+
+        Args:
+            df (pd.DataFrame): Свечи, помеченные tag_frame
+            indicator (str): Имя индикатора
+            params (tuple): Параметры индикатора (хешируемые)
+            compute (callable): Расчет без аргументов, возвращает np.ndarray
+
+        Returns:
+            np.ndarray: Значения индикатора (только для чтения)
+        """
+        source = frame_key(df)
+        if source is None:
+            return compute()
+
+        key = (source, indicator, params)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self._hits[indicator] = self._hits.get(indicator, 0) + 1
+        if value is not None:
+            FEATURE_CACHE_REQUESTS_TOTAL.labels(indicator, "hit").inc()
+            return value
+
+        value = np.asarray(compute())
+        value.flags.writeable = False
+        FEATURE_CACHE_REQUESTS_TOTAL.labels(indicator, "miss").inc()
+        with self._lock:
+            self._misses[indicator] = self._misses.get(indicator, 0) + 1
+            if key not in self._entries:
+                self._entries[key] = value
+                self._bytes += value.nbytes
+                self._evict()
+        return value
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, value = self._entries.popitem(last=False)
+            self._bytes -= value.nbytes
+            self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self):
+        """Попадания, промахи и доля попаданий (всего и по индикаторам)"""
+        with self._lock:
+            hits = sum(self._hits.values())
+            misses = sum(self._misses.values())
+            indicators = {}
+            for indicator in sorted(set(self._hits) | set(self._misses)):
+                indicator_hits = self._hits.get(indicator, 0)
+                total = indicator_hits + self._misses.get(indicator, 0)
+                indicators[indicator] = {
+                    'hits': indicator_hits,
+                    'misses': total - indicator_hits,
+                    'hit_rate': indicator_hits / total if total else 0.0
+                }
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+                'evictions': self._evictions,
+                'indicators': indicators
+            }
+
+
+_cache = FeatureCache()
+
+
+def get_cache():
+    return _cache
+
+
+def get_feature_cache_stats():
+    return _cache.get_stats()
+
+
+def _column(df, name):
+    return kernels.as_float_array(column(df, name))
+
+
+# Индикаторы по всем свечам df через общий кэш
+
+def sma(df, window, column='close'):
+    return _cache.get(df, 'sma', (column, window), lambda: kernels.sma(_column(df, column), window))
+
+
+def rolling_min(df, column, window):
+    return _cache.get(df, 'rolling_min', (column, window),
+                      lambda: kernels.rolling_min(_column(df, column), window))
+
+
+def ema(df, span, column='close'):
+    return _cache.get(df, 'ema', (column, span), lambda: kernels.ema(_column(df, column), span))
+
+
+def rsi(df, window=14):
+    return _cache.get(df, 'rsi', ('close', window), lambda: kernels.rsi(_column(df, 'close'), window))
+
+
+def atr(df, window=14):
+    return _cache.get(df, 'atr', (window,), lambda: kernels.atr(
+        _column(df, 'high'), _column(df, 'low'), _column(df, 'close'), window))
@@ -0,0 +1,193 @@
+"""
+Пул HTTP-соединений с повторными попытками для клиентов бирж
+"""
+
+import random
+import socket
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 10.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.2
+DEFAULT_MAX_BACKOFF = 5.0
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter, включающий TCP keep-alive на сокетах пула"""
+
+    def __init__(self, keep_alive=True, **kwargs):
+        self.keep_alive = keep_alive
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.keep_alive:
+            from urllib3.connection import HTTPConnection
+            kwargs['socket_options'] = HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            ]
+        super().init_poolmanager(*args, **kwargs)
+
+
+class PooledSession:
+    """
+    Долгоживущая сессия requests с пулом соединений к одной бирже.
+
+    Идемпотентные запросы (GET) повторяются при сетевых ошибках и ответах
+    5xx/429 с экспоненциальной задержкой и случайным разбросом (full jitter).
+    POST-запросы (ордера) никогда не повторяются.
+    """
+
+    def __init__(self, base_url, pool_size=DEFAULT_POOL_SIZE, keep_alive=True,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT,
+                 max_retries=DEFAULT_MAX_RETRIES, backoff_factor=DEFAULT_BACKOFF_FACTOR,
+                 max_backoff=DEFAULT_MAX_BACKOFF):
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+
+        self.session = requests.Session()
+        self.adapter = KeepAliveAdapter(
+            keep_alive=keep_alive,
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=0
+        )
+        self.session.mount(base_url, self.adapter)
+        if not keep_alive:
+            self.session.headers['Connection'] = 'close'
+
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "retries": 0,
+            "failures": 0,
+            "status_codes": {}
+        }
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _count_status(self, status_code):
+        with self._lock:
+            codes = self._stats["status_codes"]
+            codes[status_code] = codes.get(status_code, 0) + 1
+
+    def _backoff_delay(self, attempt, response=None):
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after:
+                try:
+                    return min(float(retry_after), self.max_backoff)
+                except ValueError:
+                    pass
+        cap = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    def request(self, method, url, prepare=None, on_response=None, **kwargs):
+        """
+        Выполняет запрос через пул; повторяет только идемпотентные методы.
+
+        prepare(attempt) вызывается перед каждой попыткой и возвращает
+        аргументы запроса, которые нужно обновить, - например, заголовки с
+        новой меткой времени и подписью: повтор со старой подписью биржа
+        отклонит, если он выйдет за recv_window. on_response(response)
+        получает ответ каждой попытки, включая повторяемые (429, 5xx), -
+        так ограничитель частоты учитывает и их.
+        """
+        method = method.upper()
+        kwargs.setdefault('timeout', self.timeout)
+        attempts = self.max_retries + 1 if method in IDEMPOTENT_METHODS else 1
+
+        for attempt in range(attempts):
+            last_attempt = attempt + 1 >= attempts
+            if prepare is not None:
+                kwargs.update(prepare(attempt))
+            self._count("requests")
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if last_attempt:
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                time.sleep(self._backoff_delay(attempt))
+                continue
+
+            self._count_status(response.status_code)
+            if on_response is not None:
+                on_response(response)
+            if response.status_code in RETRY_STATUSES and not last_attempt:
+                self._count("retries")
+                delay = self._backoff_delay(attempt, response)
+                response.close()
+                time.sleep(delay)
+                continue
+
+            if response.status_code in RETRY_STATUSES:
+                self._count("failures")
+            return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def get_stats(self):
+        """Возвращает статистику запросов, повторов и состояния пула"""
+        with self._lock:
+            stats = {
+                "requests": self._stats["requests"],
+                "retries": self._stats["retries"],
+                "failures": self._stats["failures"],
+                "status_codes": dict(self._stats["status_codes"])
+            }
+
+        pools = []
+        for key in list(self.adapter.poolmanager.pools.keys()):
+            pool = self.adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            pools.append({
+                "host": pool.host,
+                "connections_created": pool.num_connections,
+                "requests_served": pool.num_requests,
+                "idle_connections": sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool else 0,
+                "max_size": self.pool_size
+            })
+
+        stats["pools"] = pools
+        stats["settings"] = {
+            "pool_size": self.pool_size,
+            "keep_alive": self.keep_alive,
+            "connect_timeout": self.timeout[0],
+            "read_timeout": self.timeout[1],
+            "max_retries": self.max_retries,
+            "backoff_factor": self.backoff_factor
+        }
+        return stats
+
+    def close(self):
+        self.session.close()
+
+
+def session_options_from_config(data):
+    """Извлекает настройки пула из необязательной секции HTTP_SESSION конфигурации"""
+    allowed = ("pool_size", "keep_alive", "connect_timeout", "read_timeout",
+               "max_retries", "backoff_factor", "max_backoff")
+    options = data.get("HTTP_SESSION") or {}
+    return {key: options[key] for key in allowed if key in options}
@@ -0,0 +1,223 @@
+"""
+Векторные ядра индикаторов на NumPy.
+
+Ядра работают с непрерывными массивами float64 и считают вдоль последней
+оси, поэтому принимают как один ряд (bars,), так и матрицу (symbols, bars).
+Скользящие суммы считаются через накопленную сумму, истинный диапазон - на
+месте в выходном буфере; во все функции можно передать заранее выделенный
+буфер out той же формы. Семантика совпадает с pandas-версиями из
+src/indicators.py: до заполнения окна - NaN, окно с NaN - NaN.
+"""
+
+import numpy as np
+
+
+def as_float_array(values):
+    """Непрерывный массив float64 без копирования, если он уже такой"""
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def _output(values, out):
+    if out is None:
+        return np.empty(values.shape, dtype=np.float64)
+    if out.shape != values.shape:
+        raise ValueError(f"Буфер out формы {out.shape}, ожидается {values.shape}")
+    return out
+
+
+def rolling_sum(values, window, out=None):
+    """
+    Скользящая сумма окна window вдоль последней оси (rolling(window).sum()).
+
+    Из значений вычитается первое значение ряда, чтобы накопленная сумма
+    оставалась небольшой и разность двух накопленных сумм не теряла точность.
+    """
+    values = as_float_array(values)
+    out = _output(values, out)
+    n = values.shape[-1]
+    if window < 1:
+        raise ValueError("Окно должно быть не меньше 1")
+    if n < window:
+        out.fill(np.nan)
+        return out
+
+    nan_mask = np.isnan(values)
+    has_nan = nan_mask.any()
+    if has_nan:
+        values = np.where(nan_mask, 0.0, values)
+
+    base = values[..., :1].copy()
+    cumsum = np.zeros(values.shape[:-1] + (n + 1,), dtype=np.float64)
+    np.cumsum(values - base, axis=-1, out=cumsum[..., 1:])
+
+    np.subtract(cumsum[..., window:], cumsum[..., :-window], out=out[..., window - 1:])
+    out[..., window - 1:] += base * window
+    out[..., :window - 1] = np.nan
+
+    if has_nan:
+        nan_count = np.zeros(cumsum.shape, dtype=np.int64)
+        np.cumsum(nan_mask, axis=-1, out=nan_count[..., 1:])
+        window_nans = nan_count[..., window:] - nan_count[..., :-window]
+        out[..., window - 1:][window_nans > 0] = np.nan
+    return out
+
+
+def rolling_mean(values, window, out=None):
+    """
+    Скользящее среднее (rolling(window).mean()); окно из одних нулей дает точный 0.
+    out может совпадать с values (расчет на месте).
+    """
+    values = as_float_array(values)
+    zero_window = None
+    if values.shape[-1] >= window:
+        # Сумма нулевого окна после вычитания базы может отличаться от 0 на ошибку округления
+        nonzero = np.zeros(values.shape[:-1] + (values.shape[-1] + 1,), dtype=np.int64)
+        np.cumsum(values != 0, axis=-1, out=nonzero[..., 1:])
+        zero_window = (nonzero[..., window:] - nonzero[..., :-window]) == 0
+
+    out = rolling_sum(values, window, out)
+    out /= window
+    if zero_window is not None:
+        out[..., window - 1:][zero_window] = 0.0
+    return out
+
+
+def _rolling_extreme(values, window, out, func, fill):
+    """
+    Скользящий минимум/максимум за O(n) (алгоритм van Herk / Gil-Werman):
+    экстремумы внутри блоков длины window слева направо и справа налево,
+    значение окна - экстремум суффикса одного блока и префикса следующего.
+    """
+    values = as_float_array(values)
+    out = _output(values, out)
+    n = values.shape[-1]
+    if window < 1:
+        raise ValueError("Окно должно быть не меньше 1")
+    if n < window:
+        out.fill(np.nan)
+        return out
+
+    blocks = -(-n // window)
+    padded = np.full(values.shape[:-1] + (blocks * window,), fill, dtype=np.float64)
+    padded[..., :n] = values
+    shaped = padded.reshape(values.shape[:-1] + (blocks, window))
+
+    prefix = func.accumulate(shaped, axis=-1).reshape(padded.shape)
+    suffix = func.accumulate(shaped[..., ::-1], axis=-1)[..., ::-1].reshape(padded.shape)
+
+    func(suffix[..., :n - window + 1], prefix[..., window - 1:n], out=out[..., window - 1:])
+    out[..., :window - 1] = np.nan
+    return out
+
+
+def rolling_min(values, window, out=None):
+    """Скользящий минимум (rolling(window).min()); NaN в окне дает NaN"""
+    return _rolling_extreme(values, window, out, np.minimum, np.inf)
+
+
+def rolling_max(values, window, out=None):
+    """Скользящий максимум (rolling(window).max()); NaN в окне дает NaN"""
+    return _rolling_extreme(values, window, out, np.maximum, -np.inf)
+
+
+def sma(close, window=20, out=None):
+    return rolling_mean(close, window, out)
+
+
+def diff(values, out=None):
+    """Разность с предыдущим значением (diff()); первый элемент - NaN"""
+    values = as_float_array(values)
+    out = _output(values, out)
+    np.subtract(values[..., 1:], values[..., :-1], out=out[..., 1:])
+    out[..., :1] = np.nan
+    return out
+
+
+def true_range(high, low, close, out=None):
+    """
+    Истинный диапазон max(H-L, |H-C_prev|, |L-C_prev|), считается на месте в out.
+    Максимум пропускает NaN (np.fmax), как max(axis=1) в pandas: для первой
+    свечи и после пропущенного закрытия - H-L.
+    """
+    high = as_float_array(high)
+    low = as_float_array(low)
+    close = as_float_array(close)
+    out = _output(high, out)
+
+    np.subtract(high, low, out=out)
+    if high.shape[-1] > 1:
+        scratch = np.empty(high.shape[:-1] + (high.shape[-1] - 1,), dtype=np.float64)
+        tail = out[..., 1:]
+        prev_close = close[..., :-1]
+
+        np.subtract(high[..., 1:], prev_close, out=scratch)
+        np.abs(scratch, out=scratch)
+        np.fmax(tail, scratch, out=tail)
+
+        np.subtract(low[..., 1:], prev_close, out=scratch)
+        np.abs(scratch, out=scratch)
+        np.fmax(tail, scratch, out=tail)
+    return out
+
+
+def atr(high, low, close, window=14, out=None):
+    """ATR как простая средняя истинного диапазона"""
+    out = true_range(high, low, close, out)
+    return rolling_mean(out, window, out)
+
+
+def rsi(close, window=14, out=None):
+    """
+    RSI на простых средних прироста и падения.
+    Приращение первой свечи и приращения рядом с пропущенным закрытием (NaN)
+    считаются нулевыми, как where() в pandas-версии.
+    """
+    close = as_float_array(close)
+    out = _output(close, out)
+
+    delta = diff(close)
+    delta[np.isnan(delta)] = 0.0
+    gain = np.maximum(delta, 0.0)
+    np.negative(delta, out=delta)
+    loss = np.maximum(delta, 0.0, out=delta)
+
+    # Средние неотрицательных рядов не должны уходить ниже нуля из-за округления
+    np.maximum(rolling_mean(gain, window, gain), 0.0, out=gain)
+    np.maximum(rolling_mean(loss, window, loss), 0.0, out=loss)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(gain, loss, out=out)
+        out += 1.0
+        np.divide(100.0, out, out=out)
+        np.subtract(100.0, out, out=out)
+    return out
+
+
+def ema(values, span, out=None):
+    """
+    EMA как ewm(span=span, adjust=False).mean().
+
+    Рекурсия последовательна по времени, поэтому цикл идет по свечам, а для
+    матрицы (symbols, bars) каждый шаг векторизован по всем символам.
+    """
+    values = as_float_array(values)
+    out = _output(values, out)
+    alpha = 2.0 / (span + 1.0)
+    n = values.shape[-1]
+    if n == 0:
+        return out
+
+    if values.ndim == 1:
+        result = values.tolist()
+        prev = result[0]
+        keep = 1.0 - alpha
+        for i in range(1, n):
+            prev = alpha * result[i] + keep * prev
+            result[i] = prev
+        out[:] = result
+        return out
+
+    out[..., 0] = values[..., 0]
+    for i in range(1, n):
+        np.multiply(out[..., i - 1], 1.0 - alpha, out=out[..., i])
+        out[..., i] += alpha * values[..., i]
+    return out
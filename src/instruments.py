@@ -0,0 +1,224 @@
+"""
+Кэшируемый реестр спотовых инструментов бирж
+"""
+
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from decimal import ROUND_DOWN, Decimal, InvalidOperation
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SNAPSHOT_DIR = os.path.join(BASE_DIR, 'data', 'instruments')
+
+DEFAULT_TTL = 3600
+
+# quote_step - шаг суммы в котируемой валюте (рыночная покупка на сумму);
+# None - биржа его не сообщает, сумма округляется до шага цены
+Instrument = namedtuple(
+    'Instrument',
+    ['symbol', 'base', 'quote', 'tick_size', 'lot_size', 'min_qty', 'min_notional', 'quote_step'],
+    defaults=(None,)
+)
+
+
+def _step_multiple(value, step):
+    """Проверяет, что value кратно шагу step (через Decimal, без ошибок округления float)"""
+    if not step:
+        return True
+    try:
+        return Decimal(str(value)) % Decimal(str(step)) == 0
+    except InvalidOperation:
+        return False
+
+
+def round_to_step(value, step):
+    """
+    Округляет value вниз до кратного step в Decimal: число знаков результата
+    равно числу знаков шага, поэтому в нем нет хвостов float (0.30000000000000004)
+    """
+    step = Decimal(str(step))
+    steps = (Decimal(str(value)) / step).to_integral_value(rounding=ROUND_DOWN)
+    return (steps * step).quantize(step)
+
+
+def format_amount(value):
+    """Размер или цена для запроса к бирже: десятичная запись без экспоненты (1e-05 -> '0.00001')"""
+    return format(Decimal(str(value)).normalize(), 'f')
+
+
+class InstrumentRegistry:
+    """
+    Реестр инструментов одной биржи с поиском по символу за O(1).
+
+    Список загружается один раз (из снимка на диске или с биржи) и обновляется
+    в фоновом потоке, когда данные старше ttl секунд. Пока идет обновление,
+    используется предыдущая версия реестра.
+
+    Args:
+        exchange (str): Название биржи
+        fetch_func (callable): Функция без аргументов, возвращающая список Instrument
+        ttl (float): Время жизни данных в секундах
+        snapshot_path (str): Путь к JSON-снимку для быстрого старта (None - без снимка)
+    """
+
+    def __init__(self, exchange, fetch_func, ttl=DEFAULT_TTL, snapshot_path=None):
+        self.exchange = exchange
+        self.fetch_func = fetch_func
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path
+
+        self._instruments = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def refresh(self):
+        """Синхронно загружает инструменты с биржи и сохраняет снимок"""
+        try:
+            instruments = self.fetch_func()
+        except Exception as e:
+            print(f"Ошибка обновления инструментов {self.exchange}: {e}")
+            instruments = []
+
+        if instruments:
+            self._instruments = {instrument.symbol: instrument for instrument in instruments}
+            self._loaded_at = time.time()
+            self.save_snapshot()
+
+        with self._lock:
+            self._refreshing = False
+        return bool(instruments)
+
+    def refresh_in_background(self):
+        """Запускает обновление в фоновом потоке, если оно еще не идет"""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self.refresh, daemon=True).start()
+
+    def load_snapshot(self):
+        """Загружает инструменты из снимка на диске"""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._instruments = {
+                item['symbol']: Instrument(**item) for item in data['instruments']
+            }
+            self._loaded_at = data['loaded_at']
+            return bool(self._instruments)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Ошибка чтения снимка инструментов {self.snapshot_path}: {e}")
+            return False
+
+    def save_snapshot(self):
+        """Атомарно записывает текущий реестр в снимок"""
+        if not self.snapshot_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+            tmp_path = self.snapshot_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'exchange': self.exchange,
+                    'loaded_at': self._loaded_at,
+                    'instruments': [item._asdict() for item in self._instruments.values()]
+                }, f)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            print(f"Ошибка сохранения снимка инструментов: {e}")
+
+    def ensure_loaded(self):
+        """
+        Гарантирует наличие данных: снимок или синхронная загрузка при первом
+        обращении, фоновое обновление - если данные устарели.
+        """
+        if not self._instruments:
+            if not self.load_snapshot():
+                with self._lock:
+                    self._refreshing = True
+                self.refresh()
+                return
+
+        if time.time() - self._loaded_at > self.ttl:
+            self.refresh_in_background()
+
+    def is_stale(self):
+        return time.time() - self._loaded_at > self.ttl
+
+    def get(self, symbol):
+        """Возвращает Instrument по символу или None"""
+        self.ensure_loaded()
+        return self._instruments.get(symbol)
+
+    def __contains__(self, symbol):
+        return self.get(symbol) is not None
+
+    def __len__(self):
+        return len(self._instruments)
+
+    def symbols(self):
+        self.ensure_loaded()
+        return list(self._instruments)
+
+    def instruments(self):
+        self.ensure_loaded()
+        return list(self._instruments.values())
+
+    def round_price(self, symbol, price):
+        """Округляет цену вниз до шага цены инструмента"""
+        instrument = self.get(symbol)
+        if instrument is None or not instrument.tick_size:
+            return price
+        return float(round_to_step(price, instrument.tick_size))
+
+    def round_qty(self, symbol, qty):
+        """Округляет количество вниз до шага лота инструмента"""
+        instrument = self.get(symbol)
+        if instrument is None or not instrument.lot_size:
+            return qty
+        return float(round_to_step(qty, instrument.lot_size))
+
+    def round_notional(self, symbol, notional):
+        """Округляет сумму в котируемой валюте вниз до шага суммы (или шага цены) инструмента"""
+        instrument = self.get(symbol)
+        step = instrument and (instrument.quote_step or instrument.tick_size)
+        if not step:
+            return notional
+        return float(round_to_step(notional, step))
+
+    def validate_order(self, symbol, qty=None, notional=None):
+        """
+        Проверяет ордер локально, без запроса к бирже.
+
+        Args:
+            symbol (str): Торговая пара
+            qty (float): Количество базовой валюты
+            notional (float): Сумма в котируемой валюте
+
+        Returns:
+            str | None: Текст ошибки или None, если ордер корректен
+        """
+        instrument = self.get(symbol)
+        if instrument is None:
+            return f'Торговая пара {symbol} не найдена'
+
+        if qty is not None:
+            if instrument.min_qty and qty < instrument.min_qty:
+                return f'Количество {qty} меньше минимального {instrument.min_qty} для {symbol}'
+            if not _step_multiple(qty, instrument.lot_size):
+                return f'Количество {qty} не кратно шагу лота {instrument.lot_size} для {symbol}'
+
+        if notional is not None and instrument.min_notional and notional < instrument.min_notional:
+            return f'Сумма {notional} меньше минимальной {instrument.min_notional} для {symbol}'
+
+        return None
+
+
+def snapshot_path_for(exchange):
+    """Путь к снимку инструментов биржи по умолчанию"""
+    return os.path.join(SNAPSHOT_DIR, f'{exchange}.json')
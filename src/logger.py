@@ -1,7 +1,9 @@
 import logging
 from datetime import datetime
 from src.database import create_connection, DB_PATH
+from src.metrics import DB_WRITE_SECONDS, DB_WRITES_TOTAL
 import os
+import time
 from sqlite3 import Error
 import sqlite3
 
@@ -33,14 +35,18 @@ class BotLogger:
 
     def log_event(self, event_type, details):
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        start = time.perf_counter()
         try:
             cursor = self.conn.cursor()
             cursor.execute(
                 "INSERT INTO logs (timestamp, event_type, details) VALUES (?, ?, ?)",
                 (timestamp, event_type, str(details)))
             self.conn.commit()
+            DB_WRITE_SECONDS.labels('logs').observe(time.perf_counter() - start)
+            DB_WRITES_TOTAL.labels('logs', 'ok').inc()
             self.logger.info(f"{event_type}: {details}")
         except sqlite3.Error as e:
+            DB_WRITES_TOTAL.labels('logs', 'error').inc()
             self.logger.error(f"DB Error: {str(e)}")
             self.conn.rollback()
         except Exception as e:
@@ -0,0 +1,320 @@
+"""
+Встроенные метрики (счетчики, гистограммы, датчики) в текстовом формате Prometheus.
+
+Метрики хранятся в памяти процесса; дочерние серии по значениям меток
+создаются один раз и кэшируются, запись - одна блокировка и несколько
+сложений, поэтому инструментирование можно не отключать в работе.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """Серия метрики для значений меток (в порядке labelnames)"""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"Метрика {self.name} ожидает метки {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self, key, child):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._samples(key, child))
+        return lines
+
+
+class _Value:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value):
+        self.value = float(value)
+
+
+class Counter(_Metric):
+    """Монотонный счетчик"""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def _samples(self, key, child):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"]
+
+
+class Gauge(_Metric):
+    """Текущее значение (например, число запросов в полете)"""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def _samples(self, key, child):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"]
+
+
+class _HistogramValue:
+    __slots__ = ('buckets', 'counts', 'total', 'count', '_lock')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += value
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Histogram(_Metric):
+    """Гистограмма с фиксированными границами корзин (секунды по умолчанию)"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def _samples(self, key, child):
+        with child._lock:
+            counts = list(child.counts)
+            total, count = child.total, child.count
+
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.labelnames, key, ('le', _format_value(float(bound))))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """Набор метрик процесса"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        """Все метрики в текстовом формате Prometheus"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Запросы к биржам
+EXCHANGE_REQUEST_SECONDS = REGISTRY.histogram(
+    "exchange_request_seconds", "Полное время send_request",
+    ("exchange", "endpoint", "method", "status"))
+EXCHANGE_REQUEST_PHASE_SECONDS = REGISTRY.histogram(
+    "exchange_request_phase_seconds",
+    "Время этапов запроса: rate_limit (ожидание лимита), sign (подпись), http (запрос с повторами "
+    "и чтением тела), server (последняя попытка до заголовков ответа: соединение и сервер), decode (JSON)",
+    ("exchange", "endpoint", "phase"))
+EXCHANGE_REQUESTS_TOTAL = REGISTRY.counter(
+    "exchange_requests_total", "Запросы к биржам", ("exchange", "endpoint", "status"))
+EXCHANGE_ERRORS_TOTAL = REGISTRY.counter(
+    "exchange_errors_total", "Ответы-ошибки: network, invalid_json, api", ("exchange", "endpoint", "error"))
+EXCHANGE_IN_FLIGHT = REGISTRY.gauge(
+    "exchange_requests_in_flight", "Запросы к биржам в процессе выполнения", ("exchange",))
+HTTP_CONNECTIONS_CREATED = REGISTRY.gauge(
+    "http_pool_connections_created", "Соединения, открытые пулом HTTP (новые TCP/TLS рукопожатия)",
+    ("exchange",))
+
+# Стратегии
+STRATEGY_SIGNAL_SECONDS = REGISTRY.histogram(
+    "strategy_signal_seconds", "Время расчета сигнала стратегии", ("strategy",))
+STRATEGY_SIGNALS_TOTAL = REGISTRY.counter(
+    "strategy_signals_total", "Сигналы стратегий", ("strategy", "signal"))
+STRATEGY_ERRORS_TOTAL = REGISTRY.counter(
+    "strategy_errors_total", "Ошибки расчета сигналов", ("strategy",))
+ENGINE_LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                          0.25, 0.5, 1.0, 2.5, 5.0)
+ENGINE_TICK_TO_SIGNAL_SECONDS = REGISTRY.histogram(
+    "engine_tick_to_signal_seconds", "Задержка от получения события рыночных данных до сигнала",
+    ("subscription",), ENGINE_LATENCY_BUCKETS)
+ENGINE_SIGNAL_TO_ORDER_SECONDS = REGISTRY.histogram(
+    "engine_signal_to_order_seconds", "Задержка от сигнала до ответа исполнения (ордера)",
+    ("subscription",), ENGINE_LATENCY_BUCKETS)
+FEATURE_CACHE_REQUESTS_TOTAL = REGISTRY.counter(
+    "feature_cache_requests_total", "Обращения к кэшу индикаторов", ("indicator", "result"))
+
+# Стаканы
+ORDERBOOK_UPDATES_TOTAL = REGISTRY.counter(
+    "orderbook_updates_total", "Примененные снимки и дельты стаканов", ("exchange", "action"))
+ORDERBOOK_RESYNCS_TOTAL = REGISTRY.counter(
+    "orderbook_resyncs_total", "Рассинхронизации стаканов", ("exchange", "reason"))
+SLIPPAGE_CHECKS_TOTAL = REGISTRY.counter(
+    "slippage_checks_total", "Проверки проскальзывания ордеров по стакану", ("exchange", "result"))
+
+# База данных
+DB_WRITE_SECONDS = REGISTRY.histogram(
+    "db_write_seconds", "Время записи в базу данных (INSERT и commit)", ("table",))
+DB_WRITES_TOTAL = REGISTRY.counter(
+    "db_writes_total", "Записи в базу данных", ("table", "status"))
+
+
+class RequestTracker:
+    """Собирает этапы одного запроса к бирже; см. track_request"""
+
+    __slots__ = ('exchange', 'endpoint', 'status', 'error')
+
+    def __init__(self, exchange, endpoint):
+        self.exchange = exchange
+        self.endpoint = endpoint
+        self.status = "network"
+        self.error = None
+
+    def phase(self, name, seconds):
+        EXCHANGE_REQUEST_PHASE_SECONDS.labels(self.exchange, self.endpoint, name).observe(seconds)
+
+    @contextmanager
+    def timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase(name, time.perf_counter() - start)
+
+    def check_payload(self, payload):
+        """Отмечает ошибку API по retCode (Bybit) или code (OKX) в ответе"""
+        if isinstance(payload, dict):
+            if 'error' in payload:
+                self.error = payload['error']
+                return
+            code = payload.get('retCode', payload.get('code'))
+            if code not in (None, 0, '0'):
+                self.error = 'api'
+
+
+@contextmanager
+def track_request(exchange, endpoint, method):
+    """
+    Измеряет запрос к бирже: полное время, этапы, статус и ошибки.
+
+    Пример:
+        with track_request('bybit', endpoint, 'GET') as track:
+            with track.timed('sign'):
+                headers = ...
+            track.status = response.status_code
+            track.check_payload(data)
+    """
+    track = RequestTracker(exchange, endpoint)
+    in_flight = EXCHANGE_IN_FLIGHT.labels(exchange)
+    in_flight.inc()
+    start = time.perf_counter()
+    try:
+        yield track
+    finally:
+        elapsed = time.perf_counter() - start
+        in_flight.dec()
+        status = str(track.status)
+        EXCHANGE_REQUEST_SECONDS.labels(exchange, endpoint, method, status).observe(elapsed)
+        EXCHANGE_REQUESTS_TOTAL.labels(exchange, endpoint, status).inc()
+        if track.error is None and track.status == "network":
+            track.error = "network"
+        if track.error:
+            EXCHANGE_ERRORS_TOTAL.labels(exchange, endpoint, track.error).inc()
+
+
+def render():
+    return REGISTRY.render()
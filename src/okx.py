@@ -1,6 +1,7 @@
 import os
 import json
 from datetime import datetime
+from urllib.parse import urlencode
 
 import requests
 import hashlib
@@ -8,36 +9,35 @@ import base64
 import hmac
 from pprint import pprint
 
+try:
+    from .http_session import PooledSession, session_options_from_config
+    from .instruments import Instrument, InstrumentRegistry, format_amount, snapshot_path_for
+    from .batch_orders import DEFAULT_MAX_WORKERS, normalize_orders, order_result, submit_in_chunks
+    from .rate_limiter import get_scheduler
+    from .metrics import track_request
+except ImportError:
+    from http_session import PooledSession, session_options_from_config
+    from instruments import Instrument, InstrumentRegistry, format_amount, snapshot_path_for
+    from batch_orders import DEFAULT_MAX_WORKERS, normalize_orders, order_result, submit_in_chunks
+    from rate_limiter import get_scheduler
+    from metrics import track_request
+
 
 api_key = ''
 secret_key = ''
 api_passphrase = ''
 url = "https://www.okx.com"
 
+BALANCE_ENDPOINT = '/api/v5/account/balance'
+INSTRUMENTS_ENDPOINT = "/api/v5/public/instruments"
+POSITIONS_ENDPOINT = "/api/v5/account/positions"
+KLINE_ENDPOINT = "/api/v5/market/candles"
+ORDER_ENDPOINT = "/api/v5/trade/order"
+BATCH_ORDER_ENDPOINT = "/api/v5/trade/batch-orders"
+HISTORY_KLINE_ENDPOINT = "/api/v5/market/history-candles"
 
-def get_info_from_json():
-    global api_key, secret_key, api_passphrase
-
-    if not os.path.exists("config.json"):
-        raise FileNotFoundError("Файл config.json не найден.")
-
-    try:
-        with open("config.json", "r", encoding="utf-8") as file:
-            data = json.load(file)
-
-        if 'API_KEY_OKX' not in data or 'API_SECRET_KEY_OKX' not in data or 'API_PASSPHRASE' not in data:
-            raise KeyError("В config.json отсутствуют необходимые ключи: "
-                           "'API_KEY_OKX' или 'API_SECRET_KEY_OKX' или 'API_PASSPHRASE'")
-
-        api_key = data['API_KEY_OKX']
-        secret_key = data['API_SECRET_KEY_OKX']
-        api_passphrase = data['API_PASSPHRASE']
-
-        if not api_key or not secret_key or not api_passphrase:
-            raise ValueError("API-ключи не могут быть пустыми.")
-
-    except json.JSONDecodeError:
-        raise ValueError("Ошибка чтения JSON. Проверьте формат config.json.")
+HISTORY_KLINE_MAX_LIMIT = 100
+BATCH_ORDER_MAX_SIZE = 20
 
 
 def get_okx_timestamp() -> str:
@@ -45,71 +45,12 @@ def get_okx_timestamp() -> str:
     return now.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
 
 
-def get_sign(timestamp: str, method: str, request_path: str, params: dict, body: str = "") -> str:
-    params_str = str()
-    count = 0
-    if params:
-        params_str += "?"
-        for key, value in params.items():
-            params_str += key + "=" + value
-            count += 1
-            if count < len(params):
-                params_str += "&"
-
-    pre_hash_string = timestamp + method.upper() + request_path + params_str + body
-
-    print("Подпись: ", pre_hash_string)
+def build_query_string(params: dict) -> str:
+    """Строка запроса вида "?k=v&..." - подписывается и отправляется без изменений"""
+    return "?" + urlencode(params) if params else ""
 
-    signature = hmac.new(
-        secret_key.encode('utf-8'),
-        pre_hash_string.encode('utf-8'),
-        hashlib.sha256
-    ).digest()
-
-    return base64.b64encode(signature).decode()
-
-
-def send_request(endpoint: str, method: str, params: dict = None, body: dict = None):
-    timestamp = get_okx_timestamp()
-    body_str = json.dumps(body, separators=(',', ':')) if body else ""
-    
-    headers = {
-        'OK-ACCESS-SIGN': get_sign(timestamp, method, endpoint, params, body_str),
-        'OK-ACCESS-TIMESTAMP': timestamp,
-        'OK-ACCESS-KEY': api_key,
-        'OK-ACCESS-PASSPHRASE': api_passphrase,
-        'Content-Type': 'application/json'
-    }
-
-    url_full = url + endpoint
-
-    try:
-        if method == "POST":
-            response = requests.post(url_full, headers=headers, data=body_str)
-        else:
-            response = requests.get(url_full, headers=headers, params=params)
-
-        response.raise_for_status()
-
-    except requests.exceptions.RequestException as e:
-        print(f"[Ошибка сети] {e}")
-        return {"error": "network", "message": str(e)}
-
-    try:
-        return response.json()
-    except requests.exceptions.JSONDecodeError:
-        print("[Ошибка] Не удалось декодировать JSON.")
-        return {
-            "error": "invalid_json",
-            "status_code": response.status_code,
-            "text": response.text
-        }
 
-
-def get_balance():
-    endpoint = '/api/v5/account/balance'
-    params = {"accountType": "UNIFIED"}
-    response = send_request(endpoint, "GET", params)
+def _parse_balance(response):
     total_equity = response['data'][0]['totalEq']
 
     coins = dict()
@@ -120,11 +61,7 @@ def get_balance():
     return total_equity, coins
 
 
-def get_available_trading_pairs(amount_of_pair=1000):
-    endpoint = "/api/v5/public/instruments"
-    params = {"instType": "SPOT"}
-    response = send_request(endpoint, "GET", params)
-    
+def _parse_trading_pairs(response, amount_of_pair):
     trading_pairs = [trading_pair["instId"] for trading_pair in response["data"]]
     
     if amount_of_pair > len(trading_pairs) or amount_of_pair < 0:
@@ -133,11 +70,28 @@ def get_available_trading_pairs(amount_of_pair=1000):
         return trading_pairs[:amount_of_pair]
 
 
-def get_opened_positions():
-    endpoint = "/api/v5/account/positions"
-    params = {}
-    response = send_request(endpoint, "GET", params)
+def _float_or_none(value):
+    return float(value) if value not in (None, "") else None
+
+
+def _parse_instruments(response):
+    result = []
+    for item in response["data"]:
+        if item.get("state", "live") != "live":
+            continue
+        result.append(Instrument(
+            symbol=item["instId"],
+            base=item.get("baseCcy"),
+            quote=item.get("quoteCcy"),
+            tick_size=_float_or_none(item.get("tickSz")),
+            lot_size=_float_or_none(item.get("lotSz")),
+            min_qty=_float_or_none(item.get("minSz")),
+            min_notional=None
+        ))
+    return result
+
 
+def _parse_positions(response):
     result = list()
     if response["data"]:
         for position in response["data"]:
@@ -147,30 +101,28 @@ def get_opened_positions():
             result.append([traiding_pair, avg_px, pos])
     return result
 
+
 def convert_interval(interval):
     map_okx = {
+        "1m": "1m",
+        "3m": "3m",
+        "5m": "5m",
         "15m": "15m",
+        "30m": "30m",
         "1h": "1H",
+        "2h": "2H",
         "4h": "4H",
-        "1d": "1D"
+        "6h": "6H",
+        "12h": "12H",
+        "1d": "1D",
+        "1w": "1W",
+        "1M": "1M"
     }
 
     return map_okx[interval]
 
 
-
-def get_some_last_kandle(symbol="BTC-USDT", interval="15m", limit=15):
-    """
-    Получает последние свечи для указанной торговой пары.
-    
-    Параметры:
-        symbol (str): Торговая пара (например, "BTC-USDT")
-        interval (str): Интервал свечи (по умолчанию "15m" - 15 минут)
-        limit (int): Количество свечей (по умолчанию 15)
-    
-    Возвращает:
-        list: Список кортежей (open_price, close_price) для каждой свечи
-    """
+def _kline_params(symbol, interval, limit):
     available_intervals = ["1m", "3m", "5m", "15m", "30m", "1H", "2H", "4H",
                             "6H", "12H", "1D", "1W", "1M"]
     
@@ -184,15 +136,14 @@ def get_some_last_kandle(symbol="BTC-USDT", interval="15m", limit=15):
         print("Количество свечей не может быть меньше 1. Используется 15.")
         limit = 15
     
-    endpoint = "/api/v5/market/candles"
-    params = {
+    return {
         "instId": symbol,
         "bar": interval,
         "limit": str(limit)
     }
-    
-    response = send_request(endpoint, "GET", params)
-    
+
+
+def _parse_kandles(response):
     list_of_candles = []
     if response and 'data' in response:
         for candle in response['data']:
@@ -201,18 +152,21 @@ def get_some_last_kandle(symbol="BTC-USDT", interval="15m", limit=15):
     return list_of_candles
 
 
-def place_order(side, amount, symbol):
-    """
-    Размещает ордер на OKX.
-    
-    Параметры:
-        side (str): "buy" или "sell"
-        amount (float): Количество базовой валюты
-        symbol (str): Торговая пара (например "BTC-USDT")
-    
-    Возвращает:
-        str: Ответ от API OKX
-    """
+def _parse_ohlcv(response):
+    if response.get("code") not in (None, "0") or "data" not in response:
+        error_msg = response.get("msg") or response.get("message") or "Неизвестная ошибка"
+        raise Exception(f"Ошибка API OKX: {error_msg}")
+
+    rows = [
+        (int(candle[0]), float(candle[1]), float(candle[2]), float(candle[3]),
+         float(candle[4]), float(candle[5]))
+        for candle in response["data"]
+    ]
+    rows.reverse()
+    return rows
+
+
+def _validate_order(side, amount):
     if side.lower() not in ("buy", "sell"):
         print("Параметр side принимает значения только 'buy' или 'sell'")
         return 'Invalid side parameter'
@@ -221,24 +175,411 @@ def place_order(side, amount, symbol):
         print("Количество не может быть меньше или равно нулю")
         return 'Invalid amount'
     
-    endpoint = "/api/v5/trade/order"
-    
-    params = {
+    return None
+
+
+def _order_params(side, amount, symbol):
+    return {
         "instId": symbol,
         "tdMode": "cash",
         "side": side.lower(),
         "ordType": "market",
-        "sz": str(amount),
+        "sz": format_amount(amount),
     }
-    
-    response = send_request(endpoint, "POST", body=params)
-    
+
+
+def _validate_size(side, amount, symbol):
+    """
+    Проверяет размер по параметрам инструмента. sz рыночного спотового ордера
+    без tgtCcy - сумма в котируемой валюте для покупки и количество базовой
+    валюты для продажи, поэтому покупка проверяется как сумма, а не по шагу лота.
+    """
+    if side.lower() == 'buy':
+        return instruments.validate_order(symbol, notional=amount)
+    return instruments.validate_order(symbol, qty=amount)
+
+
+def _parse_order(response):
     if response and 'data' in response:
         return response['data'][0]['sMsg']
     else:
         return 'No response from API'
 
 
+def _batch_order_params(chunk):
+    body = []
+    for order in chunk:
+        params = _order_params(order['side'], order['amount'], order['symbol'])
+        params['clOrdId'] = order['client_order_id']
+        body.append(params)
+    return body
+
+
+def _parse_batch_orders(response, chunk):
+    """Результаты пачки по clOrdId; code "2" - часть ордеров пачки отклонена"""
+    by_id = {order['client_order_id']: order for order in chunk}
+    results = {}
+    for item in (response or {}).get('data') or []:
+        order = by_id.get(item.get('clOrdId'))
+        if order is None:
+            continue
+        ok = str(item.get('sCode')) == '0'
+        message = item.get('sMsg') or ('OK' if ok else 'Order rejected')
+        results[order['client_order_id']] = order_result(order, ok, item.get('ordId') or None, message)
+
+    if not results:
+        message = (response or {}).get('msg') or (response or {}).get('message') or 'No response from API'
+        results = {order['client_order_id']: order_result(order, False, message=message) for order in chunk}
+    return results
+
+
+class OkxClient:
+    """
+    Клиент OKX с собственными ключами, пулом соединений и подготовленной подписью.
+
+    HMAC с секретным ключом создается один раз, на каждый запрос копируется
+    готовый шаблон; постоянные заголовки (ключ, пароль) собраны заранее.
+
+    Параметры:
+        api_key (str): API-ключ
+        secret_key (str): Секретный ключ
+        api_passphrase (str): Пароль API
+        session (PooledSession): Пул соединений; если не задан, создается новый
+        scheduler (RequestScheduler): Ограничитель частоты; по умолчанию общий для OKX
+        slippage_guard (SlippageGuard): Проверка проскальзывания по стакану перед отправкой ордеров
+        **session_options: Настройки нового пула (pool_size, таймауты, повторы)
+    """
+
+    def __init__(self, api_key='', secret_key='', api_passphrase='', base_url=url,
+                 session=None, scheduler=None, slippage_guard=None, **session_options):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.session = session or PooledSession(base_url, **session_options)
+        self.scheduler = scheduler or get_scheduler('okx')
+        self.slippage_guard = slippage_guard
+
+        self._hmac = hmac.new(secret_key.encode('utf-8'), digestmod=hashlib.sha256)
+        self._headers = {
+            'OK-ACCESS-KEY': api_key,
+            'OK-ACCESS-PASSPHRASE': api_passphrase,
+            'Content-Type': 'application/json'
+        }
+
+    @classmethod
+    def from_config(cls, data, **kwargs):
+        """Создает клиента из словаря конфигурации с ключами API_KEY_OKX/API_SECRET_KEY_OKX/API_PASSPHRASE"""
+        if 'API_KEY_OKX' not in data or 'API_SECRET_KEY_OKX' not in data or 'API_PASSPHRASE' not in data:
+            raise KeyError("В config.json отсутствуют необходимые ключи: "
+                           "'API_KEY_OKX' или 'API_SECRET_KEY_OKX' или 'API_PASSPHRASE'")
+
+        if not data['API_KEY_OKX'] or not data['API_SECRET_KEY_OKX'] or not data['API_PASSPHRASE']:
+            raise ValueError("API-ключи не могут быть пустыми.")
+
+        return cls(data['API_KEY_OKX'], data['API_SECRET_KEY_OKX'], data['API_PASSPHRASE'], **kwargs)
+
+    def sign(self, timestamp: str, method: str, request_path: str, body: str = "") -> str:
+        """Подпись timestamp + METHOD + путь (со строкой запроса) + тело"""
+        hash_obj = self._hmac.copy()
+        hash_obj.update((timestamp + method.upper() + request_path + body).encode('utf-8'))
+        return base64.b64encode(hash_obj.digest()).decode()
+
+    def build_headers(self, method: str, request_path: str, body: str = "") -> dict:
+        """Заголовки запроса с текущей меткой времени и подписью"""
+        timestamp = get_okx_timestamp()
+        headers = dict(self._headers)
+        headers['OK-ACCESS-TIMESTAMP'] = timestamp
+        headers['OK-ACCESS-SIGN'] = self.sign(timestamp, method, request_path, body)
+        return headers
+
+    def send_request(self, endpoint: str, method: str, params: dict = None, body: dict = None):
+        body_str = json.dumps(body, separators=(',', ':')) if body else ""
+        request_path = endpoint + build_query_string(params)
+        url_full = self.base_url + request_path
+
+        with track_request('okx', endpoint, method) as track:
+            try:
+                track.phase('rate_limit', self.scheduler.acquire(endpoint))
+
+                def prepare(attempt):
+                    # Повтор тоже получает разрешение ограничителя и подписывается
+                    # заново с текущей меткой времени
+                    if attempt:
+                        track.phase('rate_limit', self.scheduler.acquire(endpoint))
+                    with track.timed('sign'):
+                        return {'headers': self.build_headers(method, request_path, body_str)}
+
+                def on_response(response):
+                    self.scheduler.update(endpoint, response.status_code, response.headers)
+
+                with track.timed('http'):
+                    if method == "POST":
+                        response = self.session.post(url_full, prepare=prepare, on_response=on_response,
+                                                     data=body_str)
+                    else:
+                        response = self.session.get(url_full, prepare=prepare, on_response=on_response)
+
+                track.status = response.status_code
+                track.phase('server', response.elapsed.total_seconds())
+                response.raise_for_status()
+
+            except requests.exceptions.RequestException as e:
+                print(f"[Ошибка сети] {e}")
+                track.error = "network"
+                return {"error": "network", "message": str(e)}
+
+            try:
+                with track.timed('decode'):
+                    data = response.json()
+                track.check_payload(data)
+                self.scheduler.update(endpoint, payload=data)
+                return data
+            except requests.exceptions.JSONDecodeError:
+                print("[Ошибка] Не удалось декодировать JSON.")
+                track.error = "invalid_json"
+                return {
+                    "error": "invalid_json",
+                    "status_code": response.status_code,
+                    "text": response.text
+                }
+
+    def get_balance(self):
+        params = {"accountType": "UNIFIED"}
+        response = self.send_request(BALANCE_ENDPOINT, "GET", params)
+        return _parse_balance(response)
+
+    def get_available_trading_pairs(self, amount_of_pair=1000):
+        params = {"instType": "SPOT"}
+        response = self.send_request(INSTRUMENTS_ENDPOINT, "GET", params)
+        return _parse_trading_pairs(response, amount_of_pair)
+
+    def fetch_instruments(self):
+        """
+        Загружает полные параметры спотовых инструментов (шаг цены, лота, минимумы).
+
+        Возвращает:
+            list: Список Instrument
+        """
+        response = self.send_request(INSTRUMENTS_ENDPOINT, "GET", {"instType": "SPOT"})
+        return _parse_instruments(response)
+
+    def get_opened_positions(self):
+        params = {}
+        response = self.send_request(POSITIONS_ENDPOINT, "GET", params)
+        return _parse_positions(response)
+
+    def get_some_last_kandle(self, symbol="BTC-USDT", interval="15m", limit=15):
+        """
+        Получает последние свечи для указанной торговой пары.
+        
+        Параметры:
+            symbol (str): Торговая пара (например, "BTC-USDT")
+            interval (str): Интервал свечи (по умолчанию "15m" - 15 минут)
+            limit (int): Количество свечей (по умолчанию 15)
+        
+        Возвращает:
+            list: Список кортежей (open_price, close_price) для каждой свечи
+        """
+        params = _kline_params(symbol, interval, limit)
+        response = self.send_request(KLINE_ENDPOINT, "GET", params)
+        return _parse_kandles(response)
+
+    def get_history_klines(self, symbol, interval="1m", after=None, before=None,
+                           limit=HISTORY_KLINE_MAX_LIMIT):
+        """
+        Получает полные свечи OHLCV из архива OKX (постранично назад во времени).
+
+        Параметры:
+            symbol (str): Торговая пара (например, "BTC-USDT")
+            interval (str): Интервал свечи ("1m", "15m", "1h", ...)
+            after (int): Вернуть свечи строго раньше этого времени, мс
+            before (int): Вернуть свечи строго позже этого времени, мс
+            limit (int): Количество свечей, не больше 100
+
+        Возвращает:
+            list: Кортежи (timestamp_ms, open, high, low, close, volume) по возрастанию времени
+
+        Исключения:
+            Exception: При ошибке API или сети
+        """
+        params = {
+            "instId": symbol,
+            "bar": convert_interval(interval),
+            "limit": str(min(limit, HISTORY_KLINE_MAX_LIMIT))
+        }
+        if after is not None:
+            params["after"] = str(int(after))
+        if before is not None:
+            params["before"] = str(int(before))
+
+        return _parse_ohlcv(self.send_request(HISTORY_KLINE_ENDPOINT, "GET", params))
+
+    def place_order(self, side, amount, symbol):
+        """
+        Размещает ордер на OKX.
+        
+        Параметры:
+            side (str): "buy" или "sell"
+            amount (float): Сумма в котируемой валюте для покупки, количество
+                            базовой валюты для продажи
+            symbol (str): Торговая пара (например "BTC-USDT")
+        
+        Возвращает:
+            str: Ответ от API OKX
+        """
+        error = _validate_order(side, amount)
+        if not error:
+            amount, error = self.check_slippage(side, amount, symbol)
+        error = error or _validate_size(side, amount, symbol)
+        if error:
+            return error
+        
+        response = self.send_request(ORDER_ENDPOINT, "POST", body=_order_params(side, amount, symbol))
+        return _parse_order(response)
+
+    def place_batch_orders(self, orders, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Размещает несколько ордеров пачками по BATCH_ORDER_MAX_SIZE.
+        
+        Параметры:
+            orders (list): Словари {'side', 'amount', 'symbol', 'client_order_id'} или кортежи (side, amount, symbol)
+            max_workers (int): Число пачек, отправляемых одновременно
+        
+        Возвращает:
+            list: Результаты в порядке ордеров: client_order_id, ok, order_id, message
+        """
+        def validate(order):
+            error = _validate_order(order['side'], order['amount'])
+            if not error:
+                order['amount'], error = self.check_slippage(order['side'], order['amount'], order['symbol'])
+            return error or _validate_size(order['side'], order['amount'], order['symbol'])
+
+        def send_chunk(chunk):
+            response = self.send_request(BATCH_ORDER_ENDPOINT, "POST", body=_batch_order_params(chunk))
+            return _parse_batch_orders(response, chunk)
+
+        return submit_in_chunks(normalize_orders(orders), BATCH_ORDER_MAX_SIZE, send_chunk,
+                                validate, max_workers)
+
+    def check_slippage(self, side, amount, symbol):
+        """
+        Проверяет ордер по стакану (если задан slippage_guard) в единицах sz:
+        покупка - сумма в котируемой валюте, продажа - количество базовой.
+
+        Возвращает:
+            tuple: (размер - исходный или уменьшенный до допуска, текст ошибки или None)
+        """
+        if self.slippage_guard is None:
+            return amount, None
+        if side.lower() == 'buy':
+            return self.slippage_guard.check('okx', symbol, side, notional=amount)
+        return self.slippage_guard.check('okx', symbol, side, qty=amount)
+
+    def get_session_stats(self):
+        return self.session.get_stats()
+
+    def close(self):
+        self.session.close()
+
+
+# Клиент по умолчанию для функций уровня модуля (CLI, веб-сервер)
+session = PooledSession(url)
+session_options = {}
+_default_client = OkxClient(session=session)
+
+
+def get_default_client():
+    """Возвращает клиента, которым пользуются функции модуля"""
+    return _default_client
+
+
+def get_info_from_json():
+    global api_key, secret_key, api_passphrase, _default_client
+
+    if not os.path.exists("config.json"):
+        raise FileNotFoundError("Файл config.json не найден.")
+
+    try:
+        with open("config.json", "r", encoding="utf-8") as file:
+            data = json.load(file)
+
+        new_session_options = session_options_from_config(data)
+        if new_session_options and new_session_options != session_options:
+            configure_session(**new_session_options)
+
+        # Ордера клиента по умолчанию (CLI, веб-сервер, OrderExecution) проверяются по стаканам
+        from market_data.fill_estimator import get_default_guard
+        _default_client = OkxClient.from_config(data, session=session, slippage_guard=get_default_guard('okx', instruments))
+        api_key = data['API_KEY_OKX']
+        secret_key = data['API_SECRET_KEY_OKX']
+        api_passphrase = data['API_PASSPHRASE']
+
+    except json.JSONDecodeError:
+        raise ValueError("Ошибка чтения JSON. Проверьте формат config.json.")
+
+
+def configure_session(**options):
+    """Пересоздает пул соединений с новыми настройками (pool_size, таймауты, повторы)"""
+    global session, session_options
+    old_session = session
+    session = PooledSession(url, **options)
+    session_options = dict(options)
+    _default_client.session = session
+    old_session.close()
+
+
+def get_session_stats():
+    """Возвращает статистику пула соединений и повторов OKX"""
+    return session.get_stats()
+
+
+def get_rate_limit_stats():
+    """Возвращает очереди и бюджеты ограничителя частоты OKX"""
+    return _default_client.scheduler.get_stats()
+
+
+def get_sign(timestamp: str, method: str, request_path: str, params: dict, body: str = "") -> str:
+    return _default_client.sign(timestamp, method, request_path + build_query_string(params), body)
+
+
+def send_request(endpoint: str, method: str, params: dict = None, body: dict = None):
+    return _default_client.send_request(endpoint, method, params, body)
+
+
+def get_balance():
+    return _default_client.get_balance()
+
+
+def get_available_trading_pairs(amount_of_pair=1000):
+    return _default_client.get_available_trading_pairs(amount_of_pair)
+
+
+def fetch_instruments():
+    return _default_client.fetch_instruments()
+
+
+instruments = InstrumentRegistry('okx', fetch_instruments, snapshot_path=snapshot_path_for('okx'))
+
+
+def get_opened_positions():
+    return _default_client.get_opened_positions()
+
+
+def get_some_last_kandle(symbol="BTC-USDT", interval="15m", limit=15):
+    return _default_client.get_some_last_kandle(symbol, interval, limit)
+
+
+def get_history_klines(symbol, interval="1m", after=None, before=None, limit=HISTORY_KLINE_MAX_LIMIT):
+    return _default_client.get_history_klines(symbol, interval, after, before, limit)
+
+
+def place_order(side, amount, symbol):
+    return _default_client.place_order(side, amount, symbol)
+
+
+def place_batch_orders(orders, max_workers=DEFAULT_MAX_WORKERS):
+    return _default_client.place_batch_orders(orders, max_workers)
+
+
 if __name__ == "__main__":
     get_info_from_json()
     print(get_balance())
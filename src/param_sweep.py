@@ -0,0 +1,249 @@
+"""
+Подбор параметров стратегий: перебор по сетке и случайный поиск.
+
+Каждый набор параметров прогоняется векторным бэктестом (src.backtester)
+в пуле процессов. Ряды OHLCV один раз копируются в общую память
+(multiprocessing.shared_memory), процессы работают с ними напрямую, без
+сериализации и копий. Результаты построчно дописываются в CSV, поэтому
+прерванный подбор продолжается с места остановки: уже посчитанные наборы
+параметров пропускаются.
+"""
+
+import csv
+import itertools
+import json
+import os
+import random
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+import pandas as pd
+
+from src.backtester import run_backtest
+from strategies.batch_signals import OHLCV_FIELDS
+from strategies.dynamic_scalping_strategy import DEFAULT_PARAMS as SCALPING_DEFAULT_PARAMS
+
+RESULTS_DIR = os.path.join("data", "sweeps")
+
+STAT_FIELDS = ('sharpe', 'total_return', 'cagr', 'max_drawdown', 'win_rate', 'trades',
+               'turnover', 'annual_turnover', 'exposure', 'costs', 'bars')
+
+# Пространства поиска по умолчанию: список - перебор значений,
+# кортеж (мин, макс) - диапазон для случайного поиска
+DEFAULT_SPACES = {
+    'scalping': {
+        'sma_window': [10, 15, SCALPING_DEFAULT_PARAMS['sma_window'], 30, 50],
+        'rsi_window': [7, SCALPING_DEFAULT_PARAMS['rsi_window'], 21],
+        'acceleration_threshold': [0.1, 0.25, SCALPING_DEFAULT_PARAMS['acceleration_threshold'], 1.0],
+        'quantity_multiply': [1.2, SCALPING_DEFAULT_PARAMS['quantity_multiply'], 2.0],
+        'sma_gap': [0.005, SCALPING_DEFAULT_PARAMS['sma_gap'], 0.02],
+        'rsi_threshold': [5, SCALPING_DEFAULT_PARAMS['rsi_threshold'], 15]
+    },
+    'breakout': {
+        'window_sr': [3, 5, 10, 20, 50],
+        'threshold_percent': [0.001, 0.0025, 0.005, 0.01, 0.02]
+    },
+    'ema_crossover': {
+        'short_period': [3, 5, 8, 12],
+        'long_period': [20, 30, 50, 100, 200]
+    }
+}
+
+
+def grid(space):
+    """Все сочетания значений пространства {параметр: [значения]}"""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def random_search(space, trials, seed=None):
+    """
+    Случайные наборы параметров без повторов.
+
+    Значение-список выбирается случайно, кортеж (мин, макс) задает
+    диапазон: целый, если обе границы целые, иначе вещественный.
+    """
+    rng = random.Random(seed)
+    seen = set()
+    param_sets = []
+    attempts = 0
+    while len(param_sets) < trials and attempts < trials * 20:
+        attempts += 1
+        params = {}
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                low, high = values
+                if isinstance(low, int) and isinstance(high, int):
+                    params[name] = rng.randint(low, high)
+                else:
+                    params[name] = round(rng.uniform(low, high), 6)
+            else:
+                params[name] = rng.choice(list(values))
+        key = param_key(params)
+        if key not in seen:
+            seen.add(key)
+            param_sets.append(params)
+    return param_sets
+
+
+def param_key(params):
+    """Ключ набора параметров для поиска уже посчитанных результатов"""
+    return json.dumps(params, sort_keys=True)
+
+
+class SharedPrices:
+    """
+    Ряды OHLCV в одном блоке общей памяти (поля x свечи, float64).
+    Блок удаляется при выходе из контекста.
+    """
+
+    def __init__(self, prices, fields=OHLCV_FIELDS):
+        self.fields = tuple(field for field in fields if field in prices)
+        self.length = len(prices['close'])
+        size = max(len(self.fields) * self.length * 8, 1)
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        block = np.ndarray((len(self.fields), self.length), dtype=np.float64, buffer=self._shm.buf)
+        for row, field in enumerate(self.fields):
+            block[row] = prices[field]
+
+    @property
+    def descriptor(self):
+        """Что нужно процессу, чтобы подключиться к блоку"""
+        return self._shm.name, self.fields, self.length
+
+    def close(self):
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def attach_prices(descriptor):
+    """
+    Подключение к блоку SharedPrices в другом процессе.
+
+    Returns:
+        tuple: (SharedMemory, {поле: np.ndarray только для чтения})
+    """
+    name, fields, length = descriptor
+    shm = shared_memory.SharedMemory(name=name)
+    block = np.ndarray((len(fields), length), dtype=np.float64, buffer=shm.buf)
+    block.flags.writeable = False
+    return shm, {field: block[row] for row, field in enumerate(fields)}
+
+
+# Состояние процесса пула: подключенный блок цен и настройки бэктеста
+_worker = {}
+
+
+def _init_worker(descriptor, strategy, interval, backtest_kwargs):
+    shm, prices = attach_prices(descriptor)
+    _worker.update(shm=shm, prices=prices, strategy=strategy, interval=interval,
+                   backtest_kwargs=backtest_kwargs)
+
+
+def _run_one(params):
+    try:
+        result = run_backtest(_worker['strategy'], _worker['prices'], params, _worker['interval'],
+                              **_worker['backtest_kwargs'])
+        return params, result.stats, ""
+    except Exception as e:
+        return params, {}, str(e)
+
+
+def _prepare_results(path, param_names):
+    """
+    Готовит CSV к дозаписи: отрезает недописанную строку после аварийной
+    остановки и возвращает (колонки, ключи посчитанных наборов).
+    """
+    default_columns = ['params', *param_names, *STAT_FIELDS, 'error']
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return default_columns, set()
+
+    with open(path, 'rb+') as f:
+        data = f.read()
+        if not data.endswith(b'\n'):
+            f.truncate(data.rfind(b'\n') + 1)
+
+    results = load_results(path, sort_by=None)
+    done = set()
+    for raw in results['params']:
+        try:
+            done.add(param_key(json.loads(raw)))
+        except (TypeError, ValueError):
+            continue
+    return list(results.columns), done
+
+
+def load_results(path, sort_by='sharpe', ascending=False):
+    """Таблица результатов подбора, лучшие наборы сверху"""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return pd.DataFrame()
+    results = pd.read_csv(path)
+    if sort_by and sort_by in results.columns:
+        results = results.sort_values(sort_by, ascending=ascending, kind='stable').reset_index(drop=True)
+    return results
+
+
+def run_sweep(strategy, prices, param_sets, results_path, interval="1m", sort_by='sharpe',
+              max_workers=None, chunksize=None, resume=True, on_result=None, **backtest_kwargs):
+    """
+    Бэктест наборов параметров в пуле процессов.
+
+    Args:
+        strategy (str): 'breakout', 'scalping' или 'ema_crossover'
+        prices (dict): Ряды open, high, low, close, volume
+        param_sets (list): Наборы параметров (grid, random_search)
+        results_path (str): CSV результатов; строки дописываются по мере готовности
+        interval (str): Интервал свечей
+        sort_by (str): Показатель для ранжирования
+        max_workers (int): Число процессов (по умолчанию - число ядер)
+        chunksize (int): Сколько наборов отдавать процессу за раз
+        resume (bool): Пропускать наборы, уже записанные в results_path
+        on_result (callable): Вызывается как on_result(строка, готово, всего)
+        **backtest_kwargs: fee_rate, slippage, allow_short, position_size
+
+    Returns:
+        pd.DataFrame: Все результаты из results_path, отсортированные по sort_by
+    """
+    param_sets = list(param_sets)
+    param_names = sorted({name for params in param_sets for name in params})
+
+    directory = os.path.dirname(results_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if not resume and os.path.exists(results_path):
+        os.remove(results_path)
+
+    columns, done = _prepare_results(results_path, param_names)
+    pending = [params for params in param_sets if param_key(params) not in done]
+
+    if pending:
+        max_workers = max_workers or os.cpu_count() or 1
+        chunksize = chunksize or max(1, min(32, len(pending) // (max_workers * 8)))
+        write_header = not os.path.exists(results_path) or os.path.getsize(results_path) == 0
+
+        with SharedPrices(prices) as shared, \
+                Pool(max_workers, initializer=_init_worker,
+                     initargs=(shared.descriptor, strategy, interval, backtest_kwargs)) as pool, \
+                open(results_path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
+            if write_header:
+                writer.writeheader()
+            for count, (params, stats, error) in enumerate(
+                    pool.imap_unordered(_run_one, pending, chunksize=chunksize), 1):
+                row = {'params': param_key(params), **params, **stats, 'error': error}
+                writer.writerow(row)
+                f.flush()
+                if on_result:
+                    on_result(row, count, len(pending))
+
+    return load_results(results_path, sort_by)
+
+
+def default_results_path(strategy, exchange, symbol, interval):
+    return os.path.join(RESULTS_DIR, f"{strategy}_{exchange}_{symbol}_{interval}.csv")
@@ -0,0 +1,306 @@
+"""
+Клиентское ограничение частоты запросов к биржам.
+
+Для каждой биржи ведется планировщик с корзинами токенов по группам
+эндпоинтов (ордера, аккаунт, рыночные данные) и, если у биржи есть общий
+лимит на IP, с общей корзиной. Запросы ждут токен в очереди с приоритетами:
+ордера обслуживаются раньше запросов аккаунта, а те - раньше рыночных данных.
+Бюджеты подстраиваются под заголовки лимитов из ответов (X-Bapi-Limit-Status
+у Bybit) и под ответы 429 / коды "слишком много запросов".
+"""
+
+import itertools
+import threading
+import time
+from collections import namedtuple
+
+PRIORITY_ORDER = 0
+PRIORITY_ACCOUNT = 1
+PRIORITY_MARKET = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_ORDER: 'order',
+    PRIORITY_ACCOUNT: 'account',
+    PRIORITY_MARKET: 'market'
+}
+
+# Пауза группы после ответа 429 или кода превышения лимита, сек
+THROTTLE_PENALTY = 1.0
+MAX_HEADER_BLOCK = 5.0
+
+# Коды ответа API о превышении лимита: Bybit retCode, OKX code
+THROTTLE_CODES = frozenset({'10006', '10018', '50011', '50061'})
+
+RateGroup = namedtuple('RateGroup', ['rate', 'burst', 'priority', 'prefixes'])
+
+DEFAULT_GROUP = 'other'
+
+# Лимиты из документации бирж (с запасом). rate - запросов в секунду, burst - емкость корзины
+EXCHANGE_LIMITS = {
+    'bybit': {
+        'order': RateGroup(10, 10, PRIORITY_ORDER, ('/v5/order/',)),
+        'account': RateGroup(10, 10, PRIORITY_ACCOUNT, ('/v5/account/', '/v5/position/')),
+        'market': RateGroup(50, 50, PRIORITY_MARKET, ('/v5/market/',)),
+        DEFAULT_GROUP: RateGroup(10, 10, PRIORITY_MARKET, ())
+    },
+    'okx': {
+        'order': RateGroup(30, 60, PRIORITY_ORDER, ('/api/v5/trade/order',)),
+        'batch_order': RateGroup(7.5, 15, PRIORITY_ORDER, ('/api/v5/trade/batch-orders',)),
+        'balance': RateGroup(5, 10, PRIORITY_ACCOUNT, ('/api/v5/account/balance',)),
+        'positions': RateGroup(5, 10, PRIORITY_ACCOUNT, ('/api/v5/account/positions',)),
+        'instruments': RateGroup(10, 20, PRIORITY_MARKET, ('/api/v5/public/instruments',)),
+        'candles': RateGroup(20, 40, PRIORITY_MARKET, ('/api/v5/market/candles',)),
+        'history_candles': RateGroup(10, 20, PRIORITY_MARKET, ('/api/v5/market/history-candles',)),
+        'market': RateGroup(10, 20, PRIORITY_MARKET, ('/api/v5/market/',)),
+        DEFAULT_GROUP: RateGroup(5, 10, PRIORITY_MARKET, ())
+    }
+}
+
+# Общий лимит на IP: (запросов в секунду, емкость)
+GLOBAL_LIMITS = {
+    'bybit': (120, 120)
+}
+
+
+class TokenBucket:
+    """Корзина токенов; не потокобезопасна, защищается блокировкой планировщика"""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def delay(self, now):
+        """Через сколько секунд будет доступен токен (0 - доступен сейчас)"""
+        self._refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def block(self, seconds, now):
+        self._refill(now)
+        self.tokens = 0.0
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+    def adapt(self, limit, remaining, reset_in, now):
+        """Подстраивает корзину под лимит и остаток, сообщенные биржей"""
+        self._refill(now)
+        if limit:
+            self.rate = self.capacity = float(limit)
+        if remaining is not None:
+            self.tokens = min(self.tokens, float(remaining))
+            if remaining <= 0 and reset_in:
+                self.blocked_until = max(self.blocked_until, now + min(max(reset_in, 0.0), MAX_HEADER_BLOCK))
+
+
+def _header_number(headers, name):
+    try:
+        value = headers.get(name)
+        return float(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+class RequestScheduler:
+    """
+    Планировщик запросов одной биржи.
+
+    Args:
+        exchange (str): Название биржи
+        groups (dict): {группа: RateGroup}; должна быть группа DEFAULT_GROUP
+        global_limit (tuple): Общий лимит (rate, burst) для всех групп или None
+    """
+
+    def __init__(self, exchange, groups, global_limit=None):
+        self.exchange = exchange
+        self.groups = dict(groups)
+        self._cond = threading.Condition()
+        self._buckets = {name: TokenBucket(group.rate, group.burst) for name, group in self.groups.items()}
+        self._global = TokenBucket(*global_limit) if global_limit else None
+        self._waiters = []
+        self._seq = itertools.count()
+        self._group_cache = {}
+
+        self._stats = {
+            name: {'granted': 0, 'throttled': 0, 'wait_total': 0.0, 'wait_max': 0.0}
+            for name in self.groups
+        }
+
+    def group_for(self, endpoint):
+        """Группа эндпоинта по самому длинному совпадающему префиксу"""
+        group = self._group_cache.get(endpoint)
+        if group is None:
+            best = 0
+            group = DEFAULT_GROUP
+            for name, spec in self.groups.items():
+                for prefix in spec.prefixes:
+                    if endpoint.startswith(prefix) and len(prefix) > best:
+                        group, best = name, len(prefix)
+            self._group_cache[endpoint] = group
+        return group
+
+    def _delay(self, group, now):
+        delay = self._buckets[group].delay(now)
+        if self._global is not None:
+            delay = max(delay, self._global.delay(now))
+        return delay
+
+    def _try_grant(self, waiter, now):
+        """Выдает токен, если он есть и его не ждет более приоритетный запрос; иначе - время ожидания"""
+        delay = self._delay(waiter[2], now)
+        if delay > 0:
+            return delay
+
+        for other in self._waiters:
+            if other < waiter and self._delay(other[2], now) == 0:
+                # Токен достанется более приоритетному запросу, ждем его уведомления
+                return 0.01
+
+        self._buckets[waiter[2]].take()
+        if self._global is not None:
+            self._global.take()
+        return 0.0
+
+    def acquire(self, endpoint, priority=None, timeout=None):
+        """
+        Блокирует поток до получения разрешения на запрос.
+
+        Args:
+            endpoint (str): Путь эндпоинта, например "/v5/order/create"
+            priority (int): PRIORITY_*; по умолчанию - приоритет группы эндпоинта
+            timeout (float): Максимальное ожидание, сек
+
+        Returns:
+            float: Время ожидания, сек
+        """
+        group = self.group_for(endpoint)
+        if priority is None:
+            priority = self.groups[group].priority
+
+        start = time.monotonic()
+        waiter = (priority, next(self._seq), group)
+        with self._cond:
+            self._waiters.append(waiter)
+            try:
+                while True:
+                    now = time.monotonic()
+                    delay = self._try_grant(waiter, now)
+                    if delay == 0:
+                        break
+                    if timeout is not None:
+                        remaining = start + timeout - now
+                        if remaining <= 0:
+                            raise TimeoutError(f"Превышено время ожидания лимита {self.exchange} {endpoint}")
+                        delay = min(delay, remaining)
+                    self._cond.wait(delay)
+            finally:
+                self._waiters.remove(waiter)
+                self._cond.notify_all()
+
+            waited = time.monotonic() - start
+            stats = self._stats[group]
+            stats['granted'] += 1
+            stats['wait_total'] += waited
+            stats['wait_max'] = max(stats['wait_max'], waited)
+        return waited
+
+    def update(self, endpoint, status_code=None, headers=None, payload=None):
+        """
+        Учитывает ответ биржи: заголовки лимитов, статус 429 и коды превышения лимита в JSON.
+        """
+        group = self.group_for(endpoint)
+        throttled = status_code == 429
+        if isinstance(payload, dict):
+            code = payload.get('retCode', payload.get('code'))
+            throttled = throttled or (code is not None and str(code) in THROTTLE_CODES)
+
+        limit = remaining = reset_in = None
+        if headers is not None:
+            remaining = _header_number(headers, 'X-Bapi-Limit-Status')
+            limit = _header_number(headers, 'X-Bapi-Limit')
+            reset_ms = _header_number(headers, 'X-Bapi-Limit-Reset-Timestamp')
+            if reset_ms is not None:
+                reset_in = reset_ms / 1000 - time.time()
+
+        if not throttled and remaining is None and limit is None:
+            return
+
+        with self._cond:
+            now = time.monotonic()
+            bucket = self._buckets[group]
+            if remaining is not None or limit is not None:
+                bucket.adapt(limit, remaining, reset_in, now)
+            if throttled:
+                penalty = THROTTLE_PENALTY
+                if reset_in is not None:
+                    penalty = min(max(reset_in, THROTTLE_PENALTY), MAX_HEADER_BLOCK)
+                self._stats[group]['throttled'] += 1
+                bucket.block(penalty, now)
+            self._cond.notify_all()
+
+    def get_stats(self):
+        """Глубина очередей по приоритетам, ожидание и текущие бюджеты групп"""
+        with self._cond:
+            now = time.monotonic()
+            queued = {name: 0 for name in PRIORITY_NAMES.values()}
+            queued_by_group = {}
+            for priority, _, group in self._waiters:
+                queued[PRIORITY_NAMES.get(priority, str(priority))] += 1
+                queued_by_group[group] = queued_by_group.get(group, 0) + 1
+
+            groups = {}
+            for name, bucket in self._buckets.items():
+                bucket._refill(now)
+                stats = self._stats[name]
+                groups[name] = {
+                    'priority': PRIORITY_NAMES.get(self.groups[name].priority),
+                    'rate': bucket.rate,
+                    'capacity': bucket.capacity,
+                    'tokens': round(bucket.tokens, 3),
+                    'blocked_for': round(max(bucket.blocked_until - now, 0.0), 3),
+                    'queued': queued_by_group.get(name, 0),
+                    'granted': stats['granted'],
+                    'throttled': stats['throttled'],
+                    'avg_wait': round(stats['wait_total'] / stats['granted'], 6) if stats['granted'] else 0.0,
+                    'max_wait': round(stats['wait_max'], 6)
+                }
+
+            return {
+                'exchange': self.exchange,
+                'queue_depth': len(self._waiters),
+                'queued': queued,
+                'groups': groups
+            }
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(exchange):
+    """Общий для процесса планировщик биржи (лимиты бирж считаются на IP и аккаунт)"""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(exchange)
+        if scheduler is None:
+            scheduler = RequestScheduler(exchange, EXCHANGE_LIMITS[exchange], GLOBAL_LIMITS.get(exchange))
+            _schedulers[exchange] = scheduler
+        return scheduler
+
+
+def get_all_stats():
+    """Статистика всех созданных планировщиков"""
+    with _schedulers_lock:
+        schedulers = list(_schedulers.values())
+    return {scheduler.exchange: scheduler.get_stats() for scheduler in schedulers}
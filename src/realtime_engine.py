@@ -1,41 +1,72 @@
-import pandas as pd
-import time
-from .strategies.dynamic_scalping_strategy import generate_signal as scalping_signal
-from src.strategies.breakout_strategy import generate_breakout_signal
-from src.strategies.ema_crossover_strategy import generate_ema_signal
+import asyncio
+import os
+from market_data.candle_store import get_store
+from market_data.candle_window import iter_windows
+from src.event_engine import EventEngine, ReplayFeed
+from src.feature_cache import tag_frame
+from strategies.dynamic_scalping_strategy import DEFAULT_PARAMS as SCALPING_DEFAULT_PARAMS
+from strategies.dynamic_scalping_strategy import generate_signal as scalping_signal
+from strategies.breakout_strategy import generate_breakout_signal
+from strategies.ema_crossover_strategy import generate_ema_signal
 
 
-def simulate_realtime_data(file_path='data/BTCUSDT_1m.csv', window=50):
-    df = pd.read_csv(file_path)
+def _ensure_candles(store, symbol, interval, exchange, file_path=None):
+    if store.length(exchange, symbol, interval) == 0:
+        file_path = file_path or f'data/{symbol}_{interval}.csv'
+        if os.path.exists(file_path):
+            store.import_csv(exchange, symbol, interval, file_path)
 
-    for i in range(window, len(df), 5):
-        yield df.iloc[i - window:i].reset_index(drop=True)
-        time.sleep(1)
 
+def load_candles(symbol='BTCUSDT', interval='1m', exchange='bybit', file_path=None):
+    """
+    Читает свечи из хранилища; при первом запуске импортирует в него CSV
+    (по умолчанию data/{symbol}_{interval}.csv). DataFrame помечен источником
+    для общего кэша индикаторов (src.feature_cache).
+    """
+    store = get_store()
+    _ensure_candles(store, symbol, interval, exchange, file_path)
+    return tag_frame(store.read_frame(exchange, symbol, interval), exchange, symbol, interval)
 
-def run_realtime_trading(strategy_func, params=None):
-    print("Движок запущен в режиме реального времени (упрощённая версия)")
-    for df_window in simulate_realtime_data():
-        try:
-            signal = strategy_func(df_window, params or {})
-            print(f"{time.ctime()} | Сигнал: {signal.upper()}")
-        except Exception as e:
-            print(f"Ошибка при генерации сигнала: {e}")
 
+def replay_windows(symbol='BTCUSDT', interval='1m', exchange='bybit', window=50, step=5, file_path=None):
+    """
+    Скользящие окна свечей хранилища без копирования: один объект CandleWindow
+    над memmap сдвигается на step свечей. Окно действительно до следующего шага.
+    """
+    store = get_store()
+    _ensure_candles(store, symbol, interval, exchange, file_path)
+    attrs = {'exchange': exchange, 'symbol': symbol, 'interval': interval}
+    return iter_windows(store.read(exchange, symbol, interval), window, step, attrs)
+
+
+def run_realtime_trading(strategy_func, params=None, symbol='BTCUSDT', interval='1m', exchange='bybit',
+                         window=50, delay=0.2, file_path=None):
+    """
+    Воспроизводит свечи из хранилища через событийный движок (src.event_engine)
+    и выводит сигналы стратегии; в конце печатает задержки tick-to-signal.
+    """
+    print("Движок запущен в режиме реального времени (воспроизведение свечей)")
+    engine = EventEngine()
+    engine.add_feed(ReplayFeed(engine.bus, exchange, symbol, interval,
+                               load_candles(symbol, interval, exchange, file_path), delay=delay))
+    subscription = engine.add_strategy(strategy_func, exchange, symbol, interval, params or {}, window=window)
+    try:
+        asyncio.run(engine.run())
+    except KeyboardInterrupt:
+        pass
+
+    stats = subscription.get_stats()
+    print(f"Свечей: {stats['bars']}, сигналы: {stats['signals']}, ошибки: {stats['errors']}")
+    print(f"Задержка tick-to-signal: {stats['tick_to_signal']}")
     print("Реальный режим завершён")
 
 
 if __name__ == "__main__":
-    strategy_params = {
-        "sma_window": 20,
-        "rsi_window": 14,
-        "acceleration_threshold": 0.5,
-        "take_profit_threshold": 1.0,
-        "cut_loss_threshold": 1.0,
-        "quantity_multiply": 1.5,
-        "sma_gap": 0.01,
-        "rsi_threshold": 10
-    }
+    strategy_params = dict(
+        SCALPING_DEFAULT_PARAMS,
+        take_profit_threshold=1.0,
+        cut_loss_threshold=1.0
+    )
 
     print("Выберите стратегию:")
     print("1. Динамический скальпинг")
@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
 import threading
 import time
 import os
@@ -15,44 +15,65 @@ app.config['EXPLAIN_TEMPLATE_LOADING'] = True
 
 try:
     from .bybit import (
-        get_balance as bybit_balance,
-        get_opened_positions as bybit_positions,
-        get_some_last_kandle as bybit_kline,
         place_order as bybit_order,
+        place_batch_orders as bybit_batch_orders,
         get_available_trading_pairs as bybit_pairs,
-        get_info_from_json as get_info_bybit
+        get_info_from_json as get_info_bybit,
+        get_session_stats as bybit_session_stats,
+        get_rate_limit_stats as bybit_rate_limit_stats
     )
     
     from .okx import (
-        get_balance as okx_balance,
-        get_opened_positions as okx_positions,
-        get_some_last_kandle as okx_kline,
         place_order as okx_order,
+        place_batch_orders as okx_batch_orders,
         get_available_trading_pairs as okx_pairs,
-        get_info_from_json as get_info_okx
+        get_info_from_json as get_info_okx,
+        get_session_stats as okx_session_stats,
+        get_rate_limit_stats as okx_rate_limit_stats
     )
+
+    from .async_exchange import fetch_dashboard
+    from . import metrics
+    from .feature_cache import get_feature_cache_stats
+    from market_data.candle_store import sync_recent
 except ImportError:
     import sys
     sys.path.append(str(Path(__file__).parent))
     
     from bybit import (
-        get_balance as bybit_balance,
-        get_opened_positions as bybit_positions,
-        get_some_last_kandle as bybit_kline,
         place_order as bybit_order,
+        place_batch_orders as bybit_batch_orders,
         get_available_trading_pairs as bybit_pairs,
-        get_info_from_json as get_info_bybit
+        get_info_from_json as get_info_bybit,
+        get_session_stats as bybit_session_stats,
+        get_rate_limit_stats as bybit_rate_limit_stats
     )
     
     from okx import (
-        get_balance as okx_balance,
-        get_opened_positions as okx_positions,
-        get_some_last_kandle as okx_kline,
         place_order as okx_order,
+        place_batch_orders as okx_batch_orders,
         get_available_trading_pairs as okx_pairs,
-        get_info_from_json as get_info_okx
+        get_info_from_json as get_info_okx,
+        get_session_stats as okx_session_stats,
+        get_rate_limit_stats as okx_rate_limit_stats
     )
 
+    from async_exchange import fetch_dashboard
+    import metrics
+    sys.path.append(str(Path(__file__).parent.parent))
+    from market_data.candle_store import sync_recent
+    from src.feature_cache import get_feature_cache_stats
+
+_config_loaded = False
+
+def ensure_config_loaded():
+    """Загружает ключи обеих бирж один раз за время работы сервера"""
+    global _config_loaded
+    if not _config_loaded:
+        get_info_bybit()
+        get_info_okx()
+        _config_loaded = True
+
 @app.route('/')
 def index():
     """Главная страница веб-интерфейса"""
@@ -82,24 +103,8 @@ def index():
 def balance():
     """API для получения баланса с обеих бирж"""
     try:
-        get_info_bybit()
-        get_info_okx()
-        
-        bybit_total, bybit_coins = bybit_balance()
-        okx_total, okx_coins = okx_balance()
-        
-        return jsonify({
-            'bybit': {
-                'total': bybit_total,
-                'coins': bybit_coins,
-                'positions': bybit_positions()
-            },
-            'okx': {
-                'total': okx_total,
-                'coins': okx_coins,
-                'positions': okx_positions()
-            }
-        })
+        ensure_config_loaded()
+        return jsonify(fetch_dashboard())
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -110,26 +115,47 @@ def chart():
         exchange = request.args.get('exchange', 'bybit')
         pair = request.args.get('pair', 'BTCUSDT')
         interval = request.args.get('interval', '15m')
+        limit = int(request.args.get('limit', 15))
         
-        if exchange == 'bybit':
-            data = bybit_kline(symbol=pair, interval=interval)
-        else:
-            data = okx_kline(symbol=pair, interval=interval)
+        data = sync_recent(exchange if exchange == 'bybit' else 'okx', pair, interval, limit)
         
         return jsonify({
-            'labels': [str(i) for i in range(len(data))],
-            'open': [float(x[0]) for x in data],
-            'close': [float(x[1]) for x in data]
+            'labels': [str(i) for i in range(len(data['close']))],
+            'timestamp': data['timestamp'].tolist(),
+            'open': data['open'].tolist(),
+            'high': data['high'].tolist(),
+            'low': data['low'].tolist(),
+            'close': data['close'].tolist(),
+            'volume': data['volume'].tolist()
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/trade', methods=['POST'])
 def trade():
-    """API для размещения ордеров"""
+    """API для размещения ордеров: одного или пачки (ключ orders)"""
     try:
         data = request.json
         exchange = data['exchange']
+        
+        if 'orders' in data:
+            orders = []
+            for order in data['orders']:
+                order_side = order['side'].lower()
+                if exchange == 'bybit':
+                    order_side = "Buy" if order_side == "buy" else "Sell"
+                orders.append({
+                    'side': order_side,
+                    'amount': float(order['amount']),
+                    'symbol': order['pair'],
+                    'client_order_id': order.get('client_order_id')
+                })
+            if exchange == 'bybit':
+                results = bybit_batch_orders(orders)
+            else:
+                results = okx_batch_orders(orders)
+            return jsonify({'results': results})
+        
         pair = data['pair']
         side = data['side']
         amount = float(data['amount'])
@@ -169,6 +195,35 @@ def pairs():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/http_stats')
+def http_stats():
+    """API для статистики пулов HTTP-соединений и повторов запросов"""
+    return jsonify({
+        'bybit': bybit_session_stats(),
+        'okx': okx_session_stats()
+    })
+
+@app.route('/rate_limits')
+def rate_limits():
+    """API для состояния ограничителей частоты: очереди по приоритетам, ожидание, бюджеты групп"""
+    return jsonify({
+        'bybit': bybit_rate_limit_stats(),
+        'okx': okx_rate_limit_stats()
+    })
+
+@app.route('/feature_cache')
+def feature_cache_stats():
+    """API для состояния кэша индикаторов: записи, размер, доля попаданий"""
+    return jsonify(get_feature_cache_stats())
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Метрики задержек и ошибок в текстовом формате Prometheus"""
+    for exchange, stats in (('bybit', bybit_session_stats()), ('okx', okx_session_stats())):
+        created = sum(pool['connections_created'] for pool in stats['pools'])
+        metrics.HTTP_CONNECTIONS_CREATED.labels(exchange).set(created)
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
 @app.errorhandler(404)
 def not_found(error):
     """Обработчик 404 ошибок"""
@@ -0,0 +1,338 @@
+"""
+Потоковые индикаторы: обновление за O(1) на каждую новую свечу.
+
+Каждый индикатор хранит кольцевой буфер последних значений и скользящую
+сумму, поэтому новая свеча не требует пересчета всего окна. Результаты
+совпадают с пакетными функциями src/indicators.py (calculate_sma,
+calculate_rsi, calculate_atr) и с pandas ewm(span, adjust=False) для EMA
+на тех же данных; до заполнения окна возвращается NaN, как в pandas.
+"""
+
+import math
+from collections import deque
+
+NAN = float('nan')
+
+
+class RollingMean:
+    """
+    Скользящее среднее по кольцевому буферу.
+
+    Сумма ведется с компенсацией Кэхэна и раз в window обновлений
+    пересчитывается заново, чтобы ошибка округления не накапливалась.
+    Окно из одних нулей дает точный 0, как rolling().mean() в pandas.
+    """
+
+    __slots__ = ('window', '_buffer', '_index', '_count', '_sum', '_compensation', '_nonzero', '_updates')
+
+    def __init__(self, window):
+        if window < 1:
+            raise ValueError("Окно должно быть не меньше 1")
+        self.window = window
+        self._buffer = [0.0] * window
+        self._index = 0
+        self._count = 0
+        self._sum = 0.0
+        self._compensation = 0.0
+        self._nonzero = 0
+        self._updates = 0
+
+    def _add(self, value):
+        y = value - self._compensation
+        t = self._sum + y
+        self._compensation = (t - self._sum) - y
+        self._sum = t
+
+    def update(self, value):
+        old = self._buffer[self._index]
+        self._buffer[self._index] = value
+        self._index = (self._index + 1) % self.window
+
+        if self._count == self.window:
+            self._add(-old)
+            self._nonzero -= old != 0
+        else:
+            self._count += 1
+        self._add(value)
+        self._nonzero += value != 0
+
+        self._updates += 1
+        if self._updates >= self.window:
+            self._updates = 0
+            self._sum = math.fsum(self._buffer[:self._count])
+            self._compensation = 0.0
+        return self.value
+
+    @property
+    def ready(self):
+        return self._count == self.window
+
+    @property
+    def value(self):
+        if self._count < self.window:
+            return NAN
+        if self._nonzero == 0:
+            return 0.0
+        return self._sum / self.window
+
+
+class RollingMin:
+    """
+    Скользящий минимум, как rolling(window).min(): монотонная очередь,
+    амортизированно O(1) на значение.
+    """
+
+    __slots__ = ('window', '_queue', '_count')
+
+    def __init__(self, window):
+        if window < 1:
+            raise ValueError("Окно должно быть не меньше 1")
+        self.window = window
+        self._queue = deque()
+        self._count = 0
+
+    def _dominates(self, kept, value):
+        return kept >= value
+
+    def update(self, value):
+        while self._queue and self._dominates(self._queue[-1][1], value):
+            self._queue.pop()
+        self._queue.append((self._count, value))
+        self._count += 1
+        if self._queue[0][0] <= self._count - 1 - self.window:
+            self._queue.popleft()
+        return self.value
+
+    @property
+    def value(self):
+        if self._count < self.window:
+            return NAN
+        return self._queue[0][1]
+
+
+class RollingMax(RollingMin):
+    """Скользящий максимум, как rolling(window).max()"""
+
+    __slots__ = ()
+
+    def _dominates(self, kept, value):
+        return kept <= value
+
+
+class SMA:
+    """Простая скользящая средняя цены закрытия (calculate_sma)"""
+
+    __slots__ = ('window', '_mean')
+
+    def __init__(self, window=20):
+        self.window = window
+        self._mean = RollingMean(window)
+
+    def update(self, close):
+        return self._mean.update(close)
+
+    @property
+    def value(self):
+        return self._mean.value
+
+
+class EMA:
+    """Экспоненциальная средняя, как close.ewm(span=span, adjust=False).mean()"""
+
+    __slots__ = ('span', 'alpha', 'value')
+
+    def __init__(self, span):
+        self.span = span
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = NAN
+
+    def update(self, close):
+        self.value = self.peek(close)
+        return self.value
+
+    def peek(self, close):
+        """Значение при следующей цене close без изменения состояния"""
+        if math.isnan(self.value):
+            return float(close)
+        return self.alpha * close + (1.0 - self.alpha) * self.value
+
+
+class RSI:
+    """
+    RSI на простых средних прироста и падения (calculate_rsi).
+
+    Как и в пакетной версии, приращение первой свечи считается нулевым.
+    """
+
+    __slots__ = ('window', '_gain', '_loss', '_prev_close', 'value')
+
+    def __init__(self, window=14):
+        self.window = window
+        self._gain = RollingMean(window)
+        self._loss = RollingMean(window)
+        self._prev_close = None
+        self.value = NAN
+
+    def update(self, close):
+        delta = 0.0 if self._prev_close is None else close - self._prev_close
+        self._prev_close = close
+
+        gain = self._gain.update(delta if delta > 0 else 0.0)
+        loss = self._loss.update(-delta if delta < 0 else 0.0)
+
+        if math.isnan(gain):
+            self.value = NAN
+        elif loss == 0:
+            self.value = NAN if gain == 0 else 100.0
+        else:
+            self.value = 100.0 - 100.0 / (1.0 + gain / loss)
+        return self.value
+
+
+class ATR:
+    """ATR как простая средняя истинного диапазона (calculate_atr)"""
+
+    __slots__ = ('window', '_mean', '_prev_close')
+
+    def __init__(self, window=14):
+        self.window = window
+        self._mean = RollingMean(window)
+        self._prev_close = None
+
+    def update(self, high, low, close):
+        true_range = high - low
+        if self._prev_close is not None:
+            true_range = max(true_range, abs(high - self._prev_close), abs(low - self._prev_close))
+        self._prev_close = close
+        return self._mean.update(true_range)
+
+    @property
+    def value(self):
+        return self._mean.value
+
+
+class IndicatorSet:
+    """
+    Набор индикаторов одной пары.
+
+    Args:
+        sma_window (int): Окно SMA
+        rsi_window (int): Окно RSI
+        atr_window (int): Окно ATR
+        ema_spans (tuple): Периоды EMA (значения доступны как EMA_{span})
+    """
+
+    def __init__(self, sma_window=20, rsi_window=14, atr_window=14, ema_spans=(5, 20)):
+        self.sma = SMA(sma_window)
+        self.rsi = RSI(rsi_window)
+        self.atr = ATR(atr_window)
+        self.emas = {span: EMA(span) for span in ema_spans}
+        self.bars = 0
+
+    def update(self, high, low, close):
+        """Учитывает новую закрытую свечу и возвращает текущие значения"""
+        self.sma.update(close)
+        self.rsi.update(close)
+        self.atr.update(high, low, close)
+        for ema in self.emas.values():
+            ema.update(close)
+        self.bars += 1
+        return self.values()
+
+    def values(self):
+        values = {'SMA': self.sma.value, 'RSI': self.rsi.value, 'ATR': self.atr.value}
+        for span, ema in self.emas.items():
+            values[f'EMA_{span}'] = ema.value
+        return values
+
+
+class IndicatorEngine:
+    """
+    Потоковые индикаторы для многих пар: состояние хранится по символу,
+    каждая новая свеча обновляет только индикаторы своей пары.
+
+    Пример:
+        engine = IndicatorEngine(sma_window=20)
+        engine.warm_up('BTCUSDT', df)                  # история
+        values = engine.update('BTCUSDT', high, low, close)  # новая свеча
+    """
+
+    def __init__(self, **indicator_params):
+        self.indicator_params = indicator_params
+        self._sets = {}
+
+    def _set_for(self, symbol):
+        indicators = self._sets.get(symbol)
+        if indicators is None:
+            indicators = self._sets[symbol] = IndicatorSet(**self.indicator_params)
+        return indicators
+
+    def update(self, symbol, high, low, close):
+        return self._set_for(symbol).update(float(high), float(low), float(close))
+
+    def warm_up(self, symbol, df):
+        """Прогоняет историю DataFrame (high, low, close) через индикаторы пары"""
+        indicators = self._set_for(symbol)
+        for high, low, close in zip(df['high'].to_numpy(dtype=float), df['low'].to_numpy(dtype=float),
+                                    df['close'].to_numpy(dtype=float)):
+            indicators.update(high, low, close)
+        return indicators.values()
+
+    def values(self, symbol):
+        return self._set_for(symbol).values()
+
+    def reset(self, symbol=None):
+        if symbol is None:
+            self._sets.clear()
+        else:
+            self._sets.pop(symbol, None)
+
+    @property
+    def symbols(self):
+        return list(self._sets)
+
+
+def _slot_names(cls):
+    names = []
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get('__slots__', ())
+        names.extend((slots,) if isinstance(slots, str) else slots)
+    return names
+
+
+def get_state(indicator):
+    """
+    Состояние индикатора в виде словаря (вложенные индикаторы - словарями,
+    буферы - списками); пригодно для json и set_state.
+    """
+    state = {}
+    for name in _slot_names(type(indicator)):
+        value = getattr(indicator, name)
+        if _slot_names(type(value)):
+            value = get_state(value)
+        elif isinstance(value, (list, deque)):
+            value = [[_plain(x) for x in item] if isinstance(item, tuple) else _plain(item) for item in value]
+        else:
+            value = _plain(value)
+        state[name] = value
+    return state
+
+
+def _plain(value):
+    """Скаляры NumPy -> числа Python (для json)"""
+    return value.item() if hasattr(value, 'item') else value
+
+
+def set_state(indicator, state):
+    """Восстанавливает состояние, полученное get_state"""
+    for name, value in state.items():
+        current = getattr(indicator, name)
+        if isinstance(value, dict) and _slot_names(type(current)):
+            set_state(current, value)
+        elif isinstance(current, deque):
+            setattr(indicator, name, deque(tuple(item) if isinstance(item, list) else item for item in value))
+        elif isinstance(current, list):
+            setattr(indicator, name, list(value))
+        else:
+            setattr(indicator, name, value)
+    return indicator
@@ -0,0 +1,248 @@
+"""
+Сканер межбиржевого арбитража Bybit/OKX по всем общим парам.
+
+Символы бирж сопоставляются по базовой и котируемой валюте инструментов
+(BTCUSDT на Bybit и BTC-USDT на OKX - пара BTC/USDT). Лучшие цены всех
+пар хранятся в массивах [биржа x пара]; на каждое обновление котировки
+спреды с учетом комиссий пересчитываются для всех пар и направлений одним
+векторным проходом, без цикла по парам.
+
+Котировки приходят событиями MarketDataBus: 'ticker' (bid/ask) и
+'orderbook' (первый уровень снимка, например orderbook.1 Bybit).
+"""
+
+import time
+from collections import namedtuple
+
+import numpy as np
+
+EXCHANGES = ('bybit', 'okx')
+DEFAULT_FEES = {'bybit': 0.001, 'okx': 0.001}
+DEFAULT_MAX_QUOTE_AGE = 5.0
+DEFAULT_TOP = 10
+
+# Пара, общая для бирж: key - 'BASE/QUOTE', symbols - {биржа: символ}
+CommonPair = namedtuple('CommonPair', ['key', 'base', 'quote', 'symbols'])
+
+# Возможность арбитража: купить по ask на buy_exchange, продать по bid на sell_exchange.
+#   spread - bid / ask - 1 без комиссий, net_spread - с комиссиями обеих сторон
+#   size - объем лучших уровней (меньший из двух), quote_age - возраст старшей котировки, с
+#   timestamp - время расчета (time.time())
+Opportunity = namedtuple('Opportunity', [
+    'pair', 'buy_exchange', 'sell_exchange', 'buy_symbol', 'sell_symbol',
+    'buy_price', 'sell_price', 'spread', 'net_spread', 'size', 'quote_age', 'timestamp'
+])
+
+
+def common_pairs(instruments):
+    """
+    Пересечение списков инструментов бирж по (base, quote).
+
+    Args:
+        instruments (dict): {биржа: [Instrument]} (src.instruments)
+
+    Returns:
+        list: CommonPair, отсортированные по key
+    """
+    by_exchange = {}
+    for exchange, items in instruments.items():
+        mapping = {}
+        for instrument in items:
+            if instrument.base and instrument.quote:
+                mapping[(instrument.base.upper(), instrument.quote.upper())] = instrument.symbol
+        by_exchange[exchange] = mapping
+
+    exchanges = list(by_exchange)
+    if not exchanges:
+        return []
+    keys = set(by_exchange[exchanges[0]])
+    for exchange in exchanges[1:]:
+        keys &= set(by_exchange[exchange])
+    return [CommonPair(f"{base}/{quote}", base, quote,
+                       {exchange: by_exchange[exchange][(base, quote)] for exchange in exchanges})
+            for base, quote in sorted(keys)]
+
+
+def top_level(levels):
+    """Первый уровень с ненулевым объемом: (цена, объем) или None"""
+    for level in levels:
+        qty = float(level[1])
+        if qty > 0:
+            return float(level[0]), qty
+    return None
+
+
+class ArbitrageScanner:
+    """
+    Лучшие цены общих пар на всех биржах и ранжированные возможности арбитража.
+
+    Args:
+        pairs (list): CommonPair (см. common_pairs)
+        fees (dict): Комиссия тейкера по биржам (доля)
+        min_spread (float): Минимальный net_spread возможности
+        max_quote_age (float): Котировки старше, с, не участвуют в расчете
+        on_opportunities (callable): Вызывается со списком возможностей после
+                                     обновления, если он не пуст
+        top (int): Сколько лучших возможностей передавать on_opportunities
+    """
+
+    def __init__(self, pairs, fees=None, min_spread=0.0, max_quote_age=DEFAULT_MAX_QUOTE_AGE,
+                 on_opportunities=None, top=DEFAULT_TOP):
+        self.pairs = list(pairs)
+        self.exchanges = tuple(sorted({exchange for pair in self.pairs for exchange in pair.symbols})) or EXCHANGES
+        fees = {**DEFAULT_FEES, **(fees or {})}
+        self.min_spread = min_spread
+        self.max_quote_age = max_quote_age
+        self.on_opportunities = on_opportunities
+        self.top = top
+
+        shape = (len(self.exchanges), len(self.pairs))
+        self.bid = np.full(shape, np.nan)
+        self.ask = np.full(shape, np.nan)
+        self.bid_size = np.zeros(shape)
+        self.ask_size = np.zeros(shape)
+        self.updated = np.zeros(shape)
+        self.fees = np.array([fees.get(exchange, 0.0) for exchange in self.exchanges])
+
+        self._index = {}
+        for column, pair in enumerate(self.pairs):
+            for row, exchange in enumerate(self.exchanges):
+                symbol = pair.symbols.get(exchange)
+                if symbol is not None:
+                    self._index[(exchange, symbol)] = (row, column)
+        # Направления: покупка на бирже buy, продажа на бирже sell
+        self._routes = [(buy, sell) for buy in range(len(self.exchanges))
+                        for sell in range(len(self.exchanges)) if buy != sell]
+        self._buy = np.array([route[0] for route in self._routes], dtype=np.intp)
+        self._sell = np.array([route[1] for route in self._routes], dtype=np.intp)
+        self._buy_fee = (1.0 + self.fees[self._buy])[:, None]
+        self._sell_fee = (1.0 - self.fees[self._sell])[:, None]
+        self.stats = {'updates': 0, 'ignored': 0, 'scans': 0, 'scan_seconds': 0.0}
+
+    def symbols(self, exchange):
+        """Символы общих пар в формате биржи (для подписки потоков)"""
+        return [pair.symbols[exchange] for pair in self.pairs if exchange in pair.symbols]
+
+    def subscribe(self, stream, channel=None):
+        """
+        Подписывает поток биржи на котировки всех общих пар.
+
+        По умолчанию OKX - канал 'ticker' (в нем есть bid/ask), Bybit -
+        'orderbook' глубины 1 (спотовый тикер Bybit лучших цен не содержит).
+        """
+        channel = channel or ('orderbook' if stream.exchange == 'bybit' else 'ticker')
+        for symbol in self.symbols(stream.exchange):
+            stream.subscribe(channel, symbol, depth=1)
+
+    def update(self, exchange, symbol, bid=None, ask=None, bid_size=None, ask_size=None, timestamp=None):
+        """Обновляет котировку; возвращает False, если пара не отслеживается"""
+        position = self._index.get((exchange, symbol))
+        if position is None:
+            self.stats['ignored'] += 1
+            return False
+        if bid is not None:
+            self.bid[position] = bid
+            self.bid_size[position] = bid_size if bid_size is not None else np.nan
+        if ask is not None:
+            self.ask[position] = ask
+            self.ask_size[position] = ask_size if ask_size is not None else np.nan
+        self.updated[position] = timestamp if timestamp is not None else time.time()
+        self.stats['updates'] += 1
+        return True
+
+    def on_event(self, event):
+        """Обработчик MarketDataBus для каналов 'ticker' и 'orderbook'"""
+        data = event.data
+        if event.channel == 'ticker':
+            updated = self.update(event.exchange, event.symbol, data.get('bid'), data.get('ask'),
+                                  data.get('bid_size'), data.get('ask_size'), event.recv_ts)
+        elif event.channel == 'orderbook':
+            bid, ask = top_level(data.get('bids', [])), top_level(data.get('asks', []))
+            updated = self.update(event.exchange, event.symbol,
+                                  bid[0] if bid else None, ask[0] if ask else None,
+                                  bid[1] if bid else None, ask[1] if ask else None, event.recv_ts)
+        else:
+            return None
+
+        if updated and self.on_opportunities is not None:
+            opportunities = self.scan(limit=self.top)
+            if opportunities:
+                self.on_opportunities(opportunities)
+        return updated
+
+    def spreads(self, now=None):
+        """
+        Спреды всех пар по всем направлениям.
+
+        Returns:
+            tuple: (gross, net, age) - массивы [направление x пара]; у пар без
+                   свежих котировок обеих бирж net = nan
+        """
+        now = time.time() if now is None else now
+        ask = self.ask[self._buy]
+        bid = self.bid[self._sell]
+        age = now - np.minimum(self.updated[self._buy], self.updated[self._sell])
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            gross = bid / ask
+            net = gross * (self._sell_fee / self._buy_fee) - 1.0
+            gross -= 1.0
+        stale = (age > self.max_quote_age) | ~(ask > 0) | ~(bid > 0)
+        net[stale] = np.nan
+        return gross, net, age
+
+    def scan(self, now=None, limit=None):
+        """
+        Возможности с net_spread не меньше min_spread, лучшие первыми.
+
+        Args:
+            now (float): Время расчета (по умолчанию time.time())
+            limit (int): Сколько лучших возможностей вернуть
+        """
+        started = time.perf_counter()
+        now = time.time() if now is None else now
+        gross, net, age = self.spreads(now)
+
+        with np.errstate(invalid='ignore'):
+            routes, columns = np.nonzero(net >= self.min_spread)
+        values = net[routes, columns]
+        if limit is not None and limit < len(values):
+            best = np.argpartition(-values, limit)[:limit]
+            order = best[np.argsort(-values[best], kind='stable')]
+        else:
+            order = np.argsort(-values, kind='stable')
+
+        opportunities = []
+        for index in order:
+            route, column = routes[index], columns[index]
+            buy, sell = self._routes[route]
+            pair = self.pairs[column]
+            buy_exchange, sell_exchange = self.exchanges[buy], self.exchanges[sell]
+            opportunities.append(Opportunity(
+                pair.key, buy_exchange, sell_exchange,
+                pair.symbols[buy_exchange], pair.symbols[sell_exchange],
+                float(self.ask[buy, column]), float(self.bid[sell, column]),
+                float(gross[route, column]), float(net[route, column]),
+                float(min(self.ask_size[buy, column], self.bid_size[sell, column])),
+                float(age[route, column]), now
+            ))
+
+        self.stats['scans'] += 1
+        self.stats['scan_seconds'] += time.perf_counter() - started
+        return opportunities
+
+    def get_stats(self):
+        scans = self.stats['scans']
+        return {
+            **self.stats,
+            'pairs': len(self.pairs),
+            'quoted': int(np.sum(np.all(self.updated > 0, axis=0))),
+            'avg_scan_seconds': self.stats['scan_seconds'] / scans if scans else 0.0
+        }
+
+
+def create_scanner(fees=None, **kwargs):
+    """Сканер по общим спотовым парам реестров инструментов Bybit и OKX"""
+    from src import bybit, okx
+    pairs = common_pairs({'bybit': bybit.instruments.instruments(), 'okx': okx.instruments.instruments()})
+    return ArbitrageScanner(pairs, fees, **kwargs)
@@ -1,3 +1,6 @@
+from strategies.base_strategy import BaseStrategy
+
+
 def generate_arbitrage_signal(price_a, price_b, min_spread=0.005):
     if price_a <= 0 or price_b <= 0:
         raise ValueError("Цены должны быть положительными")
@@ -12,4 +15,41 @@ def generate_arbitrage_signal(price_a, price_b, min_spread=0.005):
     if price_a < price_b:
         return f'buy_bybit_sell_okx_{spread_percent:.4f}'
     else:
-        return f'buy_okx_sell_bybit_{spread_percent:.4f}'
\ No newline at end of file
+        return f'buy_okx_sell_bybit_{spread_percent:.4f}'
+
+
+class ArbitrageStrategy(BaseStrategy):
+    """
+    Межбиржевой арбитраж Bybit/OKX: хранит последнюю цену каждой биржи и
+    пересчитывает спред при каждой новой цене (тик или закрытие свечи с
+    полем exchange).
+    """
+
+    name = 'arbitrage'
+    default_params = {"min_spread": 0.005}
+    state_attrs = ('prices',)
+
+    def _init_state(self):
+        self.prices = {}
+
+    def _signal(self, exchange, price):
+        if exchange is None or price is None or price <= 0:
+            return self.signal
+        self.prices[exchange] = float(price)
+        if 'bybit' not in self.prices or 'okx' not in self.prices:
+            return 'hold'
+        return generate_arbitrage_signal(self.prices['bybit'], self.prices['okx'], self.params["min_spread"])
+
+    def on_bar(self, bar):
+        # Свечи двух бирж приходят с одинаковым временем, поэтому повторы не отбрасываются
+        self.signal = self._update(bar)
+        self.bars += 1
+        self.last_timestamp = bar.get('timestamp')
+        return self.signal
+
+    def _update(self, bar):
+        return self._signal(bar.get('exchange'), bar.get('close'))
+
+    def _on_price(self, tick):
+        self.signal = self._signal(tick.get('exchange'), tick.get('price'))
+        return self.signal
\ No newline at end of file
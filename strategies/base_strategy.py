@@ -1,2 +1,143 @@
+"""
+Базовый класс стратегий с состоянием.
+
+Стратегия получает свечи по одной (on_bar) и тики (on_tick), хранит
+потоковые индикаторы (src.streaming_indicators) и обновляет их за O(1)
+на свечу вместо пересчета по всему окну. Состояние снимается snapshot()
+и восстанавливается restore() - для перезапуска без повторного прогрева.
+
+Функции generate_*_signal(df, params) остаются для бэктеста и пакетного
+режима; классы принимают те же параметры и дают те же сигналы на той же
+истории.
+"""
+
+from src.streaming_indicators import get_state, set_state
+
+BAR_FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+
 def generate_signal_template(df):
-    return 'hold'
\ No newline at end of file
+    return 'hold'
+
+
+def _is_indicator(value):
+    return hasattr(type(value), '__slots__') and not isinstance(value, (int, float, str))
+
+
+class BaseStrategy:
+    """
+    Стратегия с состоянием.
+
+    Наследник задает name, default_params, state_attrs (атрибуты состояния:
+    потоковые индикаторы и простые значения) и реализует:
+        _init_state()      - создать индикаторы по self.params
+        _update(bar)       - учесть закрытую свечу и вернуть сигнал
+        _on_price(tick)    - сигнал по тику (по умолчанию - сигнал последней свечи)
+
+    Пример:
+        strategy = EmaCrossoverStrategy({'short_period': 5})
+        strategy.warm_up(history)
+        signal = strategy.on_bar({'timestamp': ts, 'open': o, 'high': h, 'low': l,
+                                  'close': c, 'volume': v})
+        saved = strategy.snapshot()          # json.dumps(saved) для файла
+        EmaCrossoverStrategy(saved['params']).restore(saved)
+    """
+
+    name = 'base'
+    default_params = {}
+    state_attrs = ()
+
+    def __init__(self, params=None):
+        self.params = {**self.default_params, **(params or {})}
+        self.reset()
+
+    def reset(self):
+        """Сбрасывает состояние к началу истории"""
+        self.bars = 0
+        self.last_timestamp = None
+        self.signal = 'hold'
+        self._init_state()
+
+    def _init_state(self):
+        pass
+
+    def _update(self, bar):
+        return 'hold'
+
+    def _on_price(self, tick):
+        return self.signal
+
+    def on_bar(self, bar):
+        """
+        Учитывает закрытую свечу.
+
+        Args:
+            bar (dict): timestamp, open, high, low, close, volume
+
+        Returns:
+            str: 'buy', 'sell' или 'hold'
+        """
+        timestamp = bar.get('timestamp')
+        if timestamp is not None and self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            return self.signal
+        self.signal = self._update(bar)
+        self.bars += 1
+        self.last_timestamp = timestamp
+        return self.signal
+
+    def on_tick(self, tick):
+        """
+        Сигнал по тику без изменения состояния свечей.
+
+        Args:
+            tick (dict): price и необязательно qty, exchange, symbol, timestamp
+        """
+        return self._on_price(tick)
+
+    def warm_up(self, candles):
+        """Прогоняет историю (DataFrame, окно CandleWindow или словарь колонок) через on_bar"""
+        columns = [candles[field] for field in BAR_FIELDS if field in candles]
+        names = [field for field in BAR_FIELDS if field in candles]
+        for values in zip(*columns):
+            self.on_bar(dict(zip(names, (value.item() if hasattr(value, 'item') else value
+                                         for value in values))))
+        return self.signal
+
+    def snapshot(self):
+        """Состояние стратегии в виде словаря, пригодного для json"""
+        state = {}
+        for attr in self.state_attrs:
+            value = getattr(self, attr)
+            state[attr] = get_state(value) if _is_indicator(value) else value
+        return {
+            'strategy': self.name,
+            'params': dict(self.params),
+            'bars': self.bars,
+            'last_timestamp': self.last_timestamp,
+            'signal': self.signal,
+            'state': state
+        }
+
+    def restore(self, snapshot):
+        """
+        Восстанавливает состояние из snapshot().
+
+        Raises:
+            ValueError: Снимок другой стратегии или с другими параметрами
+        """
+        if snapshot.get('strategy') != self.name:
+            raise ValueError(f"Снимок стратегии {snapshot.get('strategy')}, ожидалась {self.name}")
+        if snapshot.get('params') != self.params:
+            raise ValueError("Параметры снимка не совпадают с параметрами стратегии")
+
+        self.reset()
+        for attr, value in snapshot['state'].items():
+            current = getattr(self, attr)
+            if _is_indicator(current):
+                set_state(current, value)
+            else:
+                setattr(self, attr, value)
+        self.bars = snapshot['bars']
+        self.last_timestamp = snapshot['last_timestamp']
+        self.signal = snapshot['signal']
+        return self
@@ -0,0 +1,197 @@
+"""
+Пакетный расчет сигналов стратегий сразу для многих пар.
+
+Функции принимают выровненные по времени матрицы (пары x свечи) для open,
+high, low, close и volume и возвращают вектор сигналов 'buy'/'sell'/'hold'
+по одному на пару. Индикаторы и условия считаются векторно по всем парам;
+результат совпадает с вызовом одиночной стратегии для каждой пары на тех
+же свечах.
+"""
+
+import numpy as np
+
+from src import indicator_kernels as kernels
+
+OHLCV_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def align_frames(frames, bars=None):
+    """
+    Собирает DataFrame пар в матрицы по последним общим свечам.
+
+    Args:
+        frames (dict): {symbol: DataFrame с колонками open, high, low, close, volume}
+        bars (int): Сколько последних свечей взять (по умолчанию - длина самой короткой истории)
+
+    Returns:
+        tuple: (список пар, {поле: np.ndarray (пары, свечи)})
+    """
+    symbols = list(frames)
+    if not symbols:
+        return symbols, {field: np.empty((0, 0)) for field in OHLCV_FIELDS}
+
+    length = min(len(frames[symbol]) for symbol in symbols)
+    if bars is not None:
+        length = min(length, bars)
+
+    prices = {}
+    for field in OHLCV_FIELDS:
+        matrix = np.empty((len(symbols), length), dtype=np.float64)
+        for row, symbol in enumerate(symbols):
+            column = frames[symbol][field].to_numpy(dtype=np.float64)
+            matrix[row] = column[len(column) - length:]
+        prices[field] = matrix
+    return symbols, prices
+
+
+def _signals(buy, sell):
+    return np.where(buy, 'buy', np.where(sell, 'sell', 'hold'))
+
+
+def _tail(matrix, bars):
+    return kernels.as_float_array(matrix[:, -bars:])
+
+
+def _last_rolling_min(matrix, window):
+    """Последнее значение rolling(window).min() по каждой паре"""
+    if matrix.shape[1] < window:
+        return np.full(matrix.shape[0], np.nan)
+    return matrix[:, -window:].min(axis=1)
+
+
+def batch_breakout_signal(prices, params):
+    """Пакетный аналог generate_breakout_signal (в том числе сопротивление как минимум high)"""
+    window_sr = params.get("window_sr", 5)
+    threshold = params.get("threshold_percent", 0.01)
+
+    support = _last_rolling_min(prices['low'], window_sr)
+    resistance = _last_rolling_min(prices['high'], window_sr)
+    price = prices['close'][:, -1]
+
+    with np.errstate(invalid='ignore'):
+        buy = price > resistance * (1 + threshold)
+        sell = price < support * (1 - threshold)
+    return _signals(buy, sell)
+
+
+def batch_ema_signal(prices, params):
+    """Пакетный аналог generate_ema_signal"""
+    close = kernels.as_float_array(prices['close'])
+    ema_short = kernels.ema(close, params.get("short_period", 5))[:, -1]
+    ema_long = kernels.ema(close, params.get("long_period", 20))[:, -1]
+    return _signals(ema_short > ema_long, ema_short < ema_long)
+
+
+def batch_scalping_signal(prices, params):
+    """Пакетный аналог dynamic_scalping_strategy.generate_signal"""
+    rsi_window = params.get('rsi_window', 14)
+    sma_window = params.get('sma_window', 20)
+    tail = max(rsi_window + 1, sma_window, 20, 2)
+
+    close = _tail(prices['close'], tail)
+    volume = _tail(prices['volume'], tail)
+    count = close.shape[0]
+
+    rsi = kernels.rsi(close, window=rsi_window)[:, -1]
+    sma = kernels.sma(close, window=sma_window)[:, -1]
+    average_quantity = kernels.rolling_mean(volume, 20)[:, -1]
+    acceleration = close[:, -1] - close[:, -2] if close.shape[1] > 1 else np.full(count, np.nan)
+    latest_volume = volume[:, -1]
+
+    acceleration_threshold = params.get("acceleration_threshold", 0.5)
+    short_acceleration_threshold = params.get("short_acceleration_threshold", 0.5)
+    sma_gap = params.get("sma_gap", 0.01)
+    rsi_threshold = params.get("rsi_threshold", 10)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        price_sma = close[:, -1] / sma
+        volume_spike = latest_volume > average_quantity * params.get("quantity_multiply", 1.5)
+
+        buy = ((acceleration > acceleration_threshold) & volume_spike & (price_sma < 1 - sma_gap)
+               & (acceleration > short_acceleration_threshold) & (rsi < 50 - rsi_threshold))
+        sell = ((acceleration < -acceleration_threshold) & volume_spike & (price_sma > 1 + sma_gap)
+                & (acceleration < -short_acceleration_threshold) & (rsi > 50 + rsi_threshold))
+    return _signals(buy, sell)
+
+
+def evaluate(strategy, frames, params, bars=None):
+    """
+    Выравнивает DataFrame пар и считает сигналы пакетной стратегией.
+
+    Returns:
+        dict: {symbol: сигнал}
+    """
+    symbols, prices = align_frames(frames, bars)
+    if not symbols:
+        return {}
+    return dict(zip(symbols, strategy(prices, params).tolist()))
+
+
+
+# Сигналы на каждой свече: +1 - buy, -1 - sell, 0 - hold. Принимают ряды
+# (свечи,) или матрицы (пары, свечи) и повторяют условия одиночных стратегий
+# для каждой свечи так, как если бы стратегия вызывалась на истории до нее.
+
+BUY = 1
+SELL = -1
+HOLD = 0
+
+
+def _signal_codes(buy, sell):
+    codes = np.zeros(buy.shape, dtype=np.int8)
+    codes[sell] = SELL
+    codes[buy] = BUY
+    return codes
+
+
+def breakout_signal_series(prices, params):
+    window_sr = params.get("window_sr", 5)
+    threshold = params.get("threshold_percent", 0.01)
+
+    support = kernels.rolling_min(prices['low'], window_sr)
+    resistance = kernels.rolling_min(prices['high'], window_sr)
+    close = kernels.as_float_array(prices['close'])
+
+    with np.errstate(invalid='ignore'):
+        buy = close > resistance * (1 + threshold)
+        sell = close < support * (1 - threshold)
+    return _signal_codes(buy, sell)
+
+
+def ema_signal_series(prices, params):
+    close = kernels.as_float_array(prices['close'])
+    ema_short = kernels.ema(close, params.get("short_period", 5))
+    ema_long = kernels.ema(close, params.get("long_period", 20))
+    return _signal_codes(ema_short > ema_long, ema_short < ema_long)
+
+
+def scalping_signal_series(prices, params):
+    close = kernels.as_float_array(prices['close'])
+    volume = kernels.as_float_array(prices['volume'])
+
+    rsi = kernels.rsi(close, window=params.get('rsi_window', 14))
+    sma = kernels.sma(close, window=params.get('sma_window', 20))
+    average_quantity = kernels.rolling_mean(volume, 20)
+    acceleration = kernels.diff(close)
+
+    acceleration_threshold = params.get("acceleration_threshold", 0.5)
+    short_acceleration_threshold = params.get("short_acceleration_threshold", 0.5)
+    sma_gap = params.get("sma_gap", 0.01)
+    rsi_threshold = params.get("rsi_threshold", 10)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        price_sma = close / sma
+        volume_spike = volume > average_quantity * params.get("quantity_multiply", 1.5)
+
+        buy = ((acceleration > acceleration_threshold) & volume_spike & (price_sma < 1 - sma_gap)
+               & (acceleration > short_acceleration_threshold) & (rsi < 50 - rsi_threshold))
+        sell = ((acceleration < -acceleration_threshold) & volume_spike & (price_sma > 1 + sma_gap)
+                & (acceleration < -short_acceleration_threshold) & (rsi > 50 + rsi_threshold))
+    return _signal_codes(buy, sell)
+
+
+SIGNAL_SERIES = {
+    'breakout': breakout_signal_series,
+    'scalping': scalping_signal_series,
+    'ema_crossover': ema_signal_series
+}
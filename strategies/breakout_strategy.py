@@ -1,20 +1,53 @@
+import math
+
 import pandas as pd
 
+from market_data.candle_window import column
+from src import feature_cache
+from src.streaming_indicators import RollingMin
+from strategies.base_strategy import BaseStrategy
+
 
 def generate_breakout_signal(df: pd.DataFrame, params: dict) -> str:
     
     window_sr = params.get("window_sr", 5)
-    df['support'] = df['low'].rolling(window=window_sr).min()
-    df['resistance'] = df['high'].rolling(window=window_sr).min()
+    # Индикаторы берутся из общего кэша, df вызывающего кода не изменяется
+    support = feature_cache.rolling_min(df, 'low', window_sr)[-1]
+    resistance = feature_cache.rolling_min(df, 'high', window_sr)[-1]
+
+    price = column(df, 'close')[-1]
 
-    latest = df.iloc[-1]
-    price = latest['close']
+    return _decide(price, support, resistance, params.get("threshold_percent", 0.01))
 
-    threshold = params.get("threshold_percent", 0.01)
 
-    if price > latest['resistance'] * (1 + threshold):
+def _decide(price, support, resistance, threshold):
+    if price > resistance * (1 + threshold):
         return 'buy'
-    elif price < latest['support'] * (1 - threshold):
+    elif price < support * (1 - threshold):
         return 'sell'
     else:
-        return 'hold'
\ No newline at end of file
+        return 'hold'
+
+
+class BreakoutStrategy(BaseStrategy):
+    """Пробой уровней с потоковыми скользящими минимумами: O(1) на свечу"""
+
+    name = 'breakout'
+    default_params = {"window_sr": 5, "threshold_percent": 0.01}
+    state_attrs = ('support', 'resistance')
+
+    def _init_state(self):
+        self.support = RollingMin(self.params["window_sr"])
+        self.resistance = RollingMin(self.params["window_sr"])
+
+    def _update(self, bar):
+        support = self.support.update(float(bar['low']))
+        resistance = self.resistance.update(float(bar['high']))
+        return _decide(float(bar['close']), support, resistance, self.params["threshold_percent"])
+
+    def _on_price(self, tick):
+        # Уровни по закрытым свечам, цена - текущая
+        support, resistance = self.support.value, self.resistance.value
+        if math.isnan(support):
+            return self.signal
+        return _decide(float(tick['price']), support, resistance, self.params["threshold_percent"])
\ No newline at end of file
@@ -1,34 +1,70 @@
+import math
+
 import pandas as pd
-from src.indicators import calculate_atr, calculate_rsi, calculate_sma
+
+from market_data.candle_window import column
+from src import feature_cache
+from src import indicator_kernels as kernels
+from src.streaming_indicators import RSI, SMA, RollingMean
+from strategies.base_strategy import BaseStrategy
+
+# Параметры по умолчанию (запуск из main.py, движок реального времени, подбор параметров)
+DEFAULT_PARAMS = {
+    "sma_window": 20,
+    "rsi_window": 14,
+    "acceleration_threshold": 0.5,
+    "quantity_multiply": 1.5,
+    "sma_gap": 0.01,
+    "rsi_threshold": 10
+}
 
 
 def generate_signal(df: pd.DataFrame, params: dict) -> str:
-    df = df.copy()
+    rsi_window = params.get('rsi_window', 14)
+    sma_window = params.get('sma_window', 20)
+
+    # Индикаторы помеченных свечей берутся из общего кэша (src.feature_cache) и
+    # считаются один раз на свечу для всех стратегий; df (DataFrame или окно
+    # CandleWindow) не изменяется
+    close = column(df, 'close')
+    volume = column(df, 'volume')
+
+    if feature_cache.frame_key(df) is not None:
+        rsi = feature_cache.rsi(df, rsi_window)[-1]
+        sma = feature_cache.sma(df, sma_window)[-1]
+        average_quantity = feature_cache.sma(df, 20, column='volume')[-1]
+    else:
+        # Без кэша условия последней свечи считаются по хвосту ряда нужной длины
+        tail = max(rsi_window + 1, sma_window, 20, 2)
+        tail_close = kernels.as_float_array(close[-tail:])
+        rsi = kernels.rsi(tail_close, window=rsi_window)[-1]
+        sma = kernels.sma(tail_close, window=sma_window)[-1]
+        average_quantity = kernels.rolling_mean(kernels.as_float_array(volume[-tail:]), 20)[-1]
+
+    price_sma = close[-1] / sma
+    acceleration = close[-1] - close[-2] if len(close) > 1 else math.nan
+    latest_volume = volume[-1]
 
-    df['ATR'] = calculate_atr(df, window=params.get('atr_window', 14))
-    df['RSI'] = calculate_rsi(df, window=params.get('rsi_window', 14))
-    df['SMA'] = calculate_sma(df, window=params.get('sma_window', 20))
-    df['Price/SMA'] = df['close'] / df['SMA']
-    df['Acceleration'] = df['close'] - df['close'].shift(1)
-    df['Short Acceleration'] = df['close'] - df['close'].shift(1)
-    df['Average Quantity'] = df['volume'].rolling(window=20).mean()
+    return _decide(acceleration, latest_volume, average_quantity, price_sma, rsi, params)
 
-    latest = df.iloc[-1]
+
+def _decide(acceleration, latest_volume, average_quantity, price_sma, rsi, params):
+    short_acceleration = acceleration
 
     long_conditions = [
-        latest['Acceleration'] > params.get("acceleration_threshold", 0.5),
-        latest['volume'] > latest['Average Quantity'] * params.get("quantity_multiply", 1.5),
-        latest['Price/SMA'] < 1 - params.get("sma_gap", 0.01),
-        latest['Short Acceleration'] > params.get("short_acceleration_threshold", 0.5),
-        latest['RSI'] < 50 - params.get("rsi_threshold", 10)
+        acceleration > params.get("acceleration_threshold", 0.5),
+        latest_volume > average_quantity * params.get("quantity_multiply", 1.5),
+        price_sma < 1 - params.get("sma_gap", 0.01),
+        short_acceleration > params.get("short_acceleration_threshold", 0.5),
+        rsi < 50 - params.get("rsi_threshold", 10)
     ]
 
     short_conditions = [
-        latest['Acceleration'] < -params.get("acceleration_threshold", 0.5),
-        latest['volume'] > latest['Average Quantity'] * params.get("quantity_multiply", 1.5),
-        latest['Price/SMA'] > 1 + params.get("sma_gap", 0.01),
-        latest['Short Acceleration'] < -params.get("short_acceleration_threshold", 0.5),
-        latest['RSI'] > 50 + params.get("rsi_threshold", 10)
+        acceleration < -params.get("acceleration_threshold", 0.5),
+        latest_volume > average_quantity * params.get("quantity_multiply", 1.5),
+        price_sma > 1 + params.get("sma_gap", 0.01),
+        short_acceleration < -params.get("short_acceleration_threshold", 0.5),
+        rsi > 50 + params.get("rsi_threshold", 10)
     ]
 
     if all(long_conditions):
@@ -36,4 +72,30 @@ def generate_signal(df: pd.DataFrame, params: dict) -> str:
     elif all(short_conditions):
         return 'sell'
     else:
-        return 'hold'
\ No newline at end of file
+        return 'hold'
+
+
+class DynamicScalpingStrategy(BaseStrategy):
+    """Динамический скальпинг с потоковыми RSI, SMA и средним объемом: O(1) на свечу"""
+
+    name = 'scalping'
+    default_params = DEFAULT_PARAMS
+    state_attrs = ('rsi', 'sma', 'average_quantity', 'prev_close')
+
+    def _init_state(self):
+        self.rsi = RSI(self.params.get('rsi_window', 14))
+        self.sma = SMA(self.params.get('sma_window', 20))
+        self.average_quantity = RollingMean(20)
+        self.prev_close = None
+
+    def _update(self, bar):
+        close = float(bar['close'])
+        volume = float(bar['volume'])
+        acceleration = close - self.prev_close if self.prev_close is not None else math.nan
+        self.prev_close = close
+
+        rsi = self.rsi.update(close)
+        sma = self.sma.update(close)
+        average_quantity = self.average_quantity.update(volume)
+        price_sma = close / sma if sma else math.nan
+        return _decide(acceleration, volume, average_quantity, price_sma, rsi, self.params)
@@ -1,18 +1,50 @@
 import pandas as pd
 
+from src import feature_cache
+from src.streaming_indicators import EMA
+from strategies.base_strategy import BaseStrategy
+
 
 def generate_ema_signal(df: pd.DataFrame, params: dict) -> str:
     short_period = params.get("short_period", 5)
     long_period = params.get("long_period", 20)
 
-    df['ema_short'] = df['close'].ewm(span=short_period, adjust=False).mean()
-    df['ema_long'] = df['close'].ewm(span=long_period, adjust=False).mean()
+    # Индикаторы берутся из общего кэша, df вызывающего кода не изменяется
+    ema_short = feature_cache.ema(df, short_period)[-1]
+    ema_long = feature_cache.ema(df, long_period)[-1]
+
+    return _decide(ema_short, ema_long)
 
-    latest = df.iloc[-1]
 
-    if latest['ema_short'] > latest['ema_long']:
+def _decide(ema_short, ema_long):
+    if ema_short > ema_long:
         return 'buy'
-    elif latest['ema_short'] < latest['ema_long']:
+    elif ema_short < ema_long:
         return 'sell'
     else:
-        return 'hold'
\ No newline at end of file
+        return 'hold'
+
+
+class EmaCrossoverStrategy(BaseStrategy):
+    """
+    Пересечение EMA с непрерывными потоковыми средними: O(1) на свечу и
+    без расхождения с EMA по всей истории, как при пересчете по окну.
+    """
+
+    name = 'ema_crossover'
+    default_params = {"short_period": 5, "long_period": 20}
+    state_attrs = ('ema_short', 'ema_long')
+
+    def _init_state(self):
+        self.ema_short = EMA(self.params["short_period"])
+        self.ema_long = EMA(self.params["long_period"])
+
+    def _update(self, bar):
+        close = float(bar['close'])
+        return _decide(self.ema_short.update(close), self.ema_long.update(close))
+
+    def _on_price(self, tick):
+        if self.bars == 0:
+            return self.signal
+        price = float(tick['price'])
+        return _decide(self.ema_short.peek(price), self.ema_long.peek(price))
\ No newline at end of file
@@ -2,18 +2,44 @@
 Торговые стратегии
 """
 
-from .arbitrage_strategy import generate_arbitrage_signal
-from .breakout_strategy import generate_breakout_signal
-from .dynamic_scalping_strategy import generate_signal as generate_scalping_signal
-from .ema_crossover_strategy import generate_ema_signal
-from .base_strategy import generate_signal_template
+from .arbitrage_strategy import generate_arbitrage_signal, ArbitrageStrategy
+from .arbitrage_scanner import ArbitrageScanner, Opportunity, common_pairs, create_scanner
+from .triangular_arbitrage import TriangularArbitrage, TriangularOpportunity, create_detector
+from .breakout_strategy import generate_breakout_signal, BreakoutStrategy
+from .dynamic_scalping_strategy import generate_signal as generate_scalping_signal, DynamicScalpingStrategy
+from .ema_crossover_strategy import generate_ema_signal, EmaCrossoverStrategy
+from .base_strategy import generate_signal_template, BaseStrategy
+from .batch_signals import (
+    align_frames,
+    batch_breakout_signal,
+    batch_ema_signal,
+    batch_scalping_signal,
+    evaluate as evaluate_batch
+)
 
 __all__ = [
     'generate_arbitrage_signal',
     'generate_breakout_signal', 
     'generate_scalping_signal',
     'generate_ema_signal',
-    'generate_signal_template'
+    'generate_signal_template',
+    'BaseStrategy',
+    'ArbitrageStrategy',
+    'ArbitrageScanner',
+    'Opportunity',
+    'common_pairs',
+    'create_scanner',
+    'TriangularArbitrage',
+    'TriangularOpportunity',
+    'create_detector',
+    'BreakoutStrategy',
+    'DynamicScalpingStrategy',
+    'EmaCrossoverStrategy',
+    'align_frames',
+    'batch_breakout_signal',
+    'batch_ema_signal',
+    'batch_scalping_signal',
+    'evaluate_batch'
 ]
 
 STRATEGIES = {
@@ -23,10 +49,34 @@ STRATEGIES = {
     'ema_crossover': generate_ema_signal
 }
 
+# Стратегии с состоянием: on_bar/on_tick, O(1) на свечу, snapshot/restore
+STRATEGY_CLASSES = {
+    'arbitrage': ArbitrageStrategy,
+    'breakout': BreakoutStrategy,
+    'scalping': DynamicScalpingStrategy,
+    'ema_crossover': EmaCrossoverStrategy
+}
+
+# Пакетный режим: матрицы (пары x свечи) -> вектор сигналов
+BATCH_STRATEGIES = {
+    'breakout': batch_breakout_signal,
+    'scalping': batch_scalping_signal,
+    'ema_crossover': batch_ema_signal
+}
+
 def get_strategy(name):
     """Получает стратегию по имени."""
     return STRATEGIES.get(name.lower())
 
 def list_strategies():
     """Возвращает список доступных стратегий."""
-    return list(STRATEGIES.keys())
\ No newline at end of file
+    return list(STRATEGIES.keys())
+
+def get_batch_strategy(name):
+    """Получает пакетную версию стратегии по имени (None, если ее нет)"""
+    return BATCH_STRATEGIES.get(name.lower())
+
+def create_strategy(name, params=None):
+    """Создает стратегию с состоянием по имени (None, если ее нет)"""
+    strategy_class = STRATEGY_CLASSES.get(name.lower())
+    return strategy_class(params) if strategy_class else None
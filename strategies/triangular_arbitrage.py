@@ -0,0 +1,221 @@
+"""
+Треугольный арбитраж на одной бирже.
+
+Спотовые инструменты биржи образуют граф валют: пара BASE/QUOTE - два
+ребра, QUOTE -> BASE (покупка по ask) и BASE -> QUOTE (продажа по bid).
+Вес ребра - логарифм курса обмена с учетом комиссии, поэтому доходность
+цикла из трех сделок - сумма трех весов: цикл прибылен, если сумма
+больше нуля (больше log(1 + min_profit)).
+
+Все циклы из трех валют находятся один раз при построении. На обновление
+котировки пары пересчитываются только циклы, проходящие через эту пару
+(индекс пара -> циклы в формате CSR), одной векторной операцией.
+"""
+
+import math
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from strategies.arbitrage_scanner import top_level
+
+DEFAULT_FEE = 0.001
+DEFAULT_MAX_QUOTE_AGE = 5.0
+
+BUY, SELL = 0, 1
+
+# Цикл: start - начальная (и конечная) валюта, legs - ((символ, 'buy'|'sell'), ...),
+#   profit - доходность за круг с комиссиями (0.001 = 0.1%), quote_age - возраст
+#   старшей котировки цикла, с; timestamp - время расчета (time.time())
+TriangularOpportunity = namedtuple('TriangularOpportunity', ['start', 'currencies', 'legs', 'profit',
+                                                             'quote_age', 'timestamp'])
+
+
+def find_cycles(pairs):
+    """
+    Все циклы из трех валют графа пар.
+
+    Args:
+        pairs (list): (символ, base, quote)
+
+    Returns:
+        list: Циклы ((валюта, валюта, валюта), ((номер пары, BUY|SELL), x3)) в
+              обоих направлениях обхода; цикл начинается с валюты с наибольшим
+              числом пар (обычно USDT)
+    """
+    edges = {}
+    neighbours = {}
+    for index, (_, base, quote) in enumerate(pairs):
+        # Из quote в base - покупка base, из base в quote - продажа
+        edges[(quote, base)] = (index, BUY)
+        edges[(base, quote)] = (index, SELL)
+        neighbours.setdefault(base, set()).add(quote)
+        neighbours.setdefault(quote, set()).add(base)
+
+    order = {currency: position for position, currency in enumerate(
+        sorted(neighbours, key=lambda currency: (-len(neighbours[currency]), currency)))}
+    cycles = []
+    for a in neighbours:
+        for b in neighbours[a]:
+            if order[b] <= order[a]:
+                continue
+            for c in neighbours[a] & neighbours[b]:
+                if order[c] <= order[b]:
+                    continue
+                # a - валюта с наибольшим числом пар в треугольнике
+                for path in ((a, b, c), (a, c, b)):
+                    legs = tuple(edges[(path[i], path[(i + 1) % 3])] for i in range(3))
+                    cycles.append((path, legs))
+    return cycles
+
+
+class TriangularArbitrage:
+    """
+    Детектор треугольного арбитража по котировкам одной биржи.
+
+    Args:
+        instruments (list): Instrument биржи (src.instruments)
+        exchange (str): Биржа, события которой принимает on_event
+        fee (float): Комиссия тейкера за сделку (доля)
+        min_profit (float): Минимальная доходность цикла за круг
+        max_quote_age (float): Циклы с котировками старше, с, не сообщаются
+        on_opportunities (callable): Вызывается со списком прибыльных циклов
+                                     после обновления, если он не пуст
+    """
+
+    def __init__(self, instruments, exchange=None, fee=DEFAULT_FEE, min_profit=0.0,
+                 max_quote_age=DEFAULT_MAX_QUOTE_AGE, on_opportunities=None):
+        self.exchange = exchange
+        self.pairs = [(item.symbol, item.base.upper(), item.quote.upper())
+                      for item in instruments if item.base and item.quote]
+        self.min_profit = min_profit
+        self.max_quote_age = max_quote_age
+        self.on_opportunities = on_opportunities
+        self._fee_weight = math.log1p(-fee)
+        self._threshold = math.log1p(min_profit)
+        self._index = {symbol: index for index, (symbol, _, _) in enumerate(self.pairs)}
+
+        cycles = find_cycles(self.pairs)
+        self.cycle_currencies = [path for path, _ in cycles]
+        legs = np.array([legs for _, legs in cycles], dtype=np.intp).reshape(-1, 3, 2)
+        # Ребро пары i: 2*i - покупка base (по ask), 2*i + 1 - продажа (по bid)
+        self.cycle_pairs = legs[:, :, 0]
+        self.cycle_edges = legs[:, :, 0] * 2 + legs[:, :, 1]
+
+        # CSR: циклы пары i - cycles_of[offsets[i]:offsets[i + 1]]
+        flat_pairs = self.cycle_pairs.ravel()
+        order = np.argsort(flat_pairs, kind='stable')
+        self._cycles_of = (order // 3).astype(np.intp)
+        self._offsets = np.zeros(len(self.pairs) + 1, dtype=np.intp)
+        np.cumsum(np.bincount(flat_pairs, minlength=len(self.pairs)), out=self._offsets[1:])
+
+        self.weights = np.full(len(self.pairs) * 2, np.nan)
+        self.updated = np.zeros(len(self.pairs))
+        self.profit = np.full(len(cycles), np.nan)
+        self.stats = {'updates': 0, 'ignored': 0, 'cycles_evaluated': 0, 'evaluate_seconds': 0.0}
+
+    def __len__(self):
+        """Число циклов"""
+        return len(self.cycle_edges)
+
+    def symbols(self):
+        """Символы пар, входящих хотя бы в один цикл (для подписки потоков)"""
+        counts = np.diff(self._offsets)
+        return [self.pairs[index][0] for index in np.flatnonzero(counts)]
+
+    def subscribe(self, stream, channel=None):
+        """Подписывает поток на котировки пар циклов (Bybit - стакан глубины 1, OKX - тикер)"""
+        channel = channel or ('orderbook' if stream.exchange == 'bybit' else 'ticker')
+        for symbol in self.symbols():
+            stream.subscribe(channel, symbol, depth=1)
+
+    def update(self, symbol, bid, ask, timestamp=None):
+        """
+        Обновляет котировку пары и пересчитывает проходящие через нее циклы.
+
+        Returns:
+            list: Прибыльные циклы через эту пару (TriangularOpportunity), лучшие первыми
+        """
+        index = self._index.get(symbol)
+        if index is None:
+            self.stats['ignored'] += 1
+            return []
+        started = time.perf_counter()
+        if ask is not None and ask > 0:
+            self.weights[2 * index] = self._fee_weight - math.log(ask)
+        if bid is not None and bid > 0:
+            self.weights[2 * index + 1] = self._fee_weight + math.log(bid)
+        now = time.time()
+        self.updated[index] = timestamp if timestamp is not None else now
+        self.stats['updates'] += 1
+
+        cycles = self._cycles_of[self._offsets[index]:self._offsets[index + 1]]
+        profit = self.weights[self.cycle_edges[cycles]].sum(axis=1)
+        self.profit[cycles] = profit
+        self.stats['cycles_evaluated'] += len(cycles)
+
+        with np.errstate(invalid='ignore'):
+            hits = np.flatnonzero(profit > self._threshold)
+        opportunities = []
+        if len(hits):
+            ages = now - self.updated[self.cycle_pairs[cycles[hits]]].min(axis=1)
+            fresh = ages <= self.max_quote_age
+            hits, ages = hits[fresh], ages[fresh]
+            for position in np.argsort(-profit[hits], kind='stable'):
+                opportunities.append(self._opportunity(cycles[hits[position]], profit[hits[position]],
+                                                       ages[position], now))
+        self.stats['evaluate_seconds'] += time.perf_counter() - started
+        return opportunities
+
+    def _opportunity(self, cycle, log_profit, age, now):
+        legs = tuple((self.pairs[edge // 2][0], 'buy' if edge % 2 == BUY else 'sell')
+                     for edge in self.cycle_edges[cycle].tolist())
+        currencies = self.cycle_currencies[cycle]
+        return TriangularOpportunity(currencies[0], currencies, legs, math.expm1(log_profit), float(age), now)
+
+    def on_event(self, event):
+        """Обработчик MarketDataBus для каналов 'ticker' и 'orderbook'"""
+        if self.exchange is not None and event.exchange != self.exchange:
+            return None
+        data = event.data
+        if event.channel == 'ticker':
+            bid, ask = data.get('bid'), data.get('ask')
+        elif event.channel == 'orderbook':
+            bid, ask = top_level(data.get('bids', [])), top_level(data.get('asks', []))
+            bid, ask = bid and bid[0], ask and ask[0]
+        else:
+            return None
+        opportunities = self.update(event.symbol, bid, ask, event.recv_ts)
+        if opportunities and self.on_opportunities is not None:
+            self.on_opportunities(opportunities)
+        return opportunities
+
+    def best(self, limit=10):
+        """Лучшие циклы по последним рассчитанным доходностям (в том числе убыточные)"""
+        now = time.time()
+        with np.errstate(invalid='ignore'):
+            ranked = np.argsort(np.where(np.isnan(self.profit), -np.inf, -self.profit), kind='stable')
+        result = []
+        for cycle in ranked[:limit]:
+            if np.isnan(self.profit[cycle]):
+                break
+            age = now - self.updated[self.cycle_pairs[cycle]].min()
+            result.append(self._opportunity(cycle, self.profit[cycle], age, now))
+        return result
+
+    def get_stats(self):
+        updates = self.stats['updates']
+        return {
+            **self.stats,
+            'pairs': len(self.pairs),
+            'cycles': len(self),
+            'avg_update_seconds': self.stats['evaluate_seconds'] / updates if updates else 0.0
+        }
+
+
+def create_detector(exchange, fee=DEFAULT_FEE, **kwargs):
+    """Детектор по спотовым инструментам биржи 'bybit' или 'okx' из реестра инструментов"""
+    from src import bybit, okx
+    registry = bybit.instruments if exchange == 'bybit' else okx.instruments
+    return TriangularArbitrage(registry.instruments(), exchange, fee, **kwargs)
@@ -0,0 +1,97 @@
+"""
+Запись стаканов BookRecorder: воспроизведение, опорные снимки и
+восстановление файлов после сбоя при повторном открытии записи.
+"""
+
+import os
+
+import numpy as np
+
+from market_data.book_recorder import INDEX_DTYPE, LEVEL_DTYPE, BookRecorder, BookReplay
+
+
+def _snapshot(recorder, ts, price):
+    recorder.record('okx', 'BTC-USDT', 'snapshot', [[str(price), '1']], [[str(price + 1), '1']], ts=ts)
+
+
+def _delta(recorder, ts, price):
+    recorder.record('okx', 'BTC-USDT', 'delta', [[str(price), '2']], [], ts=ts)
+
+
+def _states(replay, start=None):
+    return [(ts, str(book.to_dict())) for ts, book in replay.replay(start=start)]
+
+
+def _files(root):
+    directory = os.path.join(root, 'okx', 'BTC-USDT')
+    return os.path.join(directory, 'levels.bin'), os.path.join(directory, 'index.bin')
+
+
+def test_replay_from_keyframe_matches_full_replay(tmp_path):
+    recorder = BookRecorder(str(tmp_path), keyframe_interval=1000)
+    _snapshot(recorder, 0, 100)
+    for i in range(1, 50):
+        _delta(recorder, i * 100, 100 + i)
+    recorder.close()
+
+    replay = BookReplay('okx', 'BTC-USDT', root=str(tmp_path))
+    assert len(replay.index) > 1 and recorder.stats['keyframes'] == len(replay.index) - 1
+    full = _states(replay)
+    assert len(full) == len(replay)
+    for start in (0, 1250, 3000, 4850):
+        # Опорный снимок идет с тем же временем, что и дельта перед ним: сравниваются
+        # состояния стакана на каждый момент времени
+        assert dict(_states(replay, start)) == {ts: depth for ts, depth in full if ts >= start}
+    # Перемотка начинается с опорного снимка, а не с начала файла
+    assert replay.first_message(4850) > replay.first_message(1250) > 0
+
+
+def test_reopen_repairs_torn_files(tmp_path):
+    root = str(tmp_path)
+    recorder = BookRecorder(root, keyframe_interval=None)
+    _snapshot(recorder, 1000, 100)
+    _delta(recorder, 1100, 101)
+    _delta(recorder, 1200, 102)
+    recorder.close()
+
+    levels_path, index_path = _files(root)
+    records = os.path.getsize(levels_path) // LEVEL_DTYPE.itemsize
+    # Сбой: индекс опорного снимка записан, его уровни - нет; хвосты обоих файлов оборваны
+    with open(index_path, 'ab') as f:
+        f.write(np.array([(1300, records)], dtype=INDEX_DTYPE).tobytes())
+        f.write(b'\x01\x02\x03')
+    with open(levels_path, 'ab') as f:
+        f.write(b'\x00' * 7)
+
+    recorder = BookRecorder(root, keyframe_interval=None)
+    _delta(recorder, 1400, 103)
+    _snapshot(recorder, 1600, 200)
+    _delta(recorder, 1700, 201)
+    recorder.close()
+
+    assert os.path.getsize(levels_path) % LEVEL_DTYPE.itemsize == 0
+    assert os.path.getsize(index_path) % INDEX_DTYPE.itemsize == 0
+    index = np.fromfile(index_path, dtype=INDEX_DTYPE)
+    assert list(index['ts']) == [1000, 1600]
+
+    replay = BookReplay('okx', 'BTC-USDT', root=root)
+    full = _states(replay)
+    assert [ts for ts, _ in full] == [1000, 1100, 1200, 1400, 1600, 1700]
+    for start in (1150, 1450, 1650):
+        assert _states(replay, start) == [state for state in full if state[0] >= start]
+
+
+def test_time_does_not_decrease_across_sessions(tmp_path):
+    root = str(tmp_path)
+    recorder = BookRecorder(root, keyframe_interval=None)
+    _snapshot(recorder, 5000, 100)
+    recorder.close()
+
+    recorder = BookRecorder(root, keyframe_interval=None)
+    _snapshot(recorder, 4000, 110)
+    _delta(recorder, 4500, 111)
+    recorder.close()
+
+    replay = BookReplay('okx', 'BTC-USDT', root=root)
+    assert list(replay.times) == [5000, 5000, 5000]
+    assert np.all(np.diff(replay.index['ts']) >= 0)
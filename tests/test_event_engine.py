@@ -0,0 +1,66 @@
+"""
+Событийный движок: обновление общих свечей тиками и разветвление событий
+по подпискам нескольких стратегий на одной паре.
+"""
+
+import pandas as pd
+
+from market_data.ws_feed import MarketEvent
+from src.event_engine import EventEngine
+from src.metrics import ENGINE_TICK_TO_SIGNAL_SECONDS
+
+BARS = pd.DataFrame([{'timestamp': 60000 * i, 'open': 100.0, 'high': 101.0, 'low': 99.0, 'close': 100.0, 'volume': 1.0}
+                     for i in range(5)])
+
+
+def _hold(df, params):
+    return 'hold'
+
+
+def _trade(price, qty, ts):
+    return MarketEvent('bybit', 'trade', 'BTCUSDT', {'price': price, 'qty': qty}, ts, ts / 1000)
+
+
+def _engine():
+    engine = EventEngine(execution=None)
+    first = engine.add_strategy(_hold, 'bybit', 'BTCUSDT', window=3, on_tick=True)
+    second = engine.add_strategy(_hold, 'bybit', 'BTCUSDT', window=3, on_tick=True, name='second')
+    engine.warm_up('bybit', 'BTCUSDT', '1m', BARS)
+    return engine, first, second
+
+
+def test_trade_updates_shared_series_once():
+    engine, first, second = _engine()
+    engine.on_event(_trade(102.0, 2.0, 300001))
+    engine.on_event(_trade(98.0, 3.0, 300002))
+
+    series = engine.series('bybit', 'BTCUSDT', '1m')
+    assert series.forming['volume'] == 5.0
+    assert (series.forming['high'], series.forming['low'], series.forming['close']) == (102.0, 98.0, 98.0)
+
+    for subscription in (first, second):
+        # Два тика объединены в один вызов стратегии по окну с формирующейся свечой
+        assert subscription.queue.qsize() == 1 and subscription.stats['coalesced'] == 1
+        window, _, bar_ts, tick = subscription.next_item(subscription.queue.get_nowait())
+        assert tick and bar_ts == 300000
+        assert len(window) == 3 and float(window.last('volume')) == 5.0
+
+
+def test_confirmed_kline_reaches_every_subscription():
+    engine, first, second = _engine()
+    data = {'interval': '1m', 'start': 300000, 'open': 100.0, 'high': 103.0, 'low': 99.0,
+            'close': 102.0, 'volume': 4.0, 'confirm': True}
+    engine.on_event(MarketEvent('bybit', 'kline', 'BTCUSDT', data, 360000, 360.0))
+
+    assert len(engine.series('bybit', 'BTCUSDT', '1m')) == len(BARS) + 1
+    for subscription in (first, second):
+        window, _, bar_ts, tick = subscription.next_item(subscription.queue.get_nowait())
+        assert not tick and bar_ts == 300000 and float(window.last('close')) == 102.0
+
+
+def test_latency_metrics_use_subscription_name():
+    engine, first, second = _engine()
+    assert first.name == '_hold:bybit:BTCUSDT:1m'
+    assert ENGINE_TICK_TO_SIGNAL_SECONDS.labels(first.name) is first._tick_to_signal_metric
+    assert ENGINE_TICK_TO_SIGNAL_SECONDS.labels('second') is second._tick_to_signal_metric
+    assert first._tick_to_signal_metric is not second._tick_to_signal_metric
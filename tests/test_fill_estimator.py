@@ -0,0 +1,79 @@
+"""
+Оценка исполнения по стакану и проверка проскальзывания SlippageGuard.
+"""
+
+import random
+
+import numpy as np
+
+from market_data.fill_estimator import SlippageGuard, max_size_within, walk_depth
+from src.instruments import Instrument, InstrumentRegistry
+
+ASKS = (np.array([100.0, 101.0, 102.0]), np.array([1.0, 2.0, 5.0]))
+BIDS = (np.array([100.0, 99.0, 98.0]), np.array([1.0, 2.0, 5.0]))
+
+
+class _Books:
+    """Стаканы OrderBookManager: depth_arrays по (биржа, пара, сторона)"""
+
+    def __init__(self, books):
+        self.books = books
+
+    def depth_arrays(self, exchange, symbol, side):
+        return self.books.get((exchange, symbol, side))
+
+
+def test_walk_depth_by_qty_and_notional():
+    prices, quantities = ASKS
+    estimate = walk_depth(prices, quantities, 'buy', qty=np.array([0.5, 2.0, 10.0]))
+    assert np.allclose(estimate.vwap[:2], [100.0, 100.5])
+    assert list(estimate.levels) == [1, 2, 3]
+    assert list(estimate.complete) == [True, True, False]
+    assert estimate.qty[2] == 8.0
+
+    estimate = walk_depth(prices, quantities, 'buy', notional=201.0)
+    assert np.isclose(estimate.qty[0], 2.0) and np.isclose(estimate.slippage_bps[0], 50.0)
+
+
+def test_max_size_within_tolerance():
+    prices, quantities = BIDS
+    qty = max_size_within(prices, quantities, 'sell', 50.0)
+    estimate = walk_depth(prices, quantities, 'sell', qty=qty)
+    assert np.isclose(estimate.slippage_bps[0], 50.0) and np.isclose(qty, 2.0)
+
+
+def test_downsized_size_is_rounded_to_instrument_step():
+    registry = InstrumentRegistry('okx', lambda: [
+        Instrument('ETH-USDT', 'ETH', 'USDT', 0.01, 0.1, 0.1, None)])
+    rng = random.Random(3)
+    for _ in range(300):
+        quantities = np.round(np.array([rng.uniform(0.2, 3) for _ in range(3)]), 4)
+        books = _Books({('okx', 'ETH-USDT', 'bids'): (BIDS[0], quantities)})
+        guard = SlippageGuard(books, tolerance_bps=60.0, instruments={'okx': registry})
+        qty, error = guard.check('okx', 'ETH-USDT', 'sell', qty=100.0)
+        assert error is None and qty < 100.0
+        assert registry.validate_order('ETH-USDT', qty=qty) is None, qty
+
+
+def test_downsized_notional_uses_quote_step():
+    registry = InstrumentRegistry('bybit', lambda: [
+        Instrument('BTCUSDT', 'BTC', 'USDT', 0.01, 0.000001, 0.000048, 1.0, 0.0001)])
+    guard = SlippageGuard(_Books({('bybit', 'BTCUSDT', 'asks'): ASKS}), tolerance_bps=30.0,
+                          instruments={'bybit': registry})
+    notional, error = guard.check('bybit', 'BTCUSDT', 'buy', notional=1000.0)
+    assert error is None and 0 < notional < 1000.0
+    assert notional == round(notional, 4)
+
+
+def test_missing_book_policy():
+    books = _Books({})
+    assert SlippageGuard(books).check('okx', 'ETH-USDT', 'buy', notional=10.0) == (10.0, None)
+    amount, error = SlippageGuard(books, require_book=True).check('okx', 'ETH-USDT', 'buy', notional=10.0)
+    assert amount == 10.0 and 'Нет согласованного стакана' in error
+
+
+def test_reject_mode():
+    guard = SlippageGuard(_Books({('bybit', 'BTCUSDT', 'asks'): ASKS}), tolerance_bps=10.0, mode='reject')
+    assert guard.check('bybit', 'BTCUSDT', 'buy', qty=0.5) == (0.5, None)
+    amount, error = guard.check('bybit', 'BTCUSDT', 'buy', qty=2.0)
+    assert amount == 2.0 and 'проскальзывание' in error
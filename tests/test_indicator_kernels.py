@@ -0,0 +1,84 @@
+"""
+Паритет ядер src/indicator_kernels с pandas-версиями индикаторов, в том
+числе на рядах с пропусками (NaN) и на матрицах (symbols, bars).
+"""
+
+import numpy as np
+import pandas as pd
+
+from src import indicator_kernels as kernels
+from src.indicators import calculate_atr, calculate_rsi, calculate_sma
+
+
+def _candles(bars=300, seed=1, nan_at=()):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, bars))
+    spread = rng.uniform(0.1, 2.0, bars)
+    data = pd.DataFrame({'high': close + spread, 'low': close - spread, 'close': close})
+    for column, index in nan_at:
+        data.loc[index, column] = np.nan
+    return data
+
+
+def _pandas_atr(data, window):
+    tr = pd.concat([data['high'] - data['low'],
+                    (data['high'] - data['close'].shift(1)).abs(),
+                    (data['low'] - data['close'].shift(1)).abs()], axis=1).max(axis=1)
+    return tr.rolling(window=window).mean()
+
+
+def _pandas_rsi(data, window):
+    delta = data['close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
+    return 100 - (100 / (1 + gain / loss))
+
+
+def _assert_same(actual, expected):
+    actual, expected = np.asarray(actual, dtype=float), np.asarray(expected, dtype=float)
+    assert np.array_equal(np.isnan(actual), np.isnan(expected))
+    assert np.allclose(actual, expected, equal_nan=True, rtol=1e-9, atol=1e-9)
+
+
+def test_indicators_match_pandas():
+    data = _candles()
+    for window in (1, 5, 14):
+        _assert_same(calculate_atr(data, window), _pandas_atr(data, window))
+        _assert_same(calculate_rsi(data, window), _pandas_rsi(data, window))
+        _assert_same(calculate_sma(data, window), data['close'].rolling(window).mean())
+
+
+def test_indicators_match_pandas_with_missing_values():
+    data = _candles(nan_at=[('close', 40), ('close', 41), ('high', 120), ('low', 200), ('close', 299)])
+    _assert_same(calculate_atr(data, 14), _pandas_atr(data, 14))
+    _assert_same(calculate_rsi(data, 14), _pandas_rsi(data, 14))
+    _assert_same(calculate_sma(data, 14), data['close'].rolling(14).mean())
+    # Одно пропущенное закрытие не портит ATR и RSI после него
+    assert not np.isnan(calculate_atr(data, 14)[60:110]).any()
+    assert not np.isnan(calculate_rsi(data, 14)[60:110]).any()
+
+
+def test_rolling_kernels_match_pandas():
+    values = _candles(bars=257, seed=2)['close'].to_numpy(copy=True)
+    values[[10, 100, 101]] = np.nan
+    series = pd.Series(values)
+    for window in (1, 3, 20):
+        _assert_same(kernels.rolling_sum(values, window), series.rolling(window).sum())
+        _assert_same(kernels.rolling_mean(values, window), series.rolling(window).mean())
+        _assert_same(kernels.rolling_min(values, window), series.rolling(window).min())
+        _assert_same(kernels.rolling_max(values, window), series.rolling(window).max())
+    clean = _candles(bars=257, seed=2)['close']
+    _assert_same(kernels.ema(clean.to_numpy(), 12), clean.ewm(span=12, adjust=False).mean())
+
+
+def test_matrix_rows_match_single_series():
+    frames = [_candles(seed=seed, nan_at=[('close', 50 + seed)]) for seed in range(4)]
+    high, low, close = (np.stack([frame[column].to_numpy() for frame in frames])
+                        for column in ('high', 'low', 'close'))
+    atr = kernels.atr(high, low, close, 14)
+    rsi = kernels.rsi(close, 14)
+    ema = kernels.ema(np.nan_to_num(close), 9)
+    for row, frame in enumerate(frames):
+        _assert_same(atr[row], _pandas_atr(frame, 14))
+        _assert_same(rsi[row], _pandas_rsi(frame, 14))
+        _assert_same(ema[row], kernels.ema(np.nan_to_num(frame['close'].to_numpy()), 9))
@@ -0,0 +1,55 @@
+"""
+Реестр инструментов: округление до шага цены и лота и локальная проверка ордеров.
+"""
+
+import random
+
+from src.instruments import Instrument, InstrumentRegistry, format_amount
+
+INSTRUMENTS = [
+    Instrument('BTCUSDT', 'BTC', 'USDT', 0.01, 0.000001, 0.000048, 1.0),
+    Instrument('ETH-USDT', 'ETH', 'USDT', 0.01, 0.1, 0.1, None),
+    Instrument('DOGEUSDT', 'DOGE', 'USDT', 0.00001, 1.0, 1.0, 1.0),
+]
+
+
+def _registry():
+    return InstrumentRegistry('test', lambda: INSTRUMENTS)
+
+
+def test_round_qty_is_exact_multiple_of_lot():
+    registry = _registry()
+    assert registry.round_qty('ETH-USDT', 0.35) == 0.3
+    assert str(registry.round_qty('ETH-USDT', 0.35)) == '0.3'
+    assert registry.round_qty('ETH-USDT', 0.3) == 0.3
+    assert registry.round_qty('DOGEUSDT', 12.9) == 12.0
+    assert registry.round_qty('BTCUSDT', 0.0123456789) == 0.012345
+
+    rng = random.Random(7)
+    for _ in range(1000):
+        for symbol in ('ETH-USDT', 'BTCUSDT'):
+            qty = registry.round_qty(symbol, rng.uniform(0.1, 100))
+            assert registry.validate_order(symbol, qty=qty) is None, (symbol, qty)
+
+
+def test_round_price_to_tick():
+    registry = _registry()
+    assert registry.round_price('BTCUSDT', 65000.129) == 65000.12
+    assert registry.round_price('DOGEUSDT', 0.123456789) == 0.12345
+    assert registry.round_price('UNKNOWN', 1.23456) == 1.23456
+
+
+def test_validate_order():
+    registry = _registry()
+    assert 'не найдена' in registry.validate_order('UNKNOWN', qty=1)
+    assert 'меньше минимального' in registry.validate_order('ETH-USDT', qty=0.05)
+    assert 'не кратно шагу лота' in registry.validate_order('ETH-USDT', qty=0.35)
+    assert 'меньше минимальной' in registry.validate_order('BTCUSDT', notional=0.5)
+    assert registry.validate_order('BTCUSDT', notional=10) is None
+
+
+def test_format_amount():
+    assert format_amount(1e-05) == '0.00001'
+    assert format_amount(0.3) == '0.3'
+    assert format_amount(100.0) == '100'
+    assert format_amount('12.50') == '12.5'
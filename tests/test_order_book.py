@@ -0,0 +1,93 @@
+"""
+Стакан L2: применение снимков и дельт, порядок уровней, контрольная сумма
+OKX и потеря согласованности при разрыве последовательности.
+"""
+
+import zlib
+
+from market_data.order_book import OrderBook, OrderBookManager
+from market_data.ws_feed import MarketEvent
+
+
+def _okx_checksum(bids, asks):
+    parts = []
+    for i in range(max(len(bids), len(asks))):
+        if i < len(bids):
+            parts.extend(bids[i])
+        if i < len(asks):
+            parts.extend(asks[i])
+    value = zlib.crc32(':'.join(parts).encode())
+    return value - (1 << 32) if value >= (1 << 31) else value
+
+
+def test_levels_are_sorted_from_best_and_zero_removes():
+    book = OrderBook('okx', 'BTC-USDT', validate=False)
+    book.apply({'action': 'snapshot', 'bids': [['99', '1'], ['100', '2'], ['98', '3']],
+                'asks': [['102', '1'], ['101', '2']]})
+    assert book.bids.levels() == [(100.0, 2.0), (99.0, 1.0), (98.0, 3.0)]
+    assert book.asks.levels() == [(101.0, 2.0), (102.0, 1.0)]
+    assert (book.mid_price(), book.spread()) == (100.5, 1.0)
+
+    book.apply({'action': 'delta', 'bids': [['100', '0'], ['99.5', '4']], 'asks': [['101', '0.5']]})
+    assert book.best_bid() == 99.5 and book.bids.levels(2) == [(99.5, 4.0), (99.0, 1.0)]
+    assert book.asks.best() == (101.0, 0.5)
+    assert book.depth('bids') == 8.0
+    prices, cumulative = book.cumulative_depth('asks')
+    assert list(prices) == [101.0, 102.0] and list(cumulative) == [0.5, 1.5]
+
+
+def test_okx_checksum_and_sequence():
+    bids, asks = [['100.1', '1.5'], ['100', '2']], [['100.2', '0.3']]
+    book = OrderBook('okx', 'BTC-USDT')
+    assert book.apply({'action': 'snapshot', 'bids': bids, 'asks': asks, 'seq': 10, 'prev_seq': -1,
+                       'checksum': _okx_checksum(bids, asks)})
+    assert book.checksum() == _okx_checksum(bids, asks)
+
+    # Уровни хранятся в том виде, в каком их прислала биржа
+    delta = {'action': 'delta', 'bids': [['100.05', '1.0']], 'asks': [], 'seq': 11, 'prev_seq': 10}
+    delta['checksum'] = _okx_checksum([['100.1', '1.5'], ['100.05', '1.0'], ['100', '2']], asks)
+    assert book.apply(delta) and book.seq == 11
+
+    assert not book.apply({'action': 'delta', 'bids': [], 'asks': [['100.3', '1']], 'seq': 13,
+                           'prev_seq': 12})
+    assert not book.synced and book.stats['gaps'] == 1
+    # До нового снимка дельты не применяются
+    assert not book.apply({'action': 'delta', 'bids': [['90', '1']], 'asks': [], 'seq': 14, 'prev_seq': 13})
+    assert book.stats['skipped'] == 1 and book.bids.best() == (100.1, 1.5)
+
+    assert book.apply({'action': 'snapshot', 'bids': bids, 'asks': asks, 'seq': 20, 'prev_seq': -1})
+    assert not book.apply({'action': 'delta', 'bids': [['100.1', '9']], 'asks': [], 'seq': 21,
+                           'prev_seq': 20, 'checksum': 1})
+    assert book.stats['checksum_errors'] == 1 and not book.synced
+
+
+def test_bybit_sequence():
+    book = OrderBook('bybit', 'BTCUSDT')
+    assert book.apply({'action': 'snapshot', 'bids': [['100', '1']], 'asks': [['101', '1']], 'seq': 5})
+    assert book.apply({'action': 'delta', 'bids': [['100', '2']], 'asks': [], 'seq': 6})
+    # Повтор уже примененного обновления пропускается
+    assert book.apply({'action': 'delta', 'bids': [['100', '7']], 'asks': [], 'seq': 6})
+    assert book.bids.best() == (100.0, 2.0) and book.stats['skipped'] == 1
+
+    assert not book.apply({'action': 'delta', 'bids': [], 'asks': [], 'seq': 8})
+    # u=1 - новый снимок, даже если он пришел как delta
+    assert book.apply({'action': 'delta', 'bids': [['99', '1']], 'asks': [['100', '1']], 'seq': 1})
+    assert book.synced and book.to_dict() == {'bids': [[99.0, 1.0]], 'asks': [[100.0, 1.0]]}
+
+
+def test_manager_reports_desync_once():
+    desynced = []
+    manager = OrderBookManager(on_desync=desynced.append)
+
+    def event(data):
+        return MarketEvent('bybit', 'orderbook', 'BTCUSDT', data, 1, 1.0)
+
+    assert manager.depth_arrays('bybit', 'BTCUSDT', 'asks') is None
+    manager.on_event(event({'action': 'snapshot', 'bids': [['100', '1']], 'asks': [['101', '2']], 'seq': 5}))
+    prices, quantities = manager.depth_arrays('bybit', 'BTCUSDT', 'asks')
+    assert list(prices) == [101.0] and list(quantities) == [2.0]
+
+    manager.on_event(event({'action': 'delta', 'bids': [], 'asks': [], 'seq': 9}))
+    manager.on_event(event({'action': 'delta', 'bids': [], 'asks': [], 'seq': 10}))
+    assert [book.symbol for book in desynced] == ['BTCUSDT']
+    assert manager.depth_arrays('bybit', 'BTCUSDT', 'asks') is None
@@ -0,0 +1,69 @@
+"""
+Планировщик запросов: группы эндпоинтов, корзины токенов, блокировка после
+429 и очередность по приоритету.
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.rate_limiter import (DEFAULT_GROUP, EXCHANGE_LIMITS, PRIORITY_MARKET, PRIORITY_ORDER, RateGroup,
+                              RequestScheduler)
+
+
+def _scheduler(rate=20, burst=2):
+    return RequestScheduler('test', {
+        'order': RateGroup(rate, burst, PRIORITY_ORDER, ('/order/',)),
+        'market': RateGroup(rate, burst, PRIORITY_MARKET, ('/market/',)),
+        DEFAULT_GROUP: RateGroup(rate, burst, PRIORITY_MARKET, ()),
+    })
+
+
+def test_group_by_longest_prefix():
+    scheduler = RequestScheduler('okx', EXCHANGE_LIMITS['okx'])
+    assert scheduler.group_for('/api/v5/trade/order') == 'order'
+    assert scheduler.group_for('/api/v5/market/history-candles') == 'history_candles'
+    assert scheduler.group_for('/api/v5/market/books') == 'market'
+    assert scheduler.group_for('/api/v5/asset/balances') == DEFAULT_GROUP
+
+
+def test_bucket_limits_rate_after_burst():
+    scheduler = _scheduler(rate=20, burst=2)
+    start = time.monotonic()
+    for _ in range(4):
+        scheduler.acquire('/market/tickers')
+    # Два запроса из емкости корзины, еще два - по 1/20 с
+    assert time.monotonic() - start >= 0.09
+    assert scheduler.get_stats()['groups']['market']['granted'] == 4
+    # Группы не делят токены
+    assert scheduler.acquire('/order/create') < 0.01
+
+
+def test_throttle_blocks_group():
+    scheduler = _scheduler(rate=1000, burst=10)
+    scheduler.update('/market/tickers', status_code=200, payload={'retCode': 10006})
+    stats = scheduler.get_stats()['groups']['market']
+    assert stats['throttled'] == 1 and stats['blocked_for'] > 0.9
+    with pytest.raises(TimeoutError):
+        scheduler.acquire('/market/tickers', timeout=0.05)
+    assert scheduler.acquire('/order/create', timeout=0.05) < 0.05
+
+
+def test_waiting_requests_are_granted_by_priority():
+    scheduler = RequestScheduler('test', {DEFAULT_GROUP: RateGroup(10, 1, PRIORITY_MARKET, ())})
+    scheduler.acquire('/x')
+    order = []
+
+    def request(name, priority, delay):
+        time.sleep(delay)
+        scheduler.acquire('/x', priority=priority)
+        order.append(name)
+
+    threads = [threading.Thread(target=request, args=('market', PRIORITY_MARKET, 0.0)),
+               threading.Thread(target=request, args=('order', PRIORITY_ORDER, 0.02))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert order == ['order', 'market']
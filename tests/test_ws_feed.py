@@ -0,0 +1,153 @@
+"""
+Потоки ws_feed против локального стенда LocalExchangeStandIn: нормализация
+сообщений Bybit и OKX, пропуск битых сообщений и повтор подписок после
+переподключения.
+"""
+
+import asyncio
+
+from market_data.ws_feed import BybitStream, MarketDataBus, OkxStream
+from market_data.ws_standin import LocalExchangeStandIn
+
+TIMEOUT = 5
+
+
+async def _start(stream_class, subscriptions):
+    """Стенд, поток с подписками и очередь опубликованных событий"""
+    standin = await LocalExchangeStandIn().start()
+    bus = MarketDataBus()
+    events = asyncio.Queue()
+    bus.subscribe(events.put)
+    stream = stream_class(bus, url=standin.url, reconnect_delay=0.05, max_reconnect_delay=0.1)
+    for channel, symbol in subscriptions:
+        stream.subscribe(channel, symbol, interval='1m', depth=50)
+    task = asyncio.ensure_future(stream.run())
+    await standin.wait_subscribed(TIMEOUT)
+    return standin, stream, task, events
+
+
+async def _stop(standin, stream, task):
+    stream.stop()
+    await asyncio.wait_for(task, TIMEOUT)
+    await standin.stop()
+
+
+async def _next(events):
+    return await asyncio.wait_for(events.get(), TIMEOUT)
+
+
+BYBIT_MESSAGES = [
+    {"topic": "kline.1.BTCUSDT", "ts": 1700000060000, "data": [{
+        "start": 1700000000000, "open": "100", "high": "102", "low": "99", "close": "101",
+        "volume": "5.5", "confirm": True, "timestamp": 1700000059999}]},
+    {"topic": "tickers.BTCUSDT", "ts": 1700000001000, "data": {
+        "lastPrice": "101.5", "bid1Price": "101.4", "ask1Price": "101.6", "bid1Size": "1",
+        "ask1Size": "2", "volume24h": "1000"}},
+    {"topic": "publicTrade.BTCUSDT", "ts": 1700000002000, "data": [{
+        "p": "101.5", "v": "0.25", "S": "Buy", "i": "t1", "T": 1700000001999}]},
+    {"topic": "orderbook.50.BTCUSDT", "type": "snapshot", "ts": 1700000003000, "cts": 1700000002999,
+     "data": {"s": "BTCUSDT", "b": [["101.4", "1"]], "a": [["101.6", "2"]], "u": 7}},
+]
+
+OKX_MESSAGES = [
+    {"arg": {"channel": "candle1m", "instId": "BTC-USDT"},
+     "data": [["1700000000000", "100", "102", "99", "101", "5.5", "555", "555", "1"]]},
+    {"arg": {"channel": "tickers", "instId": "BTC-USDT"}, "data": [{
+        "last": "101.5", "bidPx": "101.4", "askPx": "101.6", "bidSz": "1", "askSz": "2",
+        "vol24h": "1000", "ts": "1700000001000"}]},
+    {"arg": {"channel": "trades", "instId": "BTC-USDT"}, "data": [{
+        "px": "101.5", "sz": "0.25", "side": "buy", "tradeId": "t1", "ts": "1700000002000"}]},
+    {"arg": {"channel": "books", "instId": "BTC-USDT"}, "action": "snapshot", "data": [{
+        "bids": [["101.4", "1", "0", "1"]], "asks": [["101.6", "2", "0", "1"]],
+        "ts": "1700000003000", "seqId": 7, "prevSeqId": -1, "checksum": 123}]},
+]
+
+
+def _check_events(exchange, symbol, events):
+    kline, ticker, trade, book = events
+    assert [event.channel for event in events] == ['kline', 'ticker', 'trade', 'orderbook']
+    assert all(event.exchange == exchange and event.symbol == symbol for event in events)
+
+    assert kline.data['start'] == 1700000000000
+    assert (kline.data['open'], kline.data['high'], kline.data['low'], kline.data['close']) == (100, 102, 99, 101)
+    assert kline.data['volume'] == 5.5 and kline.data['confirm'] is True
+    assert (ticker.data['last'], ticker.data['bid'], ticker.data['ask']) == (101.5, 101.4, 101.6)
+    assert (ticker.data['bid_size'], ticker.data['ask_size'], ticker.data['volume_24h']) == (1, 2, 1000)
+    assert ticker.exchange_ts == 1700000001000
+    assert (trade.data['price'], trade.data['qty'], trade.data['side']) == (101.5, 0.25, 'buy')
+    assert trade.data['trade_id'] == 't1'
+    assert book.data['action'] == 'snapshot' and book.data['seq'] == 7
+    assert book.data['bids'] == [["101.4", "1"]] and book.data['asks'] == [["101.6", "2"]]
+
+
+def _subscriptions(symbol):
+    return [(channel, symbol) for channel in ('kline', 'ticker', 'trade', 'orderbook')]
+
+
+def test_bybit_normalization():
+    async def scenario():
+        standin, stream, task, events = await _start(BybitStream, _subscriptions('BTCUSDT'))
+        assert sorted(standin.subscriptions) == sorted(stream.subscriptions)
+        for message in BYBIT_MESSAGES:
+            await standin.broadcast(message)
+        received = [await _next(events) for _ in BYBIT_MESSAGES]
+        await _stop(standin, stream, task)
+        return received
+
+    events = asyncio.run(scenario())
+    _check_events('bybit', 'BTCUSDT', events)
+    assert events[0].exchange_ts == 1700000059999
+    assert events[3].exchange_ts == 1700000002999
+
+
+def test_okx_normalization():
+    async def scenario():
+        standin, stream, task, events = await _start(OkxStream, _subscriptions('BTC-USDT'))
+        for message in OKX_MESSAGES:
+            await standin.broadcast(message)
+        received = [await _next(events) for _ in OKX_MESSAGES]
+        await _stop(standin, stream, task)
+        return received
+
+    events = asyncio.run(scenario())
+    _check_events('okx', 'BTC-USDT', events)
+    assert events[3].data['prev_seq'] == -1 and events[3].data['checksum'] == 123
+
+
+def test_malformed_message_is_skipped():
+    async def scenario():
+        standin, stream, task, events = await _start(BybitStream, [('ticker', 'BTCUSDT')])
+        await standin.broadcast("{not json")
+        await standin.broadcast({"topic": "tickers.BTCUSDT", "ts": 1, "data": None})
+        await standin.broadcast(BYBIT_MESSAGES[1])
+        event = await _next(events)
+        await _stop(standin, stream, task)
+        return event, stream.stats
+
+    event, stats = asyncio.run(scenario())
+    assert event.data['last'] == 101.5
+    assert stats['errors'] == 2
+    assert stats['reconnects'] == 0
+
+
+def test_reconnect_resubscribes():
+    async def scenario():
+        result = {}
+        for stream_class, messages, symbol in ((BybitStream, BYBIT_MESSAGES, 'BTCUSDT'),
+                                               (OkxStream, OKX_MESSAGES, 'BTC-USDT')):
+            standin, stream, task, events = await _start(stream_class, _subscriptions(symbol))
+            first = list(standin.subscriptions)
+            await standin.drop_clients()
+            await standin.wait_subscribed(TIMEOUT)
+            for message in messages:
+                await standin.broadcast(message)
+            received = [await _next(events) for _ in messages]
+            await _stop(standin, stream, task)
+            result[stream.exchange] = (first, standin.subscriptions, stream.stats, received)
+        return result
+
+    for exchange, (first, subscriptions, stats, received) in asyncio.run(scenario()).items():
+        assert stats['reconnects'] >= 1
+        # После переподключения отправлены те же подписки
+        assert subscriptions[len(first):] == first
+        _check_events(exchange, received[0].symbol, received)